@@ -1,107 +1,151 @@
-import streamlit as st
-import pandas as pd
-
-def analyze_ajio_report(file_path):
-    try:
-        df = pd.read_excel(file_path)
-        df.columns = df.columns.str.strip()
-
-        required_columns = [
-            'Status', 'Total Value', 'CGST_AMOUNT', 'SGST_AMOUNT', 'IGST_AMOUNT',
-            'Listing MRP', 'Selling Price', 'Seller SKU', 'Order Qty',
-            'Customer Cancelled QTY', 'Seller Cancelled QTY', 'SLA Status', 'Description'
-        ]
-
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            st.error(f"Missing required columns: {missing_columns}")
-            return None
-
-        numeric_cols = [
-            'Total Value', 'CGST_AMOUNT', 'SGST_AMOUNT', 'IGST_AMOUNT', 
-            'Listing MRP', 'Selling Price', 'Order Qty', 
-            'Customer Cancelled QTY', 'Seller Cancelled QTY'
-        ]
-        df[numeric_cols] = df[numeric_cols].fillna(0)
-
-        # Convert dates if available
-        if 'Order Date' in df.columns:
-            df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
-            sales_by_day = df.groupby(df['Order Date'].dt.date)['Total Value'].sum()
-            orders_by_day = df.groupby(df['Order Date'].dt.date).size()
-        else:
-            sales_by_day = pd.Series([], dtype=float)
-            orders_by_day = pd.Series([], dtype=int)
-
-        total_orders = len(df)
-        cancelled_orders = len(df[df['Status'].str.contains('Cancelled', na=False)])
-        total_sales = df['Total Value'].sum()
-        total_tax = df['CGST_AMOUNT'].sum() + df['SGST_AMOUNT'].sum() + df['IGST_AMOUNT'].sum()
-        total_discounts = df['Listing MRP'].sum() - df['Selling Price'].sum()
-        customer_cancellations = df['Customer Cancelled QTY'].sum()
-        seller_cancellations = df['Seller Cancelled QTY'].sum()
-        on_time_shipments = len(df[df['SLA Status'].str.contains('On Time', na=False)])
-        delayed_shipments = len(df[df['SLA Status'].str.contains('Delayed', na=False)])
-
-        # Top SKUs
-        top_selling = df.groupby(['Seller SKU', 'Description'])['Order Qty'].sum().sort_values(ascending=False).head(10).reset_index()
-        slow_moving = df.groupby(['Seller SKU', 'Description'])['Order Qty'].sum().sort_values().head(10).reset_index()
-
-        # Cancelled and sales summary
-        sku_summary = df.groupby(['Seller SKU', 'Description']).agg({
-            'Order Qty': 'sum',
-            'Customer Cancelled QTY': 'sum',
-            'Total Value': 'sum'
-        }).reset_index().sort_values(by='Order Qty', ascending=False)
-
-        # Dashboard
-        st.title("✅ Ajio Order Report Analysis")
-
-        col1, col2, col3 = st.columns(3)
-        col1.metric("📦 Total Orders", total_orders)
-        col2.metric("❌ Cancelled Orders", cancelled_orders)
-        col3.metric("💰 Total Sales", f"₹{total_sales:,.2f}")
-
-        col4, col5, col6 = st.columns(3)
-        col4.metric("🧾 Total Tax", f"₹{total_tax:,.2f}")
-        col5.metric("🏷️ Discounts", f"₹{total_discounts:,.2f}")
-        col6.metric("🙍 Customer Cancellations", int(customer_cancellations))
-
-        col7, col8, col9 = st.columns(3)
-        col7.metric("🏭 Seller Cancellations", int(seller_cancellations))
-        col8.metric("⏱️ On-Time Shipments", on_time_shipments)
-        col9.metric("🐌 Delayed Shipments", delayed_shipments)
-
-        st.subheader("🔥 Top 10 Best-Selling SKUs")
-        st.dataframe(top_selling.rename(columns={"Order Qty": "Total Orders"}))
-
-        st.subheader("❄️ Top 10 Slow-Moving SKUs")
-        st.dataframe(slow_moving.rename(columns={"Order Qty": "Total Orders"}))
-
-        st.subheader("📦 SKU Summary (Orders, Cancelled, Sales)")
-        st.dataframe(sku_summary.rename(columns={
-            'Order Qty': 'Total Orders',
-            'Customer Cancelled QTY': 'Cancelled Qty',
-            'Total Value': 'Sales (₹)'
-        }))
-
-        # Charts
-        if not sales_by_day.empty:
-            st.subheader("📈 Sales by Day")
-            st.line_chart(sales_by_day)
-
-        if not orders_by_day.empty:
-            st.subheader("📅 Number of Orders by Day")
-            st.bar_chart(orders_by_day)
-
-    except Exception as e:
-        st.error(f"Error: {e}")
-
-# Streamlit UI
-st.set_page_config(page_title="Ajio Order Report", layout="wide")
-st.title("📊 Ajio Order Report Uploader")
-
-uploaded_file = st.file_uploader("Upload your Ajio Excel report", type=["xlsx"])
-
-if uploaded_file is not None:
-    analyze_ajio_report(uploaded_file)
+import streamlit as st
+import pandas as pd
+from datasets import session_upload, session_value
+from instrumentation import stage, timed
+from report_loader import load_report
+from report_schemas import SCHEMAS
+from sku_aggregation import bottom_n, summarize_skus, top_n, upload_key
+
+REQUIRED_COLUMNS = [
+    'Status', 'Total Value', 'CGST_AMOUNT', 'SGST_AMOUNT', 'IGST_AMOUNT',
+    'Listing MRP', 'Selling Price', 'Seller SKU', 'Order Qty',
+    'Customer Cancelled QTY', 'Seller Cancelled QTY', 'SLA Status', 'Description'
+]
+NUMERIC_COLUMNS = [
+    'Total Value', 'CGST_AMOUNT', 'SGST_AMOUNT', 'IGST_AMOUNT',
+    'Listing MRP', 'Selling Price', 'Order Qty',
+    'Customer Cancelled QTY', 'Seller Cancelled QTY'
+]
+SKU_KEYS = ['Seller SKU', 'Description']
+SKU_MEASURES = {
+    'Order Qty': ('Order Qty', 'sum'),
+    'Customer Cancelled QTY': ('Customer Cancelled QTY', 'sum'),
+    'Total Value': ('Total Value', 'sum'),
+}
+
+
+def load_ajio_orders(file):
+    """Load an Ajio order report (upload or path) with the columns used here."""
+    df = load_report(file, columns=REQUIRED_COLUMNS + ['Order Date'], schema=SCHEMAS[('Ajio', 'Orders')])
+    df.columns = df.columns.str.strip()
+    return df
+
+
+@timed("aggregate: order summary")
+def summarize_ajio_orders(df, cache_key=None):
+    """KPIs and tables of an Ajio order report, without any Streamlit calls.
+
+    Returns (kpis, tables): a dict of scalar metrics and a dict of
+    DataFrames/Series. Raises ValueError when required columns are missing.
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {missing_columns}")
+
+    df = df.assign(**df[NUMERIC_COLUMNS].fillna(0))
+
+    # Daily series if dates are available
+    if 'Order Date' in df.columns:
+        sales_by_day = df.groupby(df['Order Date'].dt.date)['Total Value'].sum()
+        orders_by_day = df.groupby(df['Order Date'].dt.date).size()
+    else:
+        sales_by_day = pd.Series([], dtype=float)
+        orders_by_day = pd.Series([], dtype=int)
+
+    kpis = {
+        'total_orders': len(df),
+        'cancelled_orders': len(df[df['Status'].str.contains('Cancelled', na=False)]),
+        'total_sales': float(df['Total Value'].sum()),
+        'total_tax': float(df['CGST_AMOUNT'].sum() + df['SGST_AMOUNT'].sum() + df['IGST_AMOUNT'].sum()),
+        'total_discounts': float(df['Listing MRP'].sum() - df['Selling Price'].sum()),
+        'customer_cancellations': int(df['Customer Cancelled QTY'].sum()),
+        'seller_cancellations': int(df['Seller Cancelled QTY'].sum()),
+        'on_time_shipments': len(df[df['SLA Status'].str.contains('On Time', na=False)]),
+        'delayed_shipments': len(df[df['SLA Status'].str.contains('Delayed', na=False)]),
+    }
+
+    # Per-SKU orders, cancellations and sales in one grouped pass
+    sku_summary = summarize_skus(df, SKU_KEYS, SKU_MEASURES, cache_key=cache_key)
+    tables = {
+        'top_selling': top_n(sku_summary[SKU_KEYS + ['Order Qty']], 'Order Qty'),
+        'slow_moving': bottom_n(sku_summary[SKU_KEYS + ['Order Qty']], 'Order Qty'),
+        'sku_summary': sku_summary.sort_values(by='Order Qty', ascending=False),
+        'sales_by_day': sales_by_day,
+        'orders_by_day': orders_by_day,
+    }
+    return kpis, tables
+
+
+def ajio_order_summary(file):
+    """(kpis, tables) of an uploaded Ajio order report, built once per session upload."""
+    df = session_value("Ajio", "Orders", "frame", lambda: load_ajio_orders(file))
+    return session_value("Ajio", "Orders", "summary", lambda: summarize_ajio_orders(df, cache_key=upload_key(file)))
+
+
+def show_ajio_orders(kpis, tables):
+    col1, col2, col3 = st.columns(3)
+    col1.metric("📦 Total Orders", kpis['total_orders'])
+    col2.metric("❌ Cancelled Orders", kpis['cancelled_orders'])
+    col3.metric("💰 Total Sales", f"₹{kpis['total_sales']:,.2f}")
+
+    col4, col5, col6 = st.columns(3)
+    col4.metric("🧾 Total Tax", f"₹{kpis['total_tax']:,.2f}")
+    col5.metric("🏷️ Discounts", f"₹{kpis['total_discounts']:,.2f}")
+    col6.metric("🙍 Customer Cancellations", kpis['customer_cancellations'])
+
+    col7, col8, col9 = st.columns(3)
+    col7.metric("🏭 Seller Cancellations", kpis['seller_cancellations'])
+    col8.metric("⏱️ On-Time Shipments", kpis['on_time_shipments'])
+    col9.metric("🐌 Delayed Shipments", kpis['delayed_shipments'])
+
+    with stage("table: Top 10 Best-Selling SKUs"):
+        st.subheader("🔥 Top 10 Best-Selling SKUs")
+        st.dataframe(tables['top_selling'].rename(columns={"Order Qty": "Total Orders"}))
+
+    with stage("table: Top 10 Slow-Moving SKUs"):
+        st.subheader("❄️ Top 10 Slow-Moving SKUs")
+        st.dataframe(tables['slow_moving'].rename(columns={"Order Qty": "Total Orders"}))
+
+    with stage("table: SKU Summary"):
+        st.subheader("📦 SKU Summary (Orders, Cancelled, Sales)")
+        st.dataframe(tables['sku_summary'].rename(columns={
+            'Order Qty': 'Total Orders',
+            'Customer Cancelled QTY': 'Cancelled Qty',
+            'Total Value': 'Sales (₹)'
+        }))
+
+    # Charts
+    with stage("chart: Sales and Orders by Day"):
+        if not tables['sales_by_day'].empty:
+            st.subheader("📈 Sales by Day")
+            st.line_chart(tables['sales_by_day'])
+
+        if not tables['orders_by_day'].empty:
+            st.subheader("📅 Number of Orders by Day")
+            st.bar_chart(tables['orders_by_day'])
+
+
+def analyze_ajio_report(file_path):
+    try:
+        kpis, tables = ajio_order_summary(file_path)
+
+        # Dashboard
+        st.title("✅ Ajio Order Report Analysis")
+        show_ajio_orders(kpis, tables)
+
+    except Exception as e:
+        st.error(f"Error: {e}")
+
+# Streamlit UI
+def render():
+    st.title("📊 Ajio Order Report Uploader")
+
+    uploaded_file = session_upload("Ajio", "Orders", "Upload your Ajio Excel report", type=["xlsx"])
+
+    if uploaded_file is not None:
+        analyze_ajio_report(uploaded_file)
+
+
+if __name__ == "__main__":
+    st.set_page_config(page_title="Ajio Order Report", layout="wide")
+    render()
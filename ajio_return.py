@@ -0,0 +1,134 @@
+import streamlit as st
+import plotly.express as px
+from datasets import session_upload, session_value
+from exports import export_buttons
+from instrumentation import stage, timed
+from report_loader import load_report
+from report_schemas import SCHEMAS
+from table_view import paged_table
+
+
+NUMERIC_COLUMNS = ['Return QTY', 'Return Value', 'Credit Note Value', 'Credit Note Pre Tax Value',
+                   'Credit Note Tax Value', 'CGST AMOUNT', 'SGST AMOUNT', 'IGST AMOUNT']
+
+
+def clean_ajio_returns(df):
+    """Copy of an Ajio return report with trimmed headers and missing amounts as 0."""
+    df = df.set_axis(df.columns.str.strip(), axis=1)
+    return df.assign(**{col: df[col].fillna(0) for col in NUMERIC_COLUMNS if col in df.columns})
+
+
+def load_ajio_returns(file):
+    """Load an Ajio return report with trimmed headers and missing amounts as 0."""
+    return clean_ajio_returns(load_report(file, schema=SCHEMAS[('Ajio', 'Returns')]))
+
+
+def _counts(series, label, count_label, n=None):
+    counts = series.value_counts()
+    if n is not None:
+        counts = counts.head(n)
+    counts = counts.reset_index()
+    counts.columns = [label, count_label]
+    return counts
+
+
+@timed("aggregate: return summary")
+def summarize_ajio_returns(df):
+    """KPIs and tables of a loaded Ajio return report, without Streamlit.
+
+    Returns (kpis, tables); tables only holds what the report's columns allow.
+    """
+    has = set(df.columns)
+    kpis = {
+        'total_returns': len(df),
+        'total_return_qty': df['Return QTY'].sum(),
+        'total_return_value': df['Return Value'].sum(),
+        'total_credit_value': df['Credit Note Value'].sum(),
+    }
+
+    tables = {
+        'top_skus': df.groupby('SELLER SKU')['Return QTY'].sum().sort_values(ascending=False).head(10).reset_index(),
+    }
+    if 'Return Created Date' in has:
+        tables['returns_by_date'] = df.groupby(df['Return Created Date'].dt.date)['Return QTY'].sum().reset_index()
+    if 'Disposition' in has:
+        tables['dispositions'] = _counts(df['Disposition'], 'Disposition', 'Count')
+    if 'QC Reason coding' in has:
+        tables['qc_reasons'] = _counts(df['QC Reason coding'], 'QC Reason', 'Count', 10)
+    if 'Return Status' in has:
+        tables['statuses'] = _counts(df['Return Status'], 'Return Status', 'Count')
+    if 'Return Carrier Name' in has:
+        tables['carriers'] = _counts(df['Return Carrier Name'], 'Carrier', 'Count', 10)
+    return kpis, tables
+
+
+def render():
+    st.title("📦 Ajio Return Report Analysis")
+
+    uploaded_file = session_upload("Ajio", "Returns", "Upload the Ajio Return Excel Report", type=["xlsx"])
+
+    if uploaded_file:
+        df = session_value("Ajio", "Returns", "frame", lambda: load_ajio_returns(uploaded_file))
+
+        kpis, tables = summarize_ajio_returns(df)
+
+        # KPIs
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("🔁 Total Returns", kpis['total_returns'])
+        col2.metric("📦 Total Return Qty", int(kpis['total_return_qty']))
+        col3.metric("💸 Total Return Value", f"₹{kpis['total_return_value']:,.2f}")
+        col4.metric("🧾 Credit Note Value", f"₹{kpis['total_credit_value']:,.2f}")
+
+        # Returns over time
+        if 'returns_by_date' in tables:
+            with stage("chart: Returns by Date"):
+                fig = px.bar(tables['returns_by_date'], x='Return Created Date', y='Return QTY',
+                             title='📅 Returns by Date', labels={'Return Created Date': 'Date', 'Return QTY': 'Qty'})
+                st.plotly_chart(fig, use_container_width=True)
+
+        # Top Returned SKUs
+        with stage("chart: Top Returned SKUs"):
+            fig2 = px.bar(tables['top_skus'], x='SELLER SKU', y='Return QTY',
+                          title='📌 Top Returned SKUs', labels={'Return QTY': 'Qty'})
+            st.plotly_chart(fig2, use_container_width=True)
+
+        # Top Returned Product Names
+        if 'RETURN ORDER NUMBER' in df.columns and 'BRAND' in df.columns:
+            st.subheader("📦 Return Details Table")
+            with stage("table: Return Details Table"):
+                st.dataframe(df[['RETURN ORDER NUMBER', 'SELLER SKU', 'Return QTY', 'Return Value', 'Disposition', 'QC Reason coding', 'BRAND']])
+
+        # QC Disposition breakdown
+        if 'dispositions' in tables:
+            with stage("chart: QC Disposition Breakdown"):
+                fig3 = px.pie(tables['dispositions'], names='Disposition', values='Count', title='🧪 QC Disposition Breakdown')
+                st.plotly_chart(fig3, use_container_width=True)
+
+        # Top QC Reasons
+        if 'qc_reasons' in tables:
+            with stage("chart: Top QC Reasons"):
+                fig4 = px.bar(tables['qc_reasons'], x='QC Reason', y='Count', title='❌ Top QC Reasons')
+                st.plotly_chart(fig4, use_container_width=True)
+
+        # Return Status
+        if 'statuses' in tables:
+            with stage("chart: Return Status Distribution"):
+                fig5 = px.pie(tables['statuses'], names='Return Status', values='Count', title='🚚 Return Status Distribution')
+                st.plotly_chart(fig5, use_container_width=True)
+
+        # Carrier performance
+        if 'carriers' in tables:
+            with stage("chart: Top Return Carriers"):
+                fig6 = px.bar(tables['carriers'], x='Carrier', y='Count', title='🚛 Top Return Carriers')
+                st.plotly_chart(fig6, use_container_width=True)
+
+        # Optional: Raw data download
+        with st.expander("📄 View Full Data"):
+            with stage("table: Full Return Data"):
+                paged_table(df, key="ajio_return_full_table")
+            export_buttons(df, "ajio_return_data", key="ajio_return_export", label="Download")
+
+
+if __name__ == "__main__":
+    st.set_page_config(page_title="Ajio Return Report Dashboard", layout="wide")
+    render()
@@ -1,14 +1,19 @@
-import streamlit as st
-from amazon_order import process_order_report
-from amazon_return import process_return_report
-
-st.sidebar.title("📦 Amazon Ecom Reports")
-selected_report = st.sidebar.radio(
-    "Select Report Type",
-    ["Order Report", "Return Report"]
-)
-
-if selected_report == "Order Report":
-    process_order_report()
-elif selected_report == "Return Report":
-    process_return_report()
+import streamlit as st
+from report_registry import render_report
+
+AMAZON_REPORTS = {
+    "Order Report": "Orders",
+    "Return Report": "Returns",
+    "Inventory Report": "Inventory",
+}
+
+
+def render():
+    st.sidebar.title("📦 Amazon Ecom Reports")
+    selected_report = st.sidebar.radio("Select Report Type", list(AMAZON_REPORTS))
+
+    render_report("Amazon", AMAZON_REPORTS[selected_report])
+
+
+if __name__ == "__main__":
+    render()
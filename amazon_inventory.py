@@ -1,76 +1,113 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-
-def process_inventory():
-    """Handles the UI and processing of inventory reports in Streamlit."""
-    st.markdown("<h1>📊Amazon Inventory Dashboard</h1>", unsafe_allow_html=True)
-    st.write("Upload your Excel file to generate insights on inventory.")
-
-    # File uploader inside the function
-    uploaded_file = st.file_uploader("📂 Choose an Excel file", type=["xlsx"])
-
-    if uploaded_file is not None:
-        df = process_inventory_file(uploaded_file)  # Call the helper function
-
-        if df is not None:
-            st.markdown("### 📝 Processed Inventory Report")
-            st.dataframe(df, height=600, use_container_width=True)
-
-            # Key Metrics
-            total_inventory = int(df["quantity"].sum())
-            total_value = int((df["price"] * df["quantity"]).sum())
-            avg_price = round(df["price"].mean(), 2)
-            zero_inventory_skus = int((df["quantity"] == 0).sum())
-            available_skus = int((df["quantity"] > 0).sum())
-
-            # Display Key Metrics
-            col1, col2, col3, col4, col5 = st.columns(5)
-            col1.metric("📦 Total Inventory", f"{total_inventory:,}")
-            col2.metric("💰 Total Value", f"₹{total_value:,}")
-            col3.metric("📊 Avg. Price", f"₹{avg_price:,.2f}")
-            col4.metric("🚫 Zero Stock SKUs", f"{zero_inventory_skus:,}")
-            col5.metric("✅ Available SKUs", f"{available_skus:,}")
-
-            # Pie Chart for Stock Distribution
-            stock_data = pd.DataFrame({
-                "Stock Status": ["Zero Stock", "With Stock"],
-                "Count": [zero_inventory_skus, available_skus]
-            })
-
-            if zero_inventory_skus > 0 or available_skus > 0:
-                fig_pie = px.pie(
-                    stock_data, 
-                    names="Stock Status", 
-                    values="Count", 
-                    title="📊 Zero Stock vs With Stock Distribution", 
-                    color="Stock Status",
-                    color_discrete_map={"Zero Stock": "red", "With Stock": "green"},
-                    hole=0.3
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
-
-            # Download Processed Data
-            output_file = df.to_csv(index=False).encode('utf-8')
-            st.download_button("📥 Download Processed Inventory", output_file, "processed_inventory.csv", "text/csv")
-
-def process_inventory_file(file):
-    """Processes the uploaded inventory file and returns a cleaned dataframe."""
-    try:
-        df = pd.read_excel(file)
-
-        required_columns = ["sku", "asin", "price", "quantity"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            st.error(f"❌ Missing columns: {', '.join(missing_columns)}")
-            return None
-
-        df = df[required_columns]
-        df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce").fillna(0).astype(int)
-        df["price"] = pd.to_numeric(df["price"], errors="coerce").fillna(0)
-
-        return df
-
-    except Exception as e:
-        st.error(f"⚠️ Error processing file: {e}")
-        return None
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from exports import export_buttons
+from datasets import session_upload, session_value
+from instrumentation import stage, timed
+from report_loader import load_report
+from report_schemas import SCHEMAS
+from report_store import remember_uploads
+from stock_cover import show_stock_cover
+from table_view import paged_table
+
+def process_inventory():
+    """Handles the UI and processing of inventory reports in Streamlit."""
+    st.markdown("<h1>📊Amazon Inventory Dashboard</h1>", unsafe_allow_html=True)
+    st.write("Upload your Excel file to generate insights on inventory.")
+
+    # File uploader inside the function
+    uploaded_file = session_upload("Amazon", "Inventory", "📂 Choose an Excel file", type=["xlsx"])
+
+    if uploaded_file is not None:
+        df = session_value("Amazon", "Inventory", "frame", lambda: process_inventory_file(uploaded_file))  # Call the helper function
+
+        if df is not None:
+            remember_uploads("Amazon", "Inventory", uploaded_file, df)
+            st.markdown("### 📝 Processed Inventory Report")
+            with stage("table: Processed Inventory Report"):
+                paged_table(df, key="amazon_inventory_table")
+
+            kpis, tables = summarize_inventory(df)
+
+            # Display Key Metrics
+            col1, col2, col3, col4, col5 = st.columns(5)
+            col1.metric("📦 Total Inventory", f"{kpis['total_inventory']:,}")
+            col2.metric("💰 Total Value", f"₹{kpis['total_value']:,}")
+            col3.metric("📊 Avg. Price", f"₹{kpis['avg_price']:,.2f}")
+            col4.metric("🚫 Zero Stock SKUs", f"{kpis['zero_inventory_skus']:,}")
+            col5.metric("✅ Available SKUs", f"{kpis['available_skus']:,}")
+
+            # Pie Chart for Stock Distribution
+            with stage("chart: Zero Stock vs With Stock Distribution"):
+                stock_data = tables["stock_data"]
+
+                if kpis['zero_inventory_skus'] > 0 or kpis['available_skus'] > 0:
+                    fig_pie = px.pie(
+                        stock_data, 
+                        names="Stock Status", 
+                        values="Count", 
+                        title="📊 Zero Stock vs With Stock Distribution", 
+                        color="Stock Status",
+                        color_discrete_map={"Zero Stock": "red", "With Stock": "green"},
+                        hole=0.3
+                    )
+                    st.plotly_chart(fig_pie, use_container_width=True)
+
+            # Download Processed Data
+            export_buttons(df, "processed_inventory", key="amazon_inventory_export", label="📥 Processed Inventory")
+
+            # Days of cover from order history
+            show_stock_cover("Amazon", df, "sku", "quantity")
+
+REQUIRED_COLUMNS = ["sku", "asin", "price", "quantity"]
+
+
+def clean_inventory(df):
+    """The inventory columns the dashboard uses, with missing prices as 0.
+
+    Raises ValueError when required columns are missing.
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing columns: {', '.join(missing_columns)}")
+    df = df[REQUIRED_COLUMNS]
+    return df.assign(price=df["price"].fillna(0))
+
+
+@timed("aggregate: inventory summary")
+def summarize_inventory(df):
+    """KPIs and the stock split of a cleaned Amazon inventory report, without Streamlit.
+
+    Returns (kpis, tables).
+    """
+    zero_inventory_skus = int((df["quantity"] == 0).sum())
+    available_skus = int((df["quantity"] > 0).sum())
+    kpis = {
+        "total_inventory": int(df["quantity"].sum()),
+        "total_value": int((df["price"] * df["quantity"]).sum()),
+        "avg_price": round(df["price"].mean(), 2),
+        "zero_inventory_skus": zero_inventory_skus,
+        "available_skus": available_skus,
+    }
+    tables = {
+        "stock_data": pd.DataFrame({
+            "Stock Status": ["Zero Stock", "With Stock"],
+            "Count": [zero_inventory_skus, available_skus],
+        }),
+    }
+    return kpis, tables
+
+
+def process_inventory_file(file):
+    """Processes the uploaded inventory file and returns a cleaned dataframe."""
+    try:
+        df = load_report(file, columns=REQUIRED_COLUMNS, schema=SCHEMAS[("Amazon", "Inventory")])
+        return clean_inventory(df)
+
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return None
+
+    except Exception as e:
+        st.error(f"⚠️ Error processing file: {e}")
+        return None
@@ -1,82 +1,333 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-
-def process_order_report():
-    # Streamlit App Title
-    st.markdown("<h1 style='text-align: center; color: #4A90E2;'>📊 Amazon Order Report Dashboard</h1>", unsafe_allow_html=True)
-
-    # File Uploader
-    st.sidebar.header("Upload Data")
-    uploaded_file = st.sidebar.file_uploader("Upload Amazon Order Report", type=["csv", "xlsx"])
-
-    if uploaded_file:
-        # Load Data
-        df = pd.read_csv(uploaded_file) if uploaded_file.name.endswith(".csv") else pd.read_excel(uploaded_file)
-
-        # Ensure Required Columns Exist
-        required_columns = ["purchase-date", "order-status", "fulfillment-channel", "item-price", "ship-city", "sku", "product-name"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            st.error(f"Missing columns: {', '.join(missing_columns)}")
-            return
-
-        # Convert Date Columns to Datetime and Remove Timezone
-        df["purchase-date"] = pd.to_datetime(df["purchase-date"], errors='coerce').dt.tz_localize(None)
-        df["last-updated-date"] = pd.to_datetime(df["last-updated-date"], errors='coerce').dt.tz_localize(None)
-
-        # Sidebar Filters
-        st.sidebar.header("Filters")
-        order_status = st.sidebar.multiselect("Order Status", df["order-status"].dropna().unique(), default=df["order-status"].dropna().unique())
-        fulfillment_channel = st.sidebar.multiselect("Fulfillment Channel", df["fulfillment-channel"].dropna().unique(), default=df["fulfillment-channel"].dropna().unique())
-
-        # Date Range Selection
-        min_date, max_date = df["purchase-date"].min().date(), df["purchase-date"].max().date()
-        date_range = st.sidebar.date_input("Select Date Range", [min_date, max_date])
-
-        start_date, end_date = pd.Timestamp(date_range[0]).tz_localize(None), pd.Timestamp(date_range[1]).tz_localize(None)
-
-        # Apply Filters
-        filtered_df = df[
-            df["order-status"].isin(order_status) &
-            df["fulfillment-channel"].isin(fulfillment_channel) &
-            df["purchase-date"].between(start_date, end_date)
-        ]
-
-        if filtered_df.empty:
-            st.warning("No records found matching the selected filters.")
-            return
-
-        # Summary Metrics
-        total_orders = filtered_df.shape[0]
-        total_revenue = filtered_df["item-price"].sum()
-        cancelled_orders = filtered_df[filtered_df["order-status"] == "Cancelled"].shape[0]
-
-        # Display Summary
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Total Orders", total_orders)
-        col2.metric("Total Revenue", f"Rs.{total_revenue:,.2f}")
-        col3.metric("Cancelled Orders", cancelled_orders)
-
-        # Orders Over Time Chart
-        orders_by_date = filtered_df.groupby(filtered_df["purchase-date"].dt.date).size().reset_index(name="Orders")
-        fig = px.line(orders_by_date, x="purchase-date", y="Orders", title="📈 Orders Over Time", markers=True)
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Top Cities Chart
-        top_cities = filtered_df["ship-city"].value_counts().head(10).reset_index()
-        top_cities.columns = ["City", "Orders"]
-        fig = px.bar(top_cities, x="City", y="Orders", title="🌆 Top Shipping Cities", color="Orders", text_auto=True)
-        st.plotly_chart(fig, use_container_width=True)
-
-        # Top Selling Products
-        repeated_products = filtered_df["product-name"].value_counts().reset_index()
-        repeated_products.columns = ["Product Name", "Purchase Count"]
-        st.markdown("### 🔥 Most Repeatedly Purchased Products")
-        st.dataframe(repeated_products.head(10))
-
-        # Top Selling SKUs
-        top_skus = filtered_df["sku"].value_counts().reset_index()
-        top_skus.columns = ["SKU", "Order Count"]
-        st.markdown("### 🏆 Top Selling SKUs")
-        st.dataframe(top_skus.head(10))
+from collections import OrderedDict
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from charts import line_chart
+from datasets import session_upload, session_value
+from instrumentation import stage, timed
+from jobs import parse_pool, previewed_value
+from report_loader import file_kind, load_report, read_header
+from report_schemas import SCHEMAS, drop_unused_categories
+from filter_index import get_filter_index
+from report_store import history_source, remember_uploads
+from sampling import estimate_count, estimate_groups, estimate_total, format_estimate, format_rows, sample_note, sample_report
+from sketches import HyperLogLog, SpaceSaving, hll_groups
+from sku_aggregation import upload_key
+
+# Streaming mode reads the CSV in chunks and keeps only grouped partial
+# aggregates, so memory depends on distinct keys rather than row count.
+# Ranked columns are counted in Space-Saving sketches of at most
+# STREAM_TOP_CAPACITY (filter keys, value) pairs, and distinct orders in one
+# HyperLogLog per filter key, so neither grows with the number of products
+# or orders.
+STREAM_CHUNK_ROWS = 200_000
+STREAM_COLUMNS = ["purchase-date", "order-status", "fulfillment-channel", "item-price", "ship-city", "sku", "product-name"]
+STREAM_KEYS = ["purchase-date", "order-status", "fulfillment-channel"]
+STREAM_RANKED = ["ship-city", "sku", "product-name"]
+STREAM_ORDER_ID = "amazon-order-id"
+STREAM_TOP_CAPACITY = 200_000
+STREAM_HLL_PRECISION = 12  # ~1.6% error, 4 KB per filter key
+_COMPACT_EVERY = 20
+_stream_cache = OrderedDict()
+
+
+def _compact(partials):
+    combined = pd.concat(partials)
+    return [combined.groupby(level=list(range(combined.index.nlevels))).sum()]
+
+
+def aggregate_order_chunks(source, chunksize=STREAM_CHUNK_ROWS):
+    """Fold an Amazon order CSV into the dashboard aggregates chunk by chunk.
+
+    Returns a dict with a "daily" frame (orders, revenue) indexed by day,
+    status and channel, plus one count series per ranked column indexed by
+    the same keys and that column (exact unless its sketch in "sketches"
+    overflowed) and, when the report has order ids, a HyperLogLog of them
+    per key in "unique orders". Filters can then be applied to these
+    aggregates without touching the raw rows again.
+    """
+    partials = []
+    ranked = {col: SpaceSaving(STREAM_TOP_CAPACITY) for col in STREAM_RANKED}
+    orders = {}
+    wanted = set(STREAM_COLUMNS + [STREAM_ORDER_ID])
+    for chunk in pd.read_csv(source, usecols=lambda col: col in wanted, chunksize=chunksize):
+        chunk["purchase-date"] = (
+            pd.to_datetime(chunk["purchase-date"], errors="coerce").dt.tz_localize(None).dt.normalize()
+        )
+        chunk["item-price"] = pd.to_numeric(chunk["item-price"], errors="coerce").fillna(0)
+
+        grouped = chunk.groupby(STREAM_KEYS)
+        partials.append(pd.DataFrame({"orders": grouped.size(), "revenue": grouped["item-price"].sum()}))
+        for col in STREAM_RANKED:
+            ranked[col].update(chunk.groupby(STREAM_KEYS + [col]).size())
+        if STREAM_ORDER_ID in chunk.columns:
+            codes = grouped.ngroup().fillna(-1).astype(int).to_numpy()
+            sketches = hll_groups(chunk[STREAM_ORDER_ID], codes, grouped.ngroups, STREAM_HLL_PRECISION)
+            for key, sketch in zip(grouped.size().index, sketches):
+                orders[key] = orders[key].merge(sketch) if key in orders else sketch
+
+        if len(partials) >= _COMPACT_EVERY:
+            partials = _compact(partials)
+
+    if not partials:
+        return {}
+    aggregates = {"daily": _compact(partials)[0], "sketches": ranked}
+    aggregates.update({col: sketch.counts for col, sketch in ranked.items()})
+    if orders:
+        aggregates["unique orders"] = orders
+    return aggregates
+
+
+def _streamed_aggregates(uploaded_file):
+    """Aggregate once per upload; reruns and filter changes reuse the result."""
+    key = upload_key(uploaded_file)
+    uploaded_file.seek(0)
+
+    if key not in _stream_cache:
+        with st.spinner("Streaming order report..."), stage("aggregate: streamed chunks"):
+            _stream_cache[key] = aggregate_order_chunks(uploaded_file)
+        while len(_stream_cache) > 4:
+            _stream_cache.popitem(last=False)
+    _stream_cache.move_to_end(key)
+    return _stream_cache[key]
+
+
+def _top_counts(counts, mask, col, label, count_label, n=10):
+    top = counts[mask].groupby(level=col).sum().nlargest(n).round().astype("int64").reset_index()
+    top.columns = [label, count_label]
+    return top
+
+
+def render_streamed_orders(aggregates):
+    """Dashboard for streaming mode, driven purely by the chunk aggregates."""
+    if "daily" not in aggregates:
+        st.warning("No records found in the uploaded report.")
+        return
+    daily = aggregates["daily"]
+    days = daily.index.get_level_values("purchase-date")
+    statuses = daily.index.get_level_values("order-status")
+    channels = daily.index.get_level_values("fulfillment-channel")
+
+    # Sidebar Filters
+    st.sidebar.header("Filters")
+    status_options = statuses.unique()
+    channel_options = channels.unique()
+    order_status = st.sidebar.multiselect("Order Status", status_options, default=status_options)
+    fulfillment_channel = st.sidebar.multiselect("Fulfillment Channel", channel_options, default=channel_options)
+    date_range = st.sidebar.date_input("Select Date Range", [days.min().date(), days.max().date()])
+    start_date, end_date = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[-1])
+
+    def key_mask(index):
+        return (
+            index.get_level_values("order-status").isin(order_status)
+            & index.get_level_values("fulfillment-channel").isin(fulfillment_channel)
+            & (index.get_level_values("purchase-date") >= start_date)
+            & (index.get_level_values("purchase-date") <= end_date)
+        )
+
+    with stage("filter"):
+        filtered = daily[key_mask(daily.index)]
+    if filtered.empty:
+        st.warning("No records found matching the selected filters.")
+        return
+
+    # Summary Metrics
+    with stage("aggregate: summary metrics"):
+        total_orders = int(filtered["orders"].sum())
+        total_revenue = filtered["revenue"].sum()
+        cancelled_orders = int(filtered.loc[filtered.index.get_level_values("order-status") == "Cancelled", "orders"].sum())
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Orders", total_orders)
+    col2.metric("Total Revenue", f"Rs.{total_revenue:,.2f}")
+    col3.metric("Cancelled Orders", cancelled_orders)
+    if "unique orders" in aggregates:
+        with stage("aggregate: unique orders"):
+            sketches = aggregates["unique orders"]
+            keys = pd.MultiIndex.from_tuples(list(sketches), names=STREAM_KEYS)
+            selected = [sketches[key] for key in keys[key_mask(keys)]]
+            unique_orders = HyperLogLog.union(selected, STREAM_HLL_PRECISION).count()
+        col4.metric("Unique Orders", f"≈ {unique_orders:,}", help="HyperLogLog estimate, typically within 2%.")
+
+    overflowed = {col: sketch.floor for col, sketch in aggregates["sketches"].items() if not sketch.exact}
+    if overflowed:
+        st.caption("ℹ️ Top lists are approximate for " + ", ".join(
+            f"{col} (counts may be over by up to {floor:,.0f})" for col, floor in overflowed.items()))
+
+    # Orders Over Time Chart
+    with stage("chart: Orders Over Time"):
+        orders_by_date = filtered.groupby(level="purchase-date")["orders"].sum().reset_index(name="Orders")
+        fig = line_chart(orders_by_date, x="purchase-date", y="Orders", title="📈 Orders Over Time", markers=True)
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Top Cities Chart
+    with stage("chart: Top Shipping Cities"):
+        cities = aggregates["ship-city"]
+        top_cities = _top_counts(cities, key_mask(cities.index), "ship-city", "City", "Orders")
+        fig = px.bar(top_cities, x="City", y="Orders", title="🌆 Top Shipping Cities", color="Orders", text_auto=True)
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Top Selling Products
+    with stage("table: Most Repeatedly Purchased Products"):
+        products = aggregates["product-name"]
+        st.markdown("### 🔥 Most Repeatedly Purchased Products")
+        st.dataframe(_top_counts(products, key_mask(products.index), "product-name", "Product Name", "Purchase Count"))
+
+    # Top Selling SKUs
+    with stage("table: Top Selling SKUs"):
+        skus = aggregates["sku"]
+        st.markdown("### 🏆 Top Selling SKUs")
+        st.dataframe(_top_counts(skus, key_mask(skus.index), "sku", "SKU", "Order Count"))
+
+
+def filter_amazon_orders(df, statuses, channels, start, end):
+    """Rows of an Amazon order report with the given statuses and channels, purchased between start and end."""
+    index = get_filter_index(df, "purchase-date", ["order-status", "fulfillment-channel"])
+    rows = index.select({"order-status": statuses, "fulfillment-channel": channels}, start, end)
+    return drop_unused_categories(df.take(rows))
+
+
+def _top_values(series, label, count_label, n=10):
+    top = series.value_counts().head(n).reset_index()
+    top.columns = [label, count_label]
+    return top
+
+
+@timed("aggregate: order summary")
+def summarize_amazon_orders(df):
+    """KPIs and tables of a (filtered) Amazon order report, without Streamlit.
+
+    Returns (kpis, tables).
+    """
+    kpis = {
+        "total_orders": df.shape[0],
+        "total_revenue": df["item-price"].sum(),
+        "cancelled_orders": df[df["order-status"] == "Cancelled"].shape[0],
+    }
+    tables = {
+        "orders_by_date": df.groupby(df["purchase-date"].dt.date).size().reset_index(name="Orders"),
+        "top_cities": _top_values(df["ship-city"], "City", "Orders"),
+        "top_products": _top_values(df["product-name"], "Product Name", "Purchase Count"),
+        "top_skus": _top_values(df["sku"], "SKU", "Order Count"),
+    }
+    return kpis, tables
+
+
+def show_order_preview(sample):
+    """Summary metrics, top cities and top products estimated from a sample of the report."""
+    st.info(sample_note(sample))
+    frame = sample.frame
+    revenue = estimate_total(sample, frame["item-price"]) if "item-price" in frame.columns else (0, 0)
+    cancelled = estimate_count(sample, frame["order-status"] == "Cancelled") if "order-status" in frame.columns else (0, 0)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Orders", format_rows(sample))
+    col2.metric("Total Revenue", format_estimate(*revenue, "Rs.{:,.2f}"))
+    col3.metric("Cancelled Orders", format_estimate(*cancelled))
+
+    if "ship-city" in frame.columns:
+        top_cities = estimate_groups(sample, "ship-city").rename(columns={"ship-city": "City", "estimate": "Orders"})
+        fig = px.bar(top_cities, x="City", y="Orders", error_y="margin", title="🌆 Top Shipping Cities (estimated)")
+        st.plotly_chart(fig, use_container_width=True)
+
+    if "product-name" in frame.columns:
+        st.markdown("### 🔥 Most Repeatedly Purchased Products (estimated)")
+        top_products = estimate_groups(sample, "product-name")
+        st.dataframe(pd.DataFrame({
+            "Product Name": top_products["product-name"],
+            "Purchase Count": [format_estimate(value, margin) for value, margin in zip(top_products["estimate"], top_products["margin"])],
+        }))
+
+
+def process_order_report():
+    # Streamlit App Title
+    st.markdown("<h1 style='text-align: center; color: #4A90E2;'>📊 Amazon Order Report Dashboard</h1>", unsafe_allow_html=True)
+
+    # File Uploader
+    st.sidebar.header("Upload Data")
+    uploaded_file = session_upload("Amazon", "Orders", "Upload Amazon Order Report", type=["csv", "xlsx"], container=st.sidebar)
+    streaming = st.sidebar.toggle("Streaming mode (large CSV)", help="Read the CSV in chunks and keep only aggregates in memory.")
+    preview = st.sidebar.toggle("⚡ Preview from a sample", help="For large CSV uploads: show estimates from a row sample while the full report loads.")
+
+    if streaming and uploaded_file and file_kind(uploaded_file) == "csv":
+        missing_columns = [col for col in STREAM_COLUMNS if col not in read_header(uploaded_file)]
+        if missing_columns:
+            st.error(f"Missing columns: {', '.join(missing_columns)}")
+            return
+        render_streamed_orders(_streamed_aggregates(uploaded_file))
+        return
+
+    required_columns = ["purchase-date", "order-status", "fulfillment-channel", "item-price", "ship-city", "sku", "product-name"]
+    history = history_source("Amazon", "Orders", columns=required_columns)
+
+    if uploaded_file or history is not None:
+        if history is not None:
+            df = history
+        else:
+            schema = SCHEMAS[("Amazon", "Orders")]
+            # Load only the columns this dashboard uses, plus the order id the history store keys on
+            load_columns = required_columns + ["amazon-order-id"]
+            if preview and file_kind(uploaded_file) == "csv":
+                df = previewed_value(
+                    "Amazon", "Orders", "frame",
+                    lambda: sample_report(uploaded_file, columns=required_columns, schema=schema),
+                    lambda: load_report(uploaded_file, columns=load_columns, schema=schema, executor=parse_pool()),
+                    show_order_preview, "Parsing the order report",
+                )
+                if df is None:
+                    return
+            else:
+                df = session_value("Amazon", "Orders", "frame", lambda: load_report(uploaded_file, columns=load_columns, schema=schema))
+            remember_uploads("Amazon", "Orders", uploaded_file, df)
+
+        # Ensure Required Columns Exist
+        missing_columns = [col for col in required_columns if col not in df.columns]
+        if missing_columns:
+            st.error(f"Missing columns: {', '.join(missing_columns)}")
+            return
+
+        # Sidebar Filters
+        st.sidebar.header("Filters")
+        order_status = st.sidebar.multiselect("Order Status", df["order-status"].dropna().unique(), default=df["order-status"].dropna().unique())
+        fulfillment_channel = st.sidebar.multiselect("Fulfillment Channel", df["fulfillment-channel"].dropna().unique(), default=df["fulfillment-channel"].dropna().unique())
+
+        # Date Range Selection
+        min_date, max_date = df["purchase-date"].min().date(), df["purchase-date"].max().date()
+        date_range = st.sidebar.date_input("Select Date Range", [min_date, max_date])
+
+        start_date, end_date = pd.Timestamp(date_range[0]).tz_localize(None), pd.Timestamp(date_range[1]).tz_localize(None)
+
+        # Apply Filters (index is built once per upload)
+        with stage("filter"):
+            filtered_df = filter_amazon_orders(df, order_status, fulfillment_channel, start_date, end_date)
+
+        if filtered_df.empty:
+            st.warning("No records found matching the selected filters.")
+            return
+
+        kpis, tables = summarize_amazon_orders(filtered_df)
+
+        # Display Summary
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total Orders", kpis["total_orders"])
+        col2.metric("Total Revenue", f"Rs.{kpis['total_revenue']:,.2f}")
+        col3.metric("Cancelled Orders", kpis["cancelled_orders"])
+
+        # Orders Over Time Chart
+        with stage("chart: Orders Over Time"):
+            fig = line_chart(tables["orders_by_date"], x="purchase-date", y="Orders", title="📈 Orders Over Time", markers=True)
+            st.plotly_chart(fig, use_container_width=True)
+
+        # Top Cities Chart
+        with stage("chart: Top Shipping Cities"):
+            fig = px.bar(tables["top_cities"], x="City", y="Orders", title="🌆 Top Shipping Cities", color="Orders", text_auto=True)
+            st.plotly_chart(fig, use_container_width=True)
+
+        # Top Selling Products
+        st.markdown("### 🔥 Most Repeatedly Purchased Products")
+        st.dataframe(tables["top_products"])
+
+        # Top Selling SKUs
+        st.markdown("### 🏆 Top Selling SKUs")
+        st.dataframe(tables["top_skus"])
@@ -1,104 +1,156 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-from datetime import datetime
-
-def process_return_report():
-    st.markdown("<h2 style='text-align: center; color: #E24A4A;'>🔄 Amazon Return Report Dashboard</h2>", unsafe_allow_html=True)
-
-    # File Uploader
-    uploaded_file = st.sidebar.file_uploader("Upload Amazon Return Report", type=["csv", "xlsx"])
-
-    if uploaded_file:
-        # Read the file
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
-        else:
-            df = pd.read_excel(uploaded_file)
-        
-        st.markdown("### 📋 Raw Data Preview")
-        st.dataframe(df.head())
-
-        # Standardize Column Names
-        df.columns = df.columns.str.strip().str.lower()
-
-        # Convert columns to datetime
-        date_columns = ["order date", "return request date", "return delivery date", "safet claim creation time"]
-        for col in date_columns:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-
-        # Convert numeric columns to appropriate types
-        numeric_columns = ["refunded amount", "order amount"]
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-        # Filters
-        st.sidebar.header("Filters")
-        return_status = df["return request status"].dropna().unique() if "return request status" in df.columns else []
-        return_reason = df["return reason"].dropna().unique() if "return reason" in df.columns else []
-
-        if return_status.any():
-            selected_status = st.sidebar.multiselect("Filter by Return Request Status", options=return_status, default=return_status)
-        if return_reason.any():
-            selected_reason = st.sidebar.multiselect("Filter by Return Reason", options=return_reason, default=return_reason)
-
-        # Date Filter
-        if "order date" in df.columns:
-            date_range = st.sidebar.date_input("Select Order Date Range", [df["order date"].min().date(), df["order date"].max().date()])
-            start_date, end_date = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
-        else:
-            start_date, end_date = None, None
-
-        # Apply Filters
-        filtered_df = df.copy()
-        if "return request status" in df.columns and selected_status:
-            filtered_df = filtered_df[filtered_df["return request status"].isin(selected_status)]
-        if "return reason" in df.columns and selected_reason:
-            filtered_df = filtered_df[filtered_df["return reason"].isin(selected_reason)]
-        if "order date" in df.columns and start_date and end_date:
-            filtered_df = filtered_df[filtered_df["order date"].between(start_date, end_date)]
-
-        st.markdown("### 🔍 Filtered Data Preview")
-        st.dataframe(filtered_df.head())
-
-        # Summary Metrics
-        total_returns = filtered_df.shape[0]
-        total_refunded_amount = filtered_df["refunded amount"].sum() if "refunded amount" in filtered_df.columns else 0
-        total_order_amount = filtered_df["order amount"].sum() if "order amount" in filtered_df.columns else 0
-
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Total Return Requests", total_returns)
-        with col2:
-            st.metric("Total Refunded Amount", f"Rs.{total_refunded_amount:,.2f}")
-        with col3:
-            st.metric("Total Order Amount", f"Rs.{total_order_amount:,.2f}")
-
-        # Returns Over Time Chart
-        if "return request date" in filtered_df.columns:
-            returns_by_date = filtered_df.groupby(filtered_df["return request date"].dt.date).size().reset_index(name="Returns")
-            fig = px.line(returns_by_date, x="return request date", y="Returns", title="📉 Return Requests Over Time", markers=True)
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Top Return Reasons
-        if "return reason" in filtered_df.columns:
-            top_reasons = filtered_df["return reason"].value_counts().reset_index()
-            top_reasons.columns = ["Return Reason", "Count"]
-            fig = px.bar(top_reasons.head(10), x="Return Reason", y="Count", title="🔝 Top Return Reasons", color="Count", text_auto=True)
-            st.plotly_chart(fig, use_container_width=True)
-
-        # Top Returned SKUs
-        if "merchant sku" in filtered_df.columns:
-            top_returned_skus = filtered_df["merchant sku"].value_counts().reset_index()
-            top_returned_skus.columns = ["SKU", "Return Count"]
-            st.markdown("### 🏆 Top Returned SKUs")
-            st.dataframe(top_returned_skus.head(10))
-
-        # Top Returned Product Names
-        if "item name" in filtered_df.columns:
-            top_returned_products = filtered_df["item name"].value_counts().reset_index()
-            top_returned_products.columns = ["Product Name", "Return Count"]
-            st.markdown("### 🔥 Most Frequently Returned Products")
-            st.dataframe(top_returned_products.head(10))
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import datetime
+from charts import line_chart
+from datasets import session_upload, session_value
+from instrumentation import stage, timed
+from report_loader import load_report
+from report_schemas import SCHEMAS, drop_unused_categories
+from filter_index import get_filter_index
+from report_store import history_source, remember_uploads
+from return_join import order_columns, render_return_rates, return_rates
+
+
+AMOUNT_COLUMNS = ["refunded amount", "order amount"]
+FILTER_COLUMNS = ["return request status", "return reason"]
+
+
+def prepare_amazon_returns(df):
+    """Copy of an Amazon return report with lowercase headers and missing amounts as 0.
+
+    Dates and amounts are already typed by the schema.
+    """
+    df = df.rename(columns=lambda col: str(col).strip().lower())
+    return df.assign(**{col: df[col].fillna(0) for col in AMOUNT_COLUMNS if col in df.columns})
+
+
+def filter_amazon_returns(df, filters, start=None, end=None):
+    """Rows of a prepared return report matching filters (column -> values, None for all) ordered between start and end."""
+    index = get_filter_index(df, "order date" if "order date" in df.columns else None, FILTER_COLUMNS)
+    return drop_unused_categories(df.take(index.select(filters, start, end)))
+
+
+def _top_values(series, label, count_label, n=None):
+    top = series.value_counts()
+    if n is not None:
+        top = top.head(n)
+    top = top.reset_index()
+    top.columns = [label, count_label]
+    return top
+
+
+@timed("aggregate: return summary")
+def summarize_amazon_returns(df):
+    """KPIs and tables of a prepared (and filtered) Amazon return report, without Streamlit.
+
+    Returns (kpis, tables); tables only holds what the report's columns allow.
+    """
+    has = set(df.columns)
+    kpis = {
+        "total_returns": df.shape[0],
+        "total_refunded_amount": df["refunded amount"].sum() if "refunded amount" in has else 0,
+        "total_order_amount": df["order amount"].sum() if "order amount" in has else 0,
+    }
+    tables = {}
+    if "return request date" in has:
+        tables["returns_by_date"] = df.groupby(df["return request date"].dt.date).size().reset_index(name="Returns")
+    if "return reason" in has:
+        tables["top_reasons"] = _top_values(df["return reason"], "Return Reason", "Count")
+    if "merchant sku" in has:
+        tables["top_skus"] = _top_values(df["merchant sku"], "SKU", "Return Count", 10)
+    if "item name" in has:
+        tables["top_products"] = _top_values(df["item name"], "Product Name", "Return Count", 10)
+    return kpis, tables
+
+
+def process_return_report():
+    st.markdown("<h2 style='text-align: center; color: #E24A4A;'>🔄 Amazon Return Report Dashboard</h2>", unsafe_allow_html=True)
+
+    # File Uploader
+    uploaded_file = session_upload("Amazon", "Returns", "Upload Amazon Return Report", type=["csv", "xlsx"], container=st.sidebar)
+    order_file = session_upload("Amazon", "Orders", "Link Amazon Order Report (for return rates)", type=["csv", "xlsx"], key="amazon_return_orders", container=st.sidebar)
+
+    history = history_source("Amazon", "Returns")
+
+    if uploaded_file or history is not None:
+        # Read the file, or the stored history for the chosen period
+        if history is not None:
+            df = history
+        else:
+            df = session_value("Amazon", "Returns", "frame", lambda: load_report(uploaded_file, schema=SCHEMAS[("Amazon", "Returns")]))
+            remember_uploads("Amazon", "Returns", uploaded_file, df)
+        
+        st.markdown("### 📋 Raw Data Preview")
+        st.dataframe(df.head())
+
+        df = prepare_amazon_returns(df)
+
+        # Filters
+        st.sidebar.header("Filters")
+        return_status = df["return request status"].dropna().unique() if "return request status" in df.columns else []
+        return_reason = df["return reason"].dropna().unique() if "return reason" in df.columns else []
+
+        if len(return_status) > 0:
+            selected_status = st.sidebar.multiselect("Filter by Return Request Status", options=return_status, default=return_status)
+        if len(return_reason) > 0:
+            selected_reason = st.sidebar.multiselect("Filter by Return Reason", options=return_reason, default=return_reason)
+
+        # Date Filter
+        if "order date" in df.columns:
+            date_range = st.sidebar.date_input("Select Order Date Range", [df["order date"].min().date(), df["order date"].max().date()])
+            start_date, end_date = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+        else:
+            start_date, end_date = None, None
+
+        # Apply Filters (index is built once per upload)
+        with stage("filter"):
+            filters = {
+                "return request status": selected_status if len(return_status) > 0 and selected_status else None,
+                "return reason": selected_reason if len(return_reason) > 0 and selected_reason else None,
+            }
+            filtered_df = filter_amazon_returns(df, filters, start_date, end_date)
+
+        st.markdown("### 🔍 Filtered Data Preview")
+        with stage("table: Filtered Data Preview"):
+            st.dataframe(filtered_df.head())
+
+        kpis, tables = summarize_amazon_returns(filtered_df)
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Return Requests", kpis["total_returns"])
+        with col2:
+            st.metric("Total Refunded Amount", f"Rs.{kpis['total_refunded_amount']:,.2f}")
+        with col3:
+            st.metric("Total Order Amount", f"Rs.{kpis['total_order_amount']:,.2f}")
+
+        # Returns Over Time Chart
+        if "returns_by_date" in tables:
+            with stage("chart: Return Requests Over Time"):
+                fig = line_chart(tables["returns_by_date"], x="return request date", y="Returns", title="📉 Return Requests Over Time", markers=True)
+                st.plotly_chart(fig, use_container_width=True)
+
+        # Top Return Reasons
+        if "top_reasons" in tables:
+            with stage("chart: Top Return Reasons"):
+                fig = px.bar(tables["top_reasons"].head(10), x="Return Reason", y="Count", title="🔝 Top Return Reasons", color="Count", text_auto=True)
+                st.plotly_chart(fig, use_container_width=True)
+
+        # Top Returned SKUs
+        if "top_skus" in tables:
+            st.markdown("### 🏆 Top Returned SKUs")
+            st.dataframe(tables["top_skus"])
+
+        # Top Returned Product Names
+        if "top_products" in tables:
+            st.markdown("### 🔥 Most Frequently Returned Products")
+            st.dataframe(tables["top_products"])
+
+        # Return rates against the linked order report (all returns, before filters)
+        if order_file:
+            try:
+                orders = session_value("Amazon", "Orders", "order lines", lambda: load_report(order_file, columns=order_columns("Amazon"), schema=SCHEMAS[("Amazon", "Orders")]))
+                render_return_rates(return_rates(orders, df, "Amazon"), "amazon_return_min_orders")
+            except Exception as e:
+                st.error(f"Error linking order report: {e}")
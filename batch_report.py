@@ -0,0 +1,128 @@
+"""Generate report KPIs and tables for a directory of exports, without Streamlit.
+
+    python batch_report.py exports/ summaries/ --workers 8
+
+Every .csv/.xlsx under the export directory is matched to a report type by
+its header, then summarized in a process pool. Each file gets a folder under
+the output directory holding kpis.json and one CSV per table, and
+batch_summary.json lists what happened to every file.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from report_loader import read_header, set_cache_budget
+
+# (platform, report) -> (header columns that identify the export, module,
+# loader, summarizer). Loaders take a path; summarizers return (kpis, tables).
+BATCH_REPORTS = {
+    ("Ajio", "Orders"): (
+        {"seller sku", "order qty", "customer cancelled qty", "sla status"},
+        "ajio_order", "load_ajio_orders", "summarize_ajio_orders",
+    ),
+    ("Flipkart", "Orders"): (
+        {"order_item_id", "order_id", "order_item_status"},
+        "flipkart_order", "load_flipkart_orders", "summarize_flipkart_orders",
+    ),
+    ("Myntra", "Returns"): (
+        {"return_id", "style_id", "is_refunded"},
+        "myntra_return_app", "load_myntra_returns", "summarize_myntra_returns",
+    ),
+}
+
+EXPORT_EXTENSIONS = (".csv", ".xlsx")
+
+
+def detect_report(path):
+    """(platform, report) whose identifying columns all appear in the header, or None."""
+    header = {str(name).strip().lower() for name in read_header(path)}
+    matches = [key for key, (signature, *_) in BATCH_REPORTS.items() if signature <= header]
+    # Prefer the most specific signature when several match
+    return max(matches, key=lambda key: len(BATCH_REPORTS[key][0]), default=None)
+
+
+def find_exports(directory):
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(EXPORT_EXTENSIONS) and not name.startswith("~$"):
+                yield os.path.join(root, name)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def write_outputs(out_dir, kpis, tables):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "kpis.json"), "w", encoding="utf-8") as fh:
+        json.dump(kpis, fh, indent=2, default=_json_default)
+    for name, table in tables.items():
+        table.to_csv(os.path.join(out_dir, f"{name}.csv"), index=table.index.name is not None)
+
+
+def summarize_file(path, export_dir, output_dir):
+    """Detect, load and summarize one export; runs inside a worker process."""
+    result = {"file": os.path.relpath(path, export_dir)}
+    try:
+        key = detect_report(path)
+        if key is None:
+            result["status"] = "skipped"
+            result["error"] = "unrecognised report layout"
+            return result
+
+        _, module_name, loader, summarizer = BATCH_REPORTS[key]
+        module = importlib.import_module(module_name)
+        kpis, tables = getattr(module, summarizer)(getattr(module, loader)(path))
+
+        out_dir = os.path.join(output_dir, os.path.splitext(result["file"])[0])
+        write_outputs(out_dir, kpis, tables)
+        result.update(status="ok", platform=key[0], report=key[1], output=out_dir)
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+    return result
+
+
+def _init_worker():
+    # Each file is read once, so the parse cache would only hold memory.
+    set_cache_budget(0)
+
+
+def run_batch(export_dir, output_dir, workers=None):
+    paths = list(find_exports(export_dir))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(summarize_file, path, export_dir, output_dir) for path in paths]
+        for future in as_completed(futures):
+            result = future.result()
+            print(f"[{result['status']}] {result['file']}", result.get("error", ""), flush=True)
+            results.append(result)
+
+    results.sort(key=lambda result: result["file"])
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "batch_summary.json"), "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a directory of marketplace exports.")
+    parser.add_argument("export_dir", help="directory searched recursively for .csv/.xlsx exports")
+    parser.add_argument("output_dir", help="where KPIs and tables are written")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    results = run_batch(args.export_dir, args.output_dir, args.workers)
+    failed = sum(result["status"] == "failed" for result in results)
+    print(f"{len(results)} files: {len(results) - failed} done, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,546 @@
+"""Synthetic marketplace exports for the benchmark suite.
+
+Every generator returns one chunk of a report with the columns (and the
+quirks: prefixed ids, padded headers, blank cells, text in numeric
+columns) of the real export, so loading and coercion do the same work
+they do on a seller's file. Chunks are deterministic for a seed and their
+ids never collide, so any size can be written chunk by chunk:
+
+    python benchmarks/generators.py "Flipkart" "Orders" 100000 flipkart_orders.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+START_DATE = np.datetime64("2025-01-01T00:00:00")
+PERIOD_DAYS = 180
+
+# Excel's sheet limit, header row included
+XLSX_MAX_ROWS = 1_048_575
+
+CHUNK_ROWS = 250_000
+
+CITIES = ["MUMBAI", "BENGALURU", "NEW DELHI", "HYDERABAD", "CHENNAI", "PUNE", "KOLKATA", "AHMEDABAD",
+          "JAIPUR", "LUCKNOW", "SURAT", "INDORE", "NAGPUR", "PATNA", "BHOPAL", "ONGOLE", "KOCHI", "GUWAHATI"]
+STATES = ["MAHARASHTRA", "KARNATAKA", "DELHI", "TELANGANA", "TAMIL NADU", "GUJARAT", "WEST BENGAL",
+          "RAJASTHAN", "UTTAR PRADESH", "MADHYA PRADESH", "BIHAR", "ANDHRA PRADESH", "KERALA", "ASSAM"]
+STATE_CODES = ["MH", "KA", "DL", "TG", "TN", "GJ", "WB", "RJ", "UP", "MP", "BR", "AP", "KL", "AS"]
+COLOURS = ["WHITE", "BLACK", "NAVY", "OLIVE", "MAROON", "GREY", "PURPLE_WINE", "SKY_BLUE", "MUSTARD"]
+SIZES = ["S", "M", "L", "XL", "XXL"]
+PRODUCTS = ["Men Solid Casual Shirt", "Women Printed Kurta", "Pregnancy Loungewear Set", "Men Slim Fit Jeans",
+            "Women Cotton Nightsuit", "Kids Graphic T-Shirt", "Men Regular Fit Polo", "Women Palazzo Pants"]
+
+
+def _choice(rng, values, n, p=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=p)]
+
+
+def _weights(*weights):
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+
+def catalog_size(total_rows):
+    """Distinct SKUs of a seller with total_rows lines in a report."""
+    return int(min(max(total_rows // 40, 50), 50_000))
+
+
+def _sku_numbers(rng, n, total_rows):
+    # Zipf-skewed: a few best sellers, a long tail of slow movers
+    return (rng.zipf(1.3, size=n) - 1) % catalog_size(total_rows)
+
+
+def _skus(numbers, prefix=""):
+    numbers = pd.Series(numbers)
+    colour = np.asarray(COLOURS, dtype=object)[numbers.to_numpy() % len(COLOURS)]
+    size = np.asarray(SIZES, dtype=object)[numbers.to_numpy() // len(COLOURS) % len(SIZES)]
+    return (prefix + "SH" + numbers.astype(str).str.zfill(5) + "_" + colour + "_" + size).to_numpy(dtype=object)
+
+
+def _titles(numbers):
+    return np.asarray(PRODUCTS, dtype=object)[np.asarray(numbers) % len(PRODUCTS)]
+
+
+def _timestamps(rng, n, offset_days=0, spread_days=PERIOD_DAYS):
+    seconds = rng.integers(0, spread_days * 86_400, size=n)
+    return START_DATE + np.timedelta64(offset_days, "D") + seconds.astype("timedelta64[s]")
+
+
+def _later(rng, stamps, low_days, high_days, missing=0.0):
+    later = stamps + (rng.uniform(low_days, high_days, size=len(stamps)) * 86_400).astype("timedelta64[s]")
+    later = later.astype("datetime64[s]")
+    if missing:
+        later[rng.random(len(stamps)) < missing] = np.datetime64("NaT")
+    return later
+
+
+def _ids(prefix, numbers, width):
+    return (prefix + pd.Series(numbers).astype(str).str.zfill(width)).to_numpy(dtype=object)
+
+
+def _money(rng, n, low, high):
+    return np.round(rng.uniform(low, high, size=n), 2)
+
+
+def _blank(n):
+    return np.full(n, np.nan)
+
+
+def amazon_orders(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    order = line * 10 // 13  # about 1.3 lines per order
+    skus = _sku_numbers(rng, n, total_rows)
+    purchased = _timestamps(rng, n)
+    quantity = rng.choice([1, 1, 1, 1, 2, 3], size=n)
+    return pd.DataFrame({
+        "amazon-order-id": ("40" + pd.Series(order % 10).astype(str) + "-" + pd.Series(order // 10 % 10_000_000).astype(str).str.zfill(7)
+                            + "-" + pd.Series(order * 7_919 % 10_000_000).astype(str).str.zfill(7)).to_numpy(dtype=object),
+        "merchant-order-id": _blank(n),
+        "purchase-date": purchased,
+        "last-updated-date": _later(rng, purchased, 0.5, 12),
+        "order-status": _choice(rng, ["Shipped - Delivered to Buyer", "Shipped", "Cancelled", "Pending", "Shipped - Returned to Seller"],
+                                n, _weights(70, 12, 10, 3, 5)),
+        "fulfillment-channel": _choice(rng, ["Merchant", "Amazon"], n, _weights(65, 35)),
+        "sales-channel": "Amazon.in",
+        "order-channel": "WebsiteOrderChannel",
+        "url": _blank(n),
+        "ship-service-level": _choice(rng, ["Standard", "Expedited"], n, _weights(85, 15)),
+        "product-name": _titles(skus),
+        "sku": _skus(skus),
+        "asin": _ids("B0D", skus, 7),
+        "item-status": _choice(rng, ["Shipped", "Unshipped", "Cancelled"], n, _weights(85, 5, 10)),
+        "quantity": quantity,
+        "currency": "INR",
+        "item-price": quantity * _money(rng, n, 249, 1_999),
+        "item-tax": _money(rng, n, 10, 120),
+        "shipping-price": _blank(n),
+        "shipping-tax": _blank(n),
+        "gift-wrap-price": _blank(n),
+        "gift-wrap-tax": _blank(n),
+        "item-promotion-discount": np.where(rng.random(n) < 0.2, _money(rng, n, 20, 200), np.nan),
+        "ship-promotion-discount": _blank(n),
+        "ship-city": _choice(rng, CITIES, n),
+        "ship-state": _choice(rng, STATES, n),
+        "ship-postal-code": rng.integers(110_001, 855_117, size=n),
+        "ship-country": "IN",
+        "promotion-ids": _blank(n),
+        "is-business-order": rng.random(n) < 0.02,
+        "purchase-order-number": _blank(n),
+        "price-designation": _blank(n),
+        "is-iba ": False,
+    })
+
+
+def amazon_returns(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    skus = _sku_numbers(rng, n, total_rows)
+    ordered = _timestamps(rng, n).astype("datetime64[D]")
+    quantity = rng.choice([1, 1, 1, 2], size=n)
+    order_amount = quantity * _money(rng, n, 249, 1_999)
+    refunded = np.where(rng.random(n) < 0.7, order_amount, np.nan)
+    return pd.DataFrame({
+        "Order ID": ("40" + pd.Series(line % 10).astype(str) + "-" + pd.Series(line // 10 % 10_000_000).astype(str).str.zfill(7)
+                     + "-" + pd.Series(line * 104_729 % 10_000_000).astype(str).str.zfill(7)).to_numpy(dtype=object),
+        "Order date": ordered,
+        "Return request date": _later(rng, ordered, 1, 20).astype("datetime64[D]"),
+        "Return request status": _choice(rng, ["Approved", "Closed", "Pending", "Rejected"], n, _weights(55, 35, 7, 3)),
+        "Amazon RMA ID": _ids("D3RMA", line, 9),
+        "Seller RMA ID": " ",
+        "Label type": _choice(rng, ["AmazonPrePaidLabel", "SelfShip"], n, _weights(90, 10)),
+        "Label cost": _money(rng, n, 40, 120),
+        "Currency code": "INR",
+        "Return carrier": _choice(rng, ["ATS", "Delhivery", "Ekart", "XpressBees"], n),
+        "Tracking ID": rng.integers(10**11, 10**12, size=n),
+        "Label to be paid by": _choice(rng, ["Seller", "Amazon"], n, _weights(80, 20)),
+        "A-to-z claim": "N",
+        "Is prime": _choice(rng, ["Y", "N"], n, _weights(30, 70)),
+        "ASIN": _ids("B0D", skus, 7),
+        " Merchant SKU": _skus(skus),
+        "Item Name": _titles(skus),
+        "Return quantity": quantity,
+        "Return reason": _choice(rng, ["CR-QUALITY_UNACCEPTABLE", "CR-SIZE_TOO_SMALL", "CR-SIZE_TOO_LARGE", "CR-UNWANTED_ITEM",
+                                       "CR-DEFECTIVE", "CR-NOT_AS_DESCRIBED", "CR-SWITCHEROO"], n),
+        "In policy": _choice(rng, ["Y", "N"], n, _weights(95, 5)),
+        "Return type": "C-Returns",
+        "Resolution": _choice(rng, ["StandardRefund", "Replacement"], n, _weights(90, 10)),
+        "Invoice number": _ids("IN-", line, 6),
+        "Return delivery date": " ",
+        "Order Amount": order_amount,
+        "Order quantity": quantity,
+        "SafeT Action reason": " ",
+        "SafeT claim ID": " ",
+        "SafeT claim state": " ",
+        "SafeT claim creation time": " ",
+        "SafeT claim reimbursement amount": " ",
+        # Refunds not yet issued are exported as a blank cell
+        "Refunded Amount": pd.Series(refunded, dtype=object).where(~np.isnan(refunded), " ").to_numpy(),
+        "Category": "Apparel",
+    })
+
+
+def amazon_inventory(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    tiers = {f"{kind} {part} {tier}": _blank(n) for kind in ("Quantity", "Progressive")
+             for tier in range(1, 6 if kind == "Quantity" else 4) for part in ("Lower Bound", "Price")}
+    return pd.DataFrame({
+        "sku": _skus(line),
+        "asin": _ids("B0D", line, 7),
+        "price": np.where(rng.random(n) < 0.03, np.nan, _money(rng, n, 199, 2_499)),
+        "quantity": np.where(rng.random(n) < 0.15, 0, rng.integers(1, 200, size=n)),
+        "Business Price": _blank(n),
+        "Quantity Price Type": _blank(n),
+        **tiers,
+        "Progressive Price Type": _blank(n),
+    })
+
+
+def flipkart_orders(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    skus = _sku_numbers(rng, n, total_rows)
+    ordered = _timestamps(rng, n)
+    status = _choice(rng, ["DELIVERED", "SHIPPED", "CANCELLED", "RETURNED", "RETURN_REQUESTED", "APPROVED"],
+                     n, _weights(60, 12, 12, 10, 3, 3))
+    cancelled = status == "CANCELLED"
+    returned = np.isin(status, ["RETURNED", "RETURN_REQUESTED"])
+    item_ids = _ids("", 434_656_594_185_600_000 + line * 100, 18)
+    return pd.DataFrame({
+        "order_item_id": "OI:" + item_ids,
+        "order_id": "OD" + item_ids,
+        "fulfilment_source": "Seller",
+        "fulfilment_type": _choice(rng, ["NON_FBF", "FBF"], n, _weights(80, 20)),
+        "order_date": ordered,
+        "order_approval_date": _later(rng, ordered, 0, 0.05),
+        "order_item_status": status,
+        "sku": _skus(skus, prefix="SKU:"),
+        "fsn": _ids("SHTH", skus, 12),
+        "product_title": _titles(skus),
+        "quantity": rng.choice([1, 1, 1, 2], size=n),
+        "price": _money(rng, n, 249, 1_999),
+        "serial_no_imei": _blank(n),
+        "delivery_logistics_partner": _blank(n),
+        "pickup_logistics_partner": _choice(rng, ["flipkartlogistics-cod", "flipkartlogistics-prepaid"], n),
+        "delivery_tracking_id": _ids("DTr:FMPC", line, 10),
+        "forward_logistics_form": _blank(n),
+        "forward_logistics_form_no": _blank(n),
+        "order_cancellation_date": np.where(cancelled, _later(rng, ordered, 0, 3), np.datetime64("NaT")),
+        "cancellation_reason": np.where(cancelled, _choice(rng, ["order_cancelled", "buyer_cancelled"], n), None),
+        "cancellation_sub_reason": np.where(cancelled, _choice(rng, ["mind_changed", "ordered_by_mistake"], n), None),
+        "order_return_approval_date": np.where(returned, _later(rng, ordered, 5, 20), np.datetime64("NaT")),
+        "return_id": np.where(returned, _ids("RI:", line, 20), None),
+        "return_reason": np.where(returned, _choice(rng, ["size_issue", "quality_issue", "not_as_described"], n), None),
+        "return_sub_reason": _blank(n),
+        "procurement_dispatch_sla": 8,
+        "dispatch_after_date": _later(rng, ordered, 0, 0.1),
+        "dispatch_by_date": _later(rng, ordered, 1, 1.5),
+        "order_ready_for_dispatch_on_date": _later(rng, ordered, 0.1, 1),
+        "dispatched_date": _later(rng, ordered, 0.5, 2, missing=0.1).astype("datetime64[D]"),
+        "dispatch_sla_breached": _choice(rng, ["N", "Y"], n, _weights(92, 8)),
+        "seller_pickup_reattempts": _choice(rng, ["N", "Y"], n, _weights(85, 15)),
+        "delivery_sla": 8,
+        "deliver_by_date": _later(rng, ordered, 6, 9).astype("datetime64[D]"),
+        "order_delivery_date": _later(rng, ordered, 3, 12, missing=0.25).astype("datetime64[D]"),
+        "delivery_sla_breached": _choice(rng, ["N", "Y"], n, _weights(85, 15)),
+        "order_service_completion_date": _blank(n),
+        "service_by_date": _blank(n),
+        "service_completion_sla": _blank(n),
+        "service_sla_breached": _blank(n),
+    })
+
+
+def flipkart_returns(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    skus = _sku_numbers(rng, n, total_rows)
+    requested = _timestamps(rng, n, offset_days=5)
+    return pd.DataFrame({
+        "return_id": _ids("RI:1030346504", line, 10),
+        # Returns point back at order lines of a same-sized order export
+        "order_item_id": "OI:" + _ids("", 434_656_594_185_600_000 + rng.integers(0, max(total_rows * 8, 1), size=n) * 100, 18),
+        "fulfilment_type": _choice(rng, ["Non FBF", "FBF"], n, _weights(80, 20)),
+        "return_requested_date": np.where(rng.random(n) < 0.05, np.datetime64("NaT"), requested),
+        "return_approval_date": _later(rng, requested, 0, 1),
+        "return_status": _choice(rng, ["completed", "init", "in_transit", "cancelled"], n, _weights(60, 15, 20, 5)),
+        "return_reason": _choice(rng, ["order_cancelled", "size_issue", "quality_issue", "not_as_described", "damaged"], n),
+        "return_sub_reason": _choice(rng, ["mind_changed", "too_small", "too_large", "colour_mismatch"], n),
+        "return_type": _choice(rng, ["courier_return", "customer_return"], n, _weights(35, 65)),
+        "return_result": _choice(rng, ["Refund", "Replacement"], n, _weights(85, 15)),
+        "return_expectation": _choice(rng, ["wait_refund", "wait_replacement"], n, _weights(85, 15)),
+        "reverse_logistics_tracking_id": _ids("RTr:FMPC", line, 10),
+        "sku": _skus(skus, prefix="SKU:"),
+        "fsn": _ids("SHTH", skus, 12),
+        "product_title": _titles(skus),
+        "quantity": rng.choice([1, 1, 1, 2], size=n),
+        "return_completion_type": _blank(n),
+        "primary_pv_output": _blank(n),
+        "detailed_pv_output": _blank(n),
+        "final_condition_of_returned_product": _blank(n),
+        "tech_visit_sla": _blank(n),
+        "tech_visit_by_date": _blank(n),
+        "tech_visit_completion_datetime": _blank(n),
+        "tech_visit_completion_breach": _blank(n),
+        "return_completion_sla": _blank(n),
+        "return_complete_by_date": _later(rng, requested, 7, 10),
+        "return_completion_date": _later(rng, requested, 3, 15, missing=0.4),
+        "return_completion_breach": _choice(rng, ["NotBreached", "Breached"], n, _weights(90, 10)),
+        "return_cancellation_date": _blank(n),
+        "return_cancellation_reason": _choice(rng, ["order_cancelled", None], n, _weights(20, 80)),
+    })
+
+
+def flipkart_inventory(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    sales = np.round(rng.exponential(1.5, size=n) * (rng.random(n) < 0.6), 2)
+    stock = rng.integers(0, 120, size=n)
+    cover = np.round(stock / np.where(sales > 0, sales, np.nan), 1)
+    return pd.DataFrame({
+        "listing_id": _ids("LSTETH", line, 19),
+        "fsn": _ids("ETH", line, 13),
+        "sku": _skus(line),
+        "stock_quantity": stock,
+        "average_daily_sales": sales,
+        # Listings without sales have no cover; the export says so in words
+        "days_stock_will_last": pd.Series(cover, dtype=object).where(sales > 0, "UNDEFINED").to_numpy(),
+    })
+
+
+def ajio_orders(rng, start, n, total_rows):
+    skus = _sku_numbers(rng, n, total_rows)
+    quantity = rng.choice([1, 1, 2, 3], size=n)
+    mrp = _money(rng, n, 499, 2_999)
+    selling = np.round(mrp * rng.uniform(0.35, 0.9, size=n), 2)
+    value = np.round(selling * quantity, 2)
+    customer_cancelled = np.where(rng.random(n) < 0.08, 1, 0)
+    seller_cancelled = np.where(rng.random(n) < 0.03, 1, 0)
+    return pd.DataFrame({
+        "Status": _choice(rng, ["Delivered", "Shipped", "Customer Cancelled", "Seller Cancelled", "Returned"], n,
+                          _weights(65, 12, 10, 5, 8)),
+        "Total Value": value,
+        "CGST_AMOUNT": np.round(value * 0.025, 2),
+        "SGST_AMOUNT": np.round(value * 0.025, 2),
+        "IGST_AMOUNT": np.where(rng.random(n) < 0.6, np.round(value * 0.05, 2), 0.0),
+        "Listing MRP": mrp,
+        "Selling Price": selling,
+        "Seller SKU": _skus(skus),
+        "Order Qty": quantity,
+        "Customer Cancelled QTY": customer_cancelled,
+        "Seller Cancelled QTY": seller_cancelled,
+        "SLA Status": _choice(rng, ["On Time", "Delayed"], n, _weights(88, 12)),
+        "Description": _titles(skus),
+        "Order Date": _timestamps(rng, n).astype("datetime64[D]"),
+    })
+
+
+def ajio_returns(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    skus = _sku_numbers(rng, n, total_rows)
+    created = _timestamps(rng, n, offset_days=5).astype("datetime64[D]")
+    value = _money(rng, n, 299, 2_499)
+    return pd.DataFrame({
+        "Return Created Date": created,
+        "Return Delivered Date": _later(rng, created, 2, 10, missing=0.2).astype("datetime64[D]"),
+        "QC completion date": _later(rng, created, 5, 14, missing=0.3).astype("datetime64[D]"),
+        "Credit Note Generation Date": _later(rng, created, 6, 16, missing=0.3).astype("datetime64[D]"),
+        "Return QTY": rng.choice([1, 1, 1, 2], size=n),
+        "Return Value": value,
+        "Credit Note Value": np.round(value * rng.uniform(0.9, 1.0, size=n), 2),
+        "SELLER SKU": _skus(skus),
+        "RETURN ORDER NUMBER": _ids("FN", line, 10),
+        "BRAND": _choice(rng, ["TALLMANN", "HAZELS WILLOW", "MARTIN PACEMAKER"], n),
+        "Disposition": _choice(rng, ["Good", "Bad", "Damaged", "Missing"], n, _weights(70, 15, 10, 5)),
+        "QC Reason coding": _choice(rng, ["Size Issue", "Quality Issue", "Wrong Item", "Used Product", "Other"], n),
+        "Return Status": _choice(rng, ["Completed", "In Transit", "QC Pending"], n, _weights(70, 20, 10)),
+        "Return Carrier Name": _choice(rng, ["Delhivery", "XpressBees", "Ecom Express", "Shadowfax"], n),
+    })
+
+
+def myntra_orders(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    styles = _sku_numbers(rng, n, total_rows)
+    created = _timestamps(rng, n)
+    amount = _money(rng, n, 299, 2_499)
+    return pd.DataFrame({
+        "created on": created,
+        "delivered on": _later(rng, created, 2, 9, missing=0.2),
+        "order status": _choice(rng, ["DELIVERED", "SHIPPED", "cancelled", "RTO", "PACKED"], n, _weights(65, 12, 12, 6, 5)),
+        "final amount": amount,
+        "discount": np.round(amount * rng.uniform(0, 0.3, size=n), 2),
+        "coupon discount": np.where(rng.random(n) < 0.25, _money(rng, n, 20, 150), 0.0),
+        "style name": _titles(styles),
+        "style_id": 10_000_000 + styles,
+        "state": _choice(rng, STATE_CODES, n),
+        "order_id": _ids("O", line, 10),
+    })
+
+
+def myntra_returns(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    styles = _sku_numbers(rng, n, total_rows)
+    ordered = _timestamps(rng, n)
+    status = _choice(rng, ["RT", "RTO", "RTD", "RQP"], n, _weights(55, 20, 15, 10))
+    return pd.DataFrame({
+        "order_created_date": ordered,
+        "order_delivered_date": _later(rng, ordered, 2, 9),
+        "return_created_date": _later(rng, ordered, 10, 25),
+        "refunded_date": _later(rng, ordered, 12, 30, missing=0.3),
+        "order_rto_date": np.where(status == "RTO", _later(rng, ordered, 5, 15), np.datetime64("NaT")),
+        "lmdo_last_modified_on": _later(rng, ordered, 12, 35),
+        "return_id": _ids("RT", line, 10),
+        "status": status,
+        "is_refunded": _choice(rng, ["Yes", "No"], n, _weights(70, 30)),
+        "quantity": rng.choice([1, 1, 1, 2], size=n),
+        "style_id": 10_000_000 + styles,
+        "return_reason": _choice(rng, ["size", "fit", "quality", "colour", "damaged", "not_as_shown"], n),
+        "order_id": _ids("O", line, 10),
+    })
+
+
+def meesho_orders(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    skus = _sku_numbers(rng, n, total_rows)
+    quantity = rng.choice([1, 1, 1, 2], size=n)
+    return pd.DataFrame({
+        "Reason for Credit Entry": _choice(rng, ["DELIVERED", "RTO_COMPLETE", "CUSTOMER_RETURN", "CANCELLED", None], n,
+                                           _weights(60, 12, 10, 8, 10)),
+        "Sub Order No": _ids("", 1_000_000_000 + line, 10) + "_1",
+        "Order Date": _timestamps(rng, n).astype("datetime64[D]"),
+        "Customer State": _choice(rng, STATES, n),
+        "Product Name": _titles(skus),
+        "SKU": _skus(skus),
+        "Quantity": quantity,
+        "Supplier Discounted Price (Incl GST and Commision)": quantity * _money(rng, n, 199, 999),
+    })
+
+
+def amazon_keywords(rng, start, n, total_rows):
+    line = start + np.arange(n)
+    impressions = rng.integers(50, 50_000, size=n)
+    clicks = np.minimum(impressions, rng.integers(0, 400, size=n))
+    orders = np.minimum(clicks, rng.integers(0, 40, size=n))
+    cpc = _money(rng, n, 0.5, 25)
+    spend = np.round(clicks * cpc, 2)
+    sales = np.round(orders * rng.uniform(300, 1_500, size=n), 2)
+    ntb_orders = np.minimum(orders, rng.integers(0, 20, size=n))
+    low = _money(rng, n, 0.5, 5)
+    return pd.DataFrame({
+        "State": _choice(rng, ["Enabled", "Paused"], n, _weights(85, 15)),
+        "Keyword": ("shirt for men " + pd.Series(line).astype(str)).to_numpy(dtype=object),
+        "Match type": _choice(rng, ["Exact", "Phrase", "Broad"], n),
+        "Status": _choice(rng, ["Delivering", "Out of budget", "Paused"], n, _weights(80, 10, 10)),
+        "Suggested bid (low) (INR)": low,
+        "Suggested bid (median) (INR)": np.round(low * 1.6, 2),
+        "Suggested bid (high) (INR)": np.round(low * 2.4, 2),
+        "Keyword bid (INR)": _money(rng, n, 1, 30),
+        "Top-of-search IS": np.round(rng.uniform(0, 60, size=n), 2),
+        "Impressions": impressions,
+        "Clicks": clicks,
+        "CTR": np.round(clicks / impressions * 100, 2),
+        "Spend (INR)": spend,
+        "CPC (INR)": cpc,
+        "Orders": orders,
+        "Sales (INR)": sales,
+        "ACOS": np.round(np.divide(spend * 100, sales, out=np.zeros(n), where=sales > 0), 2),
+        "ROAS": np.round(np.divide(sales, spend, out=np.zeros(n), where=spend > 0), 2),
+        "NTB orders": ntb_orders,
+        "% of orders NTB": np.round(np.divide(ntb_orders * 100, orders, out=np.zeros(n), where=orders > 0), 2),
+        "NTB sales (INR)": np.round(sales * rng.uniform(0, 1, size=n), 2),
+        "% of sales NTB": np.round(rng.uniform(0, 100, size=n), 2),
+    })
+
+
+# (platform, report) -> (generator, CSV date format). Date formats follow
+# the exports: Amazon order reports carry ISO timestamps with an offset.
+GENERATORS = {
+    ("Amazon", "Orders"): (amazon_orders, "%Y-%m-%dT%H:%M:%S+05:30"),
+    ("Amazon", "Returns"): (amazon_returns, "%Y-%m-%d"),
+    ("Amazon", "Inventory"): (amazon_inventory, None),
+    ("Amazon", "Campaign"): (amazon_keywords, None),
+    ("Flipkart", "Orders"): (flipkart_orders, "%Y-%m-%d %H:%M:%S"),
+    ("Flipkart", "Returns"): (flipkart_returns, "%Y-%m-%d %H:%M:%S.0"),
+    ("Flipkart", "Inventory"): (flipkart_inventory, None),
+    ("Ajio", "Orders"): (ajio_orders, "%d-%m-%Y"),
+    ("Ajio", "Returns"): (ajio_returns, "%d-%m-%Y"),
+    ("Myntra", "Orders"): (myntra_orders, "%Y-%m-%d %H:%M:%S"),
+    ("Myntra", "Returns"): (myntra_returns, "%Y-%m-%d %H:%M:%S"),
+    ("Meesho", "Orders"): (meesho_orders, "%Y-%m-%d"),
+}
+
+FORMATS = ("csv", "xlsx")
+
+
+def generate(key, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """Yield the report in chunks of at most chunk_rows rows."""
+    generator, _ = GENERATORS[key]
+    for start in range(0, rows, chunk_rows):
+        rng = np.random.default_rng([seed, start])
+        yield generator(rng, start, min(chunk_rows, rows - start), rows)
+
+
+def _write_csv(chunks, path, date_format):
+    with open(path, "w", encoding="utf-8", newline="") as fh:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(fh, index=False, header=i == 0, date_format=date_format)
+
+
+def _write_xlsx(chunks, path):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    for i, chunk in enumerate(chunks):
+        if i == 0:
+            sheet.append(list(chunk.columns))
+        # Cells are written as Python values; NaN/NaT become empty cells
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            sheet.append(row)
+    workbook.save(path)
+
+
+def write_export(key, rows, path, seed=0):
+    """Write a synthetic export of `rows` rows; the format follows the extension."""
+    fmt = os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if fmt == "xlsx" and rows > XLSX_MAX_ROWS:
+        raise ValueError(f"{rows:,} rows do not fit in one Excel sheet ({XLSX_MAX_ROWS:,} max)")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if fmt == "csv":
+        _write_csv(generate(key, rows, seed), tmp_path, GENERATORS[key][1])
+    else:
+        _write_xlsx(generate(key, rows, seed, chunk_rows=50_000), tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def export_path(data_dir, key, rows, fmt, seed=0):
+    name = f"{key[0]}_{key[1]}_{rows}_{seed}.{fmt}".lower()
+    return os.path.join(data_dir, name)
+
+
+def ensure_export(data_dir, key, rows, fmt, seed=0):
+    """Path of a generated export, writing it only if it is not there yet."""
+    path = export_path(data_dir, key, rows, fmt, seed)
+    if not os.path.exists(path):
+        write_export(key, rows, path, seed)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write one synthetic marketplace export.")
+    parser.add_argument("platform", choices=sorted({key[0] for key in GENERATORS}))
+    parser.add_argument("report", choices=sorted({key[1] for key in GENERATORS}))
+    parser.add_argument("rows", type=int)
+    parser.add_argument("path", help="output file, .csv or .xlsx")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    key = (args.platform, args.report)
+    if key not in GENERATORS:
+        parser.error(f"no generator for {args.platform} {args.report}")
+    print(write_export(key, args.rows, args.path, args.seed))
+
+
+if __name__ == "__main__":
+    main()
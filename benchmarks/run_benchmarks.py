@@ -0,0 +1,268 @@
+"""Time every report's pipeline on synthetic exports of growing size.
+
+    python benchmarks/run_benchmarks.py                      # 10k and 100k rows
+    python benchmarks/run_benchmarks.py --sizes full         # 10k, 100k, 1M, 10M
+    python benchmarks/run_benchmarks.py --reports flipkart --formats csv --compare results/run-20250101-120000.json
+
+Each (report, rows, format) case runs in a fresh process and times four
+stages separately: load (parsing the file), coerce (applying the report
+schema's dtypes, see report_schemas.py), aggregate (the dashboard's filters,
+metrics and grouping, see workloads.py) and figures (building and
+serializing its Plotly charts). The dashboards build CSV categories while
+parsing; here they are built in coerce so the two costs can be told apart.
+Every stage also records its peak resident memory above the level it
+started at. Exports are generated once into the data directory and reused.
+
+Results go to <output>/run-<timestamp>.json and .csv. Microseconds per row
+are printed next to each case, so scaling cliffs show as a jump between
+sizes; --compare flags stages that got slower than a previous run.
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+# Time the parser, not the parse cache or the columnar sidecar files
+os.environ["ECOM_REPORTS_COLUMNAR"] = "0"
+os.environ["ECOM_REPORTS_STORE"] = "0"
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from generators import FORMATS, GENERATORS, XLSX_MAX_ROWS, ensure_export  # noqa: E402
+
+SIZE_PRESETS = {
+    "quick": [10_000, 100_000],
+    "full": [10_000, 100_000, 1_000_000, 10_000_000],
+}
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+STAGES = ["load", "coerce", "aggregate", "figures"]
+
+SAMPLE_SECONDS = 0.005
+DEFAULT_TOLERANCE = 1.25
+
+
+def parse_sizes(text):
+    if text in SIZE_PRESETS:
+        return SIZE_PRESETS[text]
+    sizes = []
+    for part in text.split(","):
+        part = part.strip().lower().replace("_", "")
+        scale = SIZE_SUFFIXES.get(part[-1:], 1)
+        sizes.append(int(float(part.rstrip("km")) * scale))
+    return sizes
+
+
+def select_reports(text):
+    """Reports whose "platform report" name contains any of the comma-separated terms."""
+    if not text:
+        return list(GENERATORS)
+    terms = [term.strip().lower() for term in text.split(",") if term.strip()]
+    return [key for key in GENERATORS if any(term in f"{key[0]} {key[1]}".lower() for term in terms)]
+
+
+def _rss_bytes():
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+class PeakMemory:
+    """Peak memory of a block above the level it started at, in MB.
+
+    Resident memory is sampled from a background thread, which catches
+    Arrow and NumPy buffers as well as Python objects. Without /proc
+    (macOS, Windows) tracemalloc is used instead, which sees NumPy and
+    Python allocations only and slows the block down.
+    """
+
+    def __init__(self):
+        self.peak_mb = None
+        self._use_proc = os.path.exists("/proc/self/statm")
+
+    def __enter__(self):
+        if self._use_proc:
+            self._baseline = self._peak = _rss_bytes()
+            self._done = threading.Event()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        else:
+            tracemalloc.start()
+        return self
+
+    def _sample(self):
+        while not self._done.wait(SAMPLE_SECONDS):
+            self._peak = max(self._peak, _rss_bytes())
+
+    def __exit__(self, *exc):
+        if self._use_proc:
+            self._done.set()
+            self._thread.join()
+            peak = max(self._peak, _rss_bytes()) - self._baseline
+        else:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.peak_mb = round(peak / 2**20, 1)
+        return False
+
+
+def _timed(stages, name, func, *args, **kwargs):
+    gc.collect()
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        value = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+    stages[name] = {"seconds": round(seconds, 4), "peak_mb": memory.peak_mb}
+    return value
+
+
+def _serialize(figures):
+    # Streamlit ships every figure to the browser as Plotly JSON
+    for fig in figures:
+        fig.to_json()
+    return figures
+
+
+def run_case(key, rows, fmt, path):
+    """Load, coerce, aggregate and chart one export; runs in a fresh process."""
+    from report_loader import load_report, set_cache_budget
+    from report_schemas import SCHEMAS, apply_schema
+    from workloads import WORKLOADS
+
+    set_cache_budget(0)
+    aggregate, figures = WORKLOADS[key]
+    result = {"platform": key[0], "report": key[1], "rows": rows, "format": fmt,
+              "file_mb": round(os.path.getsize(path) / 2**20, 1), "stages": {}}
+    stages = result["stages"]
+    try:
+        df = _timed(stages, "load", load_report, path)
+        if key in SCHEMAS:
+            df = _timed(stages, "coerce", apply_schema, df, SCHEMAS[key])
+        df.attrs["report_key"] = ("benchmark", path)
+        tables = _timed(stages, "aggregate", aggregate, df)
+        result["figures"] = len(_timed(stages, "figures", lambda tables: _serialize(figures(tables)), tables))
+        result["status"] = "ok"
+    except Exception as e:
+        result.update(status="failed", error=f"{type(e).__name__}: {e}")
+    result["total_seconds"] = round(sum(stage["seconds"] for stage in stages.values()), 4)
+    result["peak_mb"] = max((stage["peak_mb"] for stage in stages.values()), default=None)
+    return result
+
+
+def _case_id(result):
+    return (result["platform"], result["report"], result["rows"], result["format"])
+
+
+def format_result(result):
+    name = f"{result['platform']} {result['report']}"
+    head = f"{name:<20} {result['rows']:>11,} {result['format']:<4}"
+    if result["status"] != "ok":
+        return f"{head}  {result['status']}: {result.get('error', '')}"
+    stages = "  ".join(
+        f"{stage} {result['stages'][stage]['seconds']:7.3f}s {result['stages'][stage]['peak_mb']:7.1f}MB"
+        for stage in STAGES if stage in result["stages"]
+    )
+    per_row = result["total_seconds"] / result["rows"] * 1e6
+    return f"{head}  {stages}  total {result['total_seconds']:7.3f}s ({per_row:6.2f} µs/row)"
+
+
+def compare(results, baseline_path, tolerance=DEFAULT_TOLERANCE):
+    """Lines describing stages at least `tolerance` times slower than in the baseline run."""
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = {_case_id(result): result for result in json.load(fh)["results"]}
+    lines = []
+    for result in results:
+        before = baseline.get(_case_id(result))
+        if before is None or result["status"] != "ok" or before["status"] != "ok":
+            continue
+        for stage, timing in result["stages"].items():
+            old = before["stages"].get(stage)
+            # Sub-10ms stages are timer noise
+            if old and max(timing["seconds"], old["seconds"]) >= 0.01 and timing["seconds"] >= old["seconds"] * tolerance:
+                lines.append(
+                    f"{result['platform']} {result['report']} {result['rows']:,} {result['format']} {stage}: "
+                    f"{old['seconds']:.3f}s -> {timing['seconds']:.3f}s ({timing['seconds'] / old['seconds']:.2f}x)"
+                )
+    return lines
+
+
+def write_results(output_dir, results, settings):
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.join(output_dir, time.strftime("run-%Y%m%d-%H%M%S"))
+    with open(f"{stem}.json", "w", encoding="utf-8") as fh:
+        json.dump({"settings": settings, "results": results}, fh, indent=2)
+
+    fields = ["platform", "report", "rows", "format", "file_mb", "status", "total_seconds", "peak_mb"]
+    fields += [f"{stage}_{measure}" for stage in STAGES for measure in ("seconds", "peak_mb")]
+    with open(f"{stem}.csv", "w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for result in results:
+            row = dict(result)
+            for stage, timing in result["stages"].items():
+                row[f"{stage}_seconds"] = timing["seconds"]
+                row[f"{stage}_peak_mb"] = timing["peak_mb"]
+            writer.writerow(row)
+    return f"{stem}.json"
+
+
+def run_benchmarks(reports, sizes, formats, data_dir, seed=0):
+    results = []
+    for key in reports:
+        for rows in sizes:
+            for fmt in formats:
+                if fmt == "xlsx" and rows > XLSX_MAX_ROWS:
+                    continue
+                started = time.perf_counter()
+                path = ensure_export(data_dir, key, rows, fmt, seed)
+                generated = time.perf_counter() - started
+                if generated > 1:
+                    print(f"  generated {os.path.basename(path)} in {generated:.1f}s", flush=True)
+                # One process per case: no warm caches, and a clean memory baseline
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    result = pool.submit(run_case, key, rows, fmt, path).result()
+                print(format_result(result), flush=True)
+                results.append(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the report pipelines on synthetic exports.")
+    parser.add_argument("--sizes", default="quick",
+                        help="comma-separated row counts (10k, 1m, ...) or a preset: " + ", ".join(SIZE_PRESETS))
+    parser.add_argument("--formats", default=",".join(FORMATS), help="csv, xlsx or both (xlsx stops at Excel's row limit)")
+    parser.add_argument("--reports", default="", help="comma-separated filters on 'platform report', e.g. 'flipkart,amazon orders'")
+    parser.add_argument("--data-dir", default=os.path.join(BENCH_DIR, "data"), help="where generated exports are kept")
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results"), help="where results are written")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", metavar="RUN_JSON", help="flag stages slower than in this earlier run")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="slowdown ratio flagged by --compare")
+    args = parser.parse_args(argv)
+
+    reports = select_reports(args.reports)
+    sizes = parse_sizes(args.sizes)
+    formats = [fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown or not reports:
+        parser.error(f"unknown formats {unknown}" if unknown else f"no report matches {args.reports!r}")
+
+    results = run_benchmarks(reports, sizes, formats, args.data_dir, args.seed)
+    settings = {"sizes": sizes, "formats": formats, "reports": [list(key) for key in reports], "seed": args.seed}
+    print(f"Results: {write_results(args.output, results, settings)}")
+
+    failed = [result for result in results if result["status"] != "ok"]
+    if args.compare:
+        slower = compare(results, args.compare, args.tolerance)
+        print(f"{len(slower)} stages at least {args.tolerance}x slower than {args.compare}")
+        for line in slower:
+            print(f"  {line}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""What each dashboard computes and draws once a report is loaded.
+
+Every workload is a pair of functions: aggregate(df) does the dashboard's
+filtering, metrics and grouping on a schema-typed frame and returns the
+tables it shows; figures(tables) builds the dashboard's Plotly figures from
+them. aggregate calls the report's Streamlit-free summarizer (and its
+filter, where the dashboard has one) with the dashboard's default
+selections, so the benchmark times the shipped code.
+"""
+import pandas as pd
+import plotly.express as px
+
+from ajio_order import summarize_ajio_orders
+from ajio_return import clean_ajio_returns, summarize_ajio_returns
+from amazon_inventory import clean_inventory, summarize_inventory
+from amazon_order import filter_amazon_orders, summarize_amazon_orders
+from amazon_return import FILTER_COLUMNS, filter_amazon_returns, prepare_amazon_returns, summarize_amazon_returns
+from campaign import analyze_keywords
+from charts import bar_chart, line_chart, pie_chart
+from flipkart_inventory_report import summarize_flipkart_inventory
+from flipkart_order import summarize_flipkart_orders
+from flipkart_returns_report import summarize_flipkart_returns
+from meesho_app import summarize_meesho_orders
+from myntra_order_app import summarize_myntra_orders
+from myntra_return_app import summarize_myntra_returns
+
+
+def _summary(kpis, tables):
+    return {"kpis": kpis, **tables}
+
+
+def amazon_orders(df):
+    # The filters default to every status and channel, and the date pickers
+    # to the report's first and last day
+    filtered = filter_amazon_orders(
+        df, df["order-status"].dropna().unique(), df["fulfillment-channel"].dropna().unique(),
+        df["purchase-date"].min().normalize(), df["purchase-date"].max().normalize(),
+    )
+    return _summary(*summarize_amazon_orders(filtered))
+
+
+def amazon_orders_figures(tables):
+    return [
+        line_chart(tables["orders_by_date"], x="purchase-date", y="Orders", title="📈 Orders Over Time", markers=True),
+        px.bar(tables["top_cities"], x="City", y="Orders", title="🌆 Top Shipping Cities", color="Orders", text_auto=True),
+    ]
+
+
+def amazon_returns(df):
+    df = prepare_amazon_returns(df)
+    filters = {col: df[col].dropna().unique() for col in FILTER_COLUMNS}
+    filtered = filter_amazon_returns(df, filters, df["order date"].min().normalize(), df["order date"].max().normalize())
+    return _summary(*summarize_amazon_returns(filtered))
+
+
+def amazon_returns_figures(tables):
+    return [
+        line_chart(tables["returns_by_date"], x="return request date", y="Returns", title="📉 Return Requests Over Time", markers=True),
+        px.bar(tables["top_reasons"].head(10), x="Return Reason", y="Count", title="🔝 Top Return Reasons", color="Count", text_auto=True),
+    ]
+
+
+def amazon_inventory(df):
+    return _summary(*summarize_inventory(clean_inventory(df)))
+
+
+def amazon_inventory_figures(tables):
+    return [px.pie(
+        tables["stock_data"], names="Stock Status", values="Count", title="📊 Zero Stock vs With Stock Distribution",
+        color="Stock Status", color_discrete_map={"Zero Stock": "red", "With Stock": "green"}, hole=0.3,
+    )]
+
+
+def amazon_campaign(df):
+    result = analyze_keywords(df)
+    if isinstance(result, str):
+        raise ValueError(result)
+    return {"keywords": result}
+
+
+def flipkart_orders(df):
+    df["product_title"] = df["product_title"].fillna("Unknown Product")
+    return _summary(*summarize_flipkart_orders(df))
+
+
+def flipkart_orders_figures(tables):
+    kpis = tables["kpis"]
+    sla = pd.DataFrame({
+        "SLA Type": ["Dispatch SLA", "Delivery SLA"],
+        "Breached": [kpis["dispatch_sla_breaches"], kpis["delivery_sla_breaches"]],
+    })
+    return [
+        line_chart(tables["daily_orders"], x="order_date", y="Orders", markers=True),
+        px.bar(sla, x="SLA Type", y="Breached", text_auto=True, color="SLA Type"),
+    ]
+
+
+def flipkart_returns(df):
+    return _summary(*summarize_flipkart_returns(df))
+
+
+def flipkart_returns_figures(tables):
+    kpis = tables["kpis"]
+    breaches = pd.DataFrame({
+        "SLA Type": ["Tech Visit SLA", "Return Completion SLA"],
+        "Breached": [kpis["tech_breaches"], kpis["return_breaches"]],
+    })
+    return [
+        line_chart(tables["returns_by_date"], x="return_requested_date", y="Returns", markers=True),
+        px.bar(breaches, x="SLA Type", y="Breached", color="SLA Type", text_auto=True),
+    ]
+
+
+def flipkart_inventory(df):
+    return _summary(*summarize_flipkart_inventory(df))
+
+
+def ajio_orders(df):
+    return _summary(*summarize_ajio_orders(df))
+
+
+def ajio_orders_figures(tables):
+    # The dashboard draws these with st.line_chart / st.bar_chart
+    return [
+        px.line(tables["sales_by_day"].rename_axis("Order Date").reset_index(name="Total Value"), x="Order Date", y="Total Value"),
+        px.bar(tables["orders_by_day"].rename_axis("Order Date").reset_index(name="Orders"), x="Order Date", y="Orders"),
+    ]
+
+
+def ajio_returns(df):
+    return _summary(*summarize_ajio_returns(clean_ajio_returns(df)))
+
+
+def ajio_returns_figures(tables):
+    return [
+        px.bar(tables["returns_by_date"], x="Return Created Date", y="Return QTY", title="📅 Returns by Date"),
+        px.bar(tables["top_skus"], x="SELLER SKU", y="Return QTY", title="📌 Top Returned SKUs"),
+        px.pie(tables["dispositions"], names="Disposition", values="Count", title="🧪 QC Disposition Breakdown"),
+        px.bar(tables["qc_reasons"], x="QC Reason", y="Count", title="❌ Top QC Reasons"),
+        px.pie(tables["statuses"], names="Return Status", values="Count", title="🚚 Return Status Distribution"),
+        px.bar(tables["carriers"], x="Carrier", y="Count", title="🚛 Top Return Carriers"),
+    ]
+
+
+def myntra_orders(df):
+    return _summary(*summarize_myntra_orders(df))
+
+
+def myntra_orders_figures(tables):
+    return [
+        line_chart(tables["daily_orders"], x="created on", y="orders", title="Orders Over Time"),
+        bar_chart(tables["states"], x="State", y="Orders", title="Orders by State"),
+    ]
+
+
+def myntra_returns(df):
+    return _summary(*summarize_myntra_returns(df))
+
+
+def myntra_returns_figures(tables):
+    return [
+        line_chart(tables["trend"], x="return_created_date", y="Returns", title="Return Volume Over Time"),
+        bar_chart(tables["reasons"], x="Return Reason", y="Count", title="Top Return Reasons", text_auto=True),
+        pie_chart(tables["statuses"], names="Status", values="Count", title="Return Status Split"),
+    ]
+
+
+def meesho_orders(df):
+    return _summary(*summarize_meesho_orders(df))
+
+
+def meesho_orders_figures(tables):
+    return [
+        line_chart(tables["daily_orders"], x="Order Date", y="Orders", title="Orders Over Time"),
+        bar_chart(tables["states"], x="State", y="Orders", title="Orders by State"),
+        pie_chart(tables["reasons"], names="Reason", values="Count", title="Reasons for Credit Entry"),
+    ]
+
+
+def no_figures(tables):
+    return []
+
+
+# (platform, report) -> (aggregate, figures)
+WORKLOADS = {
+    ("Amazon", "Orders"): (amazon_orders, amazon_orders_figures),
+    ("Amazon", "Returns"): (amazon_returns, amazon_returns_figures),
+    ("Amazon", "Inventory"): (amazon_inventory, amazon_inventory_figures),
+    ("Amazon", "Campaign"): (amazon_campaign, no_figures),
+    ("Flipkart", "Orders"): (flipkart_orders, flipkart_orders_figures),
+    ("Flipkart", "Returns"): (flipkart_returns, flipkart_returns_figures),
+    ("Flipkart", "Inventory"): (flipkart_inventory, no_figures),
+    ("Ajio", "Orders"): (ajio_orders, ajio_orders_figures),
+    ("Ajio", "Returns"): (ajio_returns, ajio_returns_figures),
+    ("Myntra", "Orders"): (myntra_orders, myntra_orders_figures),
+    ("Myntra", "Returns"): (myntra_returns, myntra_returns_figures),
+    ("Meesho", "Orders"): (meesho_orders, meesho_orders_figures),
+}
@@ -1,45 +1,194 @@
-import streamlit as st
-import pandas as pd
-
-def analyze_keywords(df):
-    # Ensure the required columns are present
-    required_columns = [
-        "State", "Keyword", "Match type", "Status", "Suggested bid (low) (INR)",
-        "Suggested bid (median) (INR)", "Suggested bid (high) (INR)", "Keyword bid (INR)",
-        "Top-of-search IS", "Impressions", "Clicks", "CTR", "Spend (INR)", "CPC (INR)",
-        "Orders", "Sales (INR)", "ACOS", "ROAS", "NTB orders", "% of orders NTB",
-        "NTB sales (INR)", "% of sales NTB"
-    ]
-    if not all(col in df.columns for col in required_columns):
-        return "Missing required columns in the uploaded file. Please check the format."
-    
-    # Advanced bid adjustment based on performance factors
-    def adjust_bid(row):
-        if row["ACOS"] > 50 or row["CTR"] < 0.2:  # High ACOS or very low CTR, reduce bid significantly
-            return max(row["CPC (INR)"] * 0.6, 0.1)
-        elif row["ACOS"] < 20 and row["Orders"] > 10 and row["CTR"] > 1.0:  # Low ACOS, high orders, high CTR, increase bid
-            return row["CPC (INR)"] * 1.5
-        elif row["Clicks"] > 100 and row["Orders"] < 5:  # Very high clicks but low conversion, reduce bid
-            return max(row["CPC (INR)"] * 0.5, 0.1)
-        elif row["ROAS"] > 5 and row["Sales (INR)"] > 10000:  # High ROAS and strong sales, increase bid
-            return row["CPC (INR)"] * 1.3
-        else:
-            return row["CPC (INR)"]  # Keep bid the same
-    
-    df["Recommended Bid (INR)"] = df.apply(adjust_bid, axis=1)
-    return df
-
-st.title("Amazon PPC Manual Campaign Bid Optimizer")
-
-uploaded_file = st.file_uploader("Upload your manual campaign report (CSV)", type=["csv"]) 
-
-if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file)
-    optimized_df = analyze_keywords(df)
-    
-    if isinstance(optimized_df, str):
-        st.error(optimized_df)
-    else:
-        st.success("Bid optimization completed!")
-        st.dataframe(optimized_df)
-        st.download_button("Download Optimized Report", optimized_df.to_csv(index=False), "optimized_bids.csv", "text/csv")
+import ast
+import functools
+import operator
+import re
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+from datasets import session_upload, session_value
+from exports import export_buttons
+from instrumentation import stage, timed
+from report_loader import load_report
+
+# Bid rules, evaluated in priority order: the first rule whose condition
+# holds sets the keyword's new bid to CPC * multiplier (never below
+# min_bid when one is given). Conditions compare report columns with
+# numbers (or text) and combine the comparisons with and/or/not; names with
+# spaces or symbols go in backticks. Rule tables are uploaded by users, so
+# conditions are parsed and evaluated here rather than by pandas.eval, and
+# anything else (attribute access, calls, subscripts) is rejected.
+DEFAULT_BID_RULES = pd.DataFrame([
+    # High ACOS or very low CTR, reduce bid significantly
+    {"rule_id": "high_acos_or_low_ctr", "condition": "ACOS > 50 or CTR < 0.2", "multiplier": 0.6, "min_bid": 0.1},
+    # Low ACOS, high orders, high CTR, increase bid
+    {"rule_id": "efficient_converter", "condition": "ACOS < 20 and Orders > 10 and CTR > 1.0", "multiplier": 1.5, "min_bid": np.nan},
+    # Very high clicks but low conversion, reduce bid
+    {"rule_id": "clicks_without_orders", "condition": "Clicks > 100 and Orders < 5", "multiplier": 0.5, "min_bid": 0.1},
+    # High ROAS and strong sales, increase bid
+    {"rule_id": "high_roas_strong_sales", "condition": "ROAS > 5 and `Sales (INR)` > 10000", "multiplier": 1.3, "min_bid": np.nan},
+])
+RULE_COLUMNS = ["rule_id", "condition", "multiplier", "min_bid"]
+NO_RULE_ID = "keep"  # Keep bid the same
+REQUIRED_COLUMNS = [
+    "State", "Keyword", "Match type", "Status", "Suggested bid (low) (INR)",
+    "Suggested bid (median) (INR)", "Suggested bid (high) (INR)", "Keyword bid (INR)",
+    "Top-of-search IS", "Impressions", "Clicks", "CTR", "Spend (INR)", "CPC (INR)",
+    "Orders", "Sales (INR)", "ACOS", "ROAS", "NTB orders", "% of orders NTB",
+    "NTB sales (INR)", "% of sales NTB"
+]
+
+
+_BACKTICKED = re.compile(r"`([^`]*)`")
+_COMPARISONS = {
+    ast.Gt: operator.gt, ast.GtE: operator.ge, ast.Lt: operator.lt,
+    ast.LtE: operator.le, ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+    ast.Compare, ast.Name, ast.Load, ast.Constant, *_COMPARISONS,
+)
+
+
+def parse_condition(condition):
+    """Syntax tree of a rule condition and the backticked column names it uses.
+
+    Raises ValueError unless the condition only holds column names,
+    numbers or text, comparisons and and/or/not.
+    """
+    columns = {}
+
+    def placeholder(match):
+        name = f"_column_{len(columns)}"
+        columns[name] = match.group(1)
+        return name
+
+    try:
+        tree = ast.parse(_BACKTICKED.sub(placeholder, str(condition)).strip(), mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Invalid condition: {condition}") from None
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"{type(node).__name__} is not allowed in condition: {condition}")
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float, str))):
+            raise ValueError(f"{node.value!r} is not allowed in condition: {condition}")
+    return tree.body, columns
+
+
+def _evaluate(node, df, columns):
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        column = columns.get(node.id, node.id)
+        if column not in df.columns:
+            raise ValueError(f"Unknown column in condition: {column}")
+        return df[column]
+    if isinstance(node, ast.BoolOp):
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return functools.reduce(combine, [_evaluate(value, df, columns) for value in node.values])
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand, df, columns)
+        return np.logical_not(operand) if isinstance(node.op, ast.Not) else -operand
+    # Comparison; chains like 10 < ACOS < 20 hold where every link does
+    left, result = _evaluate(node.left, df, columns), True
+    for op, comparator in zip(node.ops, node.comparators):
+        right = _evaluate(comparator, df, columns)
+        result = np.logical_and(result, _COMPARISONS[type(op)](left, right))
+        left = right
+    return result
+
+
+def evaluate_condition(df, condition):
+    """Boolean mask of the df rows where a rule condition holds."""
+    node, columns = parse_condition(condition)
+    mask = np.asarray(_evaluate(node, df, columns), dtype=bool)
+    return np.broadcast_to(mask, len(df))
+
+
+def apply_bid_rules(df, rules):
+    """Evaluate every rule as a column mask and pick the first match per keyword.
+
+    Returns the recommended bids and the id of the rule that fired
+    (NO_RULE_ID when none did), both aligned with df.
+    """
+    cpc = df["CPC (INR)"].to_numpy(dtype=float)
+    masks, bids = [], []
+    for rule in rules.itertuples(index=False):
+        masks.append(evaluate_condition(df, rule.condition))
+        bid = cpc * float(rule.multiplier)
+        if pd.notna(rule.min_bid):
+            bid = np.maximum(bid, float(rule.min_bid))
+        bids.append(bid)
+
+    recommended = np.select(masks, bids, default=cpc)
+    rule_ids = np.select(masks, rules["rule_id"].astype(str).tolist(), default=NO_RULE_ID)
+    return pd.Series(recommended, index=df.index), pd.Series(rule_ids, index=df.index)
+
+
+def load_bid_rules(file):
+    """Read a user-supplied rule table (CSV with RULE_COLUMNS) or return an error message."""
+    rules = load_report(file)
+    missing_columns = [col for col in RULE_COLUMNS if col not in rules.columns]
+    if missing_columns:
+        return f"Rule table is missing columns: {', '.join(missing_columns)}"
+    rules = rules[RULE_COLUMNS].dropna(subset=["rule_id", "condition"])
+    rules["multiplier"] = pd.to_numeric(rules["multiplier"], errors="coerce").fillna(1.0)
+    rules["min_bid"] = pd.to_numeric(rules["min_bid"], errors="coerce")
+    for condition in rules["condition"]:
+        try:
+            parse_condition(condition)
+        except ValueError as e:
+            return f"Rule table has an unsupported condition: {e}"
+    return rules
+
+
+@timed("aggregate: bid optimization")
+def analyze_keywords(df, rules=None):
+    # Ensure the required columns are present
+    if not all(col in df.columns for col in REQUIRED_COLUMNS):
+        return "Missing required columns in the uploaded file. Please check the format."
+
+    # Advanced bid adjustment based on performance factors
+    try:
+        recommended, rule_ids = apply_bid_rules(df, DEFAULT_BID_RULES if rules is None else rules)
+    except Exception as e:
+        return f"Could not evaluate bid rules: {e}"
+
+    return df.assign(**{"Recommended Bid (INR)": recommended, "Bid Rule": rule_ids})
+
+
+def render():
+    st.title("Amazon PPC Manual Campaign Bid Optimizer")
+
+    uploaded_file = session_upload("Amazon", "Campaign", "Upload your manual campaign report (CSV)", type=["csv"])
+
+    with st.expander("⚙️ Bid Rules"):
+        st.dataframe(DEFAULT_BID_RULES, use_container_width=True)
+        rules_file = st.file_uploader(
+            "Upload custom bid rules (CSV)", type=["csv"],
+            help="Columns: rule_id, condition, multiplier, min_bid. Rules are applied top to bottom; "
+                 "wrap column names containing spaces in backticks, e.g. `Sales (INR)` > 10000."
+        )
+
+    rules = None
+    if rules_file is not None:
+        rules = load_bid_rules(rules_file)
+        if isinstance(rules, str):
+            st.error(rules)
+            return
+
+    if uploaded_file is not None:
+        df = session_value("Amazon", "Campaign", "frame", lambda: load_report(uploaded_file))
+        optimized_df = analyze_keywords(df, rules)
+
+        if isinstance(optimized_df, str):
+            st.error(optimized_df)
+        else:
+            st.success("Bid optimization completed!")
+            with stage("table: Optimized Bids"):
+                st.dataframe(optimized_df)
+            export_buttons(optimized_df, "optimized_bids", key="campaign_export", label="Download Optimized Report")
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+# Payload caps for the dashboards' Plotly figures. Series longer than
+# MAX_POINTS are downsampled with LTTB (largest triangle three buckets),
+# which keeps the peaks and dips a plain stride would drop; traces over
+# WEBGL_POINTS are drawn with WebGL instead of SVG; category charts keep
+# their largest MAX_CATEGORIES values and sum the rest into "Other".
+MAX_POINTS = 2000
+WEBGL_POINTS = 1000
+MAX_CATEGORIES = 15
+MAX_SLICES = 8
+OTHER = "Other"
+
+
+def _numeric(values):
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.to_numpy(dtype=float)
+    # Dates (including datetime.date objects from groupby(...dt.date))
+    return pd.to_datetime(values).to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(float)
+
+
+def lttb(x, y, threshold):
+    """Positions of the points LTTB keeps when reducing (x, y) to threshold points.
+
+    x must be sorted. The first and last points are always kept; every
+    bucket in between contributes the point forming the largest triangle
+    with the previously kept point and the average of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    kept = np.empty(threshold, dtype=np.intp)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[previous] - avg_x) * (y[lo:hi] - y[previous]) - (x[previous] - x[lo:hi]) * (avg_y - y[previous]))
+        previous = kept[i + 1] = lo + int(np.argmax(area))
+    return kept
+
+
+def downsample(df, x, y, threshold=MAX_POINTS, by=None):
+    """df sorted by x and reduced to at most threshold rows per series."""
+    df = df.sort_values(x, kind="stable")
+    if by is None:
+        if len(df) <= threshold:
+            return df
+        return df.iloc[lttb(_numeric(df[x]), _numeric(df[y]), threshold)]
+    return pd.concat(
+        [downsample(group, x, y, threshold) for _, group in df.groupby(by, sort=False, observed=True)],
+        ignore_index=True,
+    )
+
+
+def top_categories(df, category, value, limit=MAX_CATEGORIES, other=OTHER):
+    """The limit - 1 largest categories by value, with the rest summed into one "Other" row."""
+    if len(df) <= limit:
+        return df
+    df = df.sort_values(value, ascending=False, kind="stable")
+    head, tail = df.iloc[:limit - 1], df.iloc[limit - 1:]
+    rest = pd.DataFrame({category: [other], value: [tail[value].sum()]})
+    # A category already named "Other" absorbs the tail instead of repeating
+    return pd.concat([head[[category, value]], rest], ignore_index=True).groupby(category, sort=False, as_index=False)[value].sum()
+
+
+def line_chart(df, x, y, threshold=MAX_POINTS, **kwargs):
+    """px.line over a downsampled copy of df, switching to WebGL for long series."""
+    points = downsample(df, x, y, threshold, by=kwargs.get("color"))
+    kwargs.setdefault("render_mode", "webgl" if len(points) > WEBGL_POINTS else "svg")
+    return px.line(points, x=x, y=y, **kwargs)
+
+
+def bar_chart(df, x, y, limit=MAX_CATEGORIES, **kwargs):
+    """px.bar of the largest limit - 1 categories of x plus an "Other" bar."""
+    return px.bar(top_categories(df, x, y, limit), x=x, y=y, **kwargs)
+
+
+def pie_chart(df, names, values, limit=MAX_SLICES, **kwargs):
+    """px.pie of the largest limit - 1 slices plus an "Other" slice."""
+    return px.pie(top_categories(df, names, values, limit), names=names, values=values, **kwargs)
@@ -0,0 +1,83 @@
+import streamlit as st
+from sku_aggregation import upload_key
+
+# Uploaded reports kept for the whole browser session, one per (platform,
+# report). A report uploaded on one page or tab is offered again by every
+# other uploader for the same report, and its parsed frame and summaries
+# (session_value) are built once per upload, so navigating away and back
+# neither re-uploads nor recomputes anything.
+SESSION_KEY = "datasets"
+
+
+class Dataset:
+    """One session upload (one file or several) and the values built from it."""
+
+    def __init__(self, files):
+        self.files = list(files)
+        self.key = upload_key(self.files)
+        self.values = {}
+
+    @property
+    def name(self):
+        return ", ".join(file.name for file in self.files)
+
+
+def _datasets():
+    return st.session_state.setdefault(SESSION_KEY, {})
+
+
+def get_dataset(platform, report):
+    return _datasets().get((platform, report))
+
+
+def clear_dataset(platform, report):
+    _datasets().pop((platform, report), None)
+
+
+def session_upload(platform, report, label, type=None, key=None, accept_multiple_files=False, help=None, container=st):
+    """st.file_uploader that remembers its upload for the session.
+
+    Returns what file_uploader would (a file, or a list of files when
+    accept_multiple_files is set). When nothing is uploaded here, the
+    report uploaded earlier on any page is returned instead, with a note
+    and a button to drop it.
+    """
+    uploaded = container.file_uploader(label, type=type, key=key, accept_multiple_files=accept_multiple_files, help=help)
+    datasets = _datasets()
+    if uploaded:
+        files = uploaded if accept_multiple_files else [uploaded]
+        current = datasets.get((platform, report))
+        if current is None or current.key != upload_key(files):
+            datasets[(platform, report)] = Dataset(files)
+        return uploaded
+
+    dataset = datasets.get((platform, report))
+    # A single-file uploader cannot stand in for a multi-file upload
+    if dataset is None or (not accept_multiple_files and len(dataset.files) > 1):
+        return uploaded
+    note, clear = container.columns([4, 1])
+    note.caption(f"📎 Using {dataset.name}, uploaded earlier in this session.")
+    if clear.button("✖️ Clear", key=f"clear_{platform}_{report}_{key or label}"):
+        clear_dataset(platform, report)
+        st.rerun()
+    return list(dataset.files) if accept_multiple_files else dataset.files[0]
+
+
+def session_value(platform, report, name, build):
+    """build() once per session upload of a report; later calls reuse the result.
+
+    For the parsed frame and filter-independent summaries. Values are
+    dropped when a different file is uploaded for the report. Without a
+    session upload (e.g. reports read from the history store) build() is
+    simply called.
+    """
+    dataset = get_dataset(platform, report)
+    if dataset is None:
+        return build()
+    if name in dataset.values:
+        return dataset.values[name]
+    value = build()
+    # None marks a failed build (already reported); try again next time
+    if value is not None:
+        dataset.values[name] = value
+    return value
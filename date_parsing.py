@@ -0,0 +1,143 @@
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+from instrumentation import timed
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+# Explicit strftime formats learned per (platform/report, column). Reports
+# from the same marketplace keep their formats, so after the first upload
+# every parse skips pandas' per-call format inference.
+_formats = {}
+_formats_lock = threading.Lock()
+
+# Unique values tried when guessing a column's format.
+GUESS_SAMPLE = 20
+
+
+def learned_formats():
+    with _formats_lock:
+        return dict(_formats)
+
+
+def _candidate_formats(samples):
+    candidates = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for dayfirst in (False, True):
+            for value in samples:
+                fmt = guess_datetime_format(value, dayfirst=dayfirst)
+                if fmt and fmt not in candidates:
+                    candidates.append(fmt)
+    return candidates
+
+
+def _to_naive(parsed):
+    if getattr(parsed, "tz", None) is not None:
+        return parsed.tz_localize(None)
+    return parsed
+
+
+def _parse_with_format(values, fmt):
+    """Parse unique strings with an explicit format, dropping any timezone."""
+    try:
+        return _to_naive(pd.DatetimeIndex(pd.to_datetime(values, format=fmt, errors="coerce")))
+    except ValueError:
+        # Mixed UTC offsets cannot share one timezone; normalise to UTC.
+        parsed = pd.DatetimeIndex(pd.to_datetime(values, format=fmt, errors="coerce", utc=True))
+        return parsed.tz_convert(None)
+
+
+def _parse_fallback(values):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            return _to_naive(pd.DatetimeIndex(pd.to_datetime(values, errors="coerce")))
+        except ValueError:
+            return pd.DatetimeIndex(pd.to_datetime(values, errors="coerce", utc=True)).tz_convert(None)
+
+
+def _learn_format(values):
+    """Pick the candidate format that parses the most of the given unique strings."""
+    samples = values[:GUESS_SAMPLE]
+    best_fmt, best_parsed = None, 0
+    for fmt in _candidate_formats(samples):
+        parsed = int(_parse_with_format(values, fmt).notna().sum())
+        if parsed > best_parsed:
+            best_fmt, best_parsed = fmt, parsed
+    return best_fmt
+
+
+def _unique_strings(series):
+    """Factorize a column; returns codes and the distinct non-blank strings."""
+    codes, uniques = pd.factorize(series)
+    uniques = pd.Index(uniques).astype(str).str.strip()
+    return codes, uniques
+
+
+@timed("date parsing")
+def parse_date_columns(df, columns, key=None):
+    """Parse several date columns of df in one batched pass, in place.
+
+    Each column is factorized so every distinct timestamp string is parsed
+    only once. Columns sharing a learned format are parsed together in a
+    single to_datetime call with that explicit format; values the format
+    does not fit fall back to pandas' own inference. Timezones are dropped,
+    keeping local wall time. key (e.g. ("Flipkart", "Returns")) scopes the
+    format cache.
+    """
+    pending = {}
+    for col in columns:
+        if col not in df.columns:
+            continue
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            if getattr(df[col].dt, "tz", None) is not None:
+                df[col] = df[col].dt.tz_localize(None)
+            continue
+        pending[col] = _unique_strings(df[col])
+
+    # Group columns by format, learning formats for columns not seen before.
+    by_format = {}
+    for col, (_, uniques) in pending.items():
+        values = uniques[uniques != ""]
+        with _formats_lock:
+            fmt = _formats.get((key, col))
+        if fmt is None and len(values):
+            fmt = _learn_format(values)
+            if fmt is not None:
+                with _formats_lock:
+                    _formats[(key, col)] = fmt
+        by_format.setdefault(fmt, []).append(col)
+
+    for fmt, cols in by_format.items():
+        batch = pd.Index(np.concatenate([pending[col][1] for col in cols])).unique()
+        batch = batch[batch != ""]
+        if fmt is None:
+            parsed = _parse_fallback(batch)
+        else:
+            parsed = _parse_with_format(batch, fmt)
+            missed = parsed.isna()
+            if missed.any():
+                # Values outside the learned format (e.g. a changed export
+                # layout): infer those individually and relearn next time.
+                fallback = _parse_fallback(batch[missed])
+                values = parsed.to_numpy().copy()
+                values[np.asarray(missed)] = fallback.to_numpy()
+                parsed = pd.DatetimeIndex(values)
+                if fallback.notna().any():
+                    with _formats_lock:
+                        for col in cols:
+                            _formats.pop((key, col), None)
+
+        # A trailing NaT lets -1 (blank / missing) positions index straight into it.
+        lookup = np.append(parsed.to_numpy(), np.datetime64("NaT"))
+        for col in cols:
+            codes, uniques = pending[col]
+            per_unique = np.append(lookup[batch.get_indexer(uniques)], np.datetime64("NaT"))
+            df[col] = pd.Series(per_unique[codes], index=df.index, name=col)
+    return df
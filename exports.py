@@ -0,0 +1,108 @@
+import gzip
+import io
+
+import pandas as pd
+import streamlit as st
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet downloads need pyarrow
+    pa = pq = None
+
+# Downloads are built only when their button is clicked (Streamlit runs the
+# data callable on demand), so reruns never serialize the frame. Files are
+# written CHUNK_ROWS rows at a time: each format holds one chunk of
+# converted rows besides the output itself.
+CHUNK_ROWS = 50_000
+XLSX_MAX_ROWS = 1_048_575  # per sheet, below the header row
+
+FORMATS = {
+    "csv": ("CSV", ".csv", "text/csv"),
+    "csv.gz": ("CSV (gzip)", ".csv.gz", "application/gzip"),
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+    "xlsx": ("Excel", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def _chunks(df, size=CHUNK_ROWS):
+    for start in range(0, max(len(df), 1), size):
+        yield df.iloc[start:start + size]
+
+
+def write_csv(df, fh, index=False):
+    text = io.TextIOWrapper(fh, encoding="utf-8", newline="", write_through=True)
+    for i, chunk in enumerate(_chunks(df)):
+        chunk.to_csv(text, index=index, header=i == 0)
+    text.detach()
+
+
+def write_csv_gz(df, fh, index=False):
+    with gzip.GzipFile(fileobj=fh, mode="wb", compresslevel=6) as gz:
+        write_csv(df, gz, index)
+
+
+def write_parquet(df, fh, index=False):
+    if pq is None:
+        raise ImportError("Parquet export requires pyarrow")
+    # Arrow-backed columns convert without copying; row groups keep readers chunked too
+    table = pa.Table.from_pandas(df, preserve_index=index)
+    pq.write_table(table, fh, row_group_size=CHUNK_ROWS, compression="zstd")
+
+
+def _excel_values(chunk):
+    chunk = chunk.copy()
+    for col in chunk.columns:
+        # Excel has no time zones; keep the wall-clock time
+        if isinstance(chunk[col].dtype, pd.DatetimeTZDtype):
+            chunk[col] = chunk[col].dt.tz_localize(None)
+    chunk = chunk.astype(object)
+    return chunk.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+
+def write_xlsx(df, fh, index=False):
+    """Write df with openpyxl's write-only mode, which streams rows instead of keeping cells."""
+    import openpyxl
+
+    if index:
+        df = df.reset_index()
+    workbook = openpyxl.Workbook(write_only=True)
+    header = [str(col) for col in df.columns]
+    # Frames past Excel's row limit continue on further sheets
+    for sheet_start in range(0, max(len(df), 1), XLSX_MAX_ROWS):
+        sheet = workbook.create_sheet(f"Sheet{sheet_start // XLSX_MAX_ROWS + 1}")
+        sheet.append(header)
+        for chunk in _chunks(df.iloc[sheet_start:sheet_start + XLSX_MAX_ROWS]):
+            for row in _excel_values(chunk):
+                sheet.append(row)
+    workbook.save(fh)
+
+
+WRITERS = {"csv": write_csv, "csv.gz": write_csv_gz, "parquet": write_parquet, "xlsx": write_xlsx}
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt != "parquet" or pq is not None]
+
+
+def build_export(df, fmt, index=False):
+    """The export of df in fmt as an in-memory file, positioned at the start."""
+    buffer = io.BytesIO()
+    WRITERS[fmt](df, buffer, index)
+    buffer.seek(0)
+    return buffer
+
+
+def export_buttons(df, file_stem, key, label="📥 Download", formats=None, index=False):
+    """One download button per format; each file is built when its button is clicked."""
+    formats = [fmt for fmt in (formats or available_formats()) if fmt in available_formats()]
+    for column, fmt in zip(st.columns(len(formats)), formats):
+        name, suffix, mime = FORMATS[fmt]
+        column.download_button(
+            f"{label} {name}",
+            data=lambda fmt=fmt: build_export(df, fmt, index),
+            file_name=f"{file_stem}{suffix}",
+            mime=mime,
+            key=f"{key}_{fmt}",
+            on_click="ignore",
+        )
@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Indexes kept per loaded report (see report_loader's "report_key" attr).
+INDEX_CACHE_SIZE = 4
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+class FilterIndex:
+    """Row index for the sidebar filters of one report, built once per upload.
+
+    Rows are ordered by the date column so a date range becomes a pair of
+    binary searches, and every value of each filter column has a packed
+    bitmap over that order. A filter state is then answered by OR-ing the
+    selected values' bitmaps per column and AND-ing the columns, touching
+    only the bytes inside the date range.
+    """
+
+    def __init__(self, df, date_column=None, columns=()):
+        self.size = len(df)
+        if date_column is not None and date_column in df.columns:
+            dates = df[date_column].to_numpy(dtype="datetime64[ns]")
+            # Stable sort keeps file order within a date; NaT sorts last.
+            self.order = np.argsort(dates, kind="stable")
+            self.dates = dates[self.order]
+            self.dated_rows = int(np.count_nonzero(~np.isnat(dates)))
+        else:
+            self.order = np.arange(self.size)
+            self.dates = None
+            self.dated_rows = self.size
+
+        self.bitmaps = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[col].to_numpy()[self.order])
+            self.bitmaps[col] = {value: np.packbits(codes == code) for code, value in enumerate(uniques)}
+
+    def _row_range(self, start, end):
+        if self.dates is None or (start is None and end is None):
+            return 0, self.size
+        dates = self.dates[:self.dated_rows]
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, "ns"), side="left"))
+        hi = self.dated_rows if end is None else int(np.searchsorted(dates, np.datetime64(end, "ns"), side="right"))
+        return lo, hi
+
+    def select(self, filters, start=None, end=None):
+        """Positions (in file order) of rows matching every filter.
+
+        filters maps column -> selected values; None leaves a column
+        unfiltered. start and end bound the date column inclusively, like
+        Series.between, and exclude rows without a date.
+        """
+        lo, hi = self._row_range(start, end)
+        if lo >= hi:
+            return np.empty(0, dtype=np.intp)
+
+        first, last = lo // 8, -(-hi // 8)
+        mask = None
+        for col, values in filters.items():
+            if values is None or col not in self.bitmaps:
+                continue
+            bitmaps = self.bitmaps[col]
+            col_mask = np.zeros(last - first, dtype=np.uint8)
+            for value in values:
+                bitmap = bitmaps.get(value)
+                if bitmap is not None:
+                    np.bitwise_or(col_mask, bitmap[first:last], out=col_mask)
+            mask = col_mask if mask is None else np.bitwise_and(mask, col_mask, out=mask)
+
+        rows = self.order[lo:hi]
+        if mask is not None:
+            offset = lo - first * 8
+            rows = rows[np.unpackbits(mask)[offset:offset + hi - lo].view(bool)]
+        return np.sort(rows)
+
+
+def get_filter_index(df, date_column=None, columns=()):
+    """FilterIndex for df, reused across reruns while the same report is loaded."""
+    report_key = df.attrs.get("report_key")
+    if report_key is None:
+        return FilterIndex(df, date_column, columns)
+
+    key = (report_key, len(df), date_column, tuple(columns))
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+
+    index = FilterIndex(df, date_column, columns)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
@@ -1,25 +1,24 @@
-import streamlit as st
-import os
-
-# Set page config once at the top
-
-st.sidebar.title("📦 Flipkart Reports Dashboard")
-
-# Sidebar menu
-selected_report = st.sidebar.radio(
-    "Select Report Type",
-    ["📦 Order Report", "↩️ Return Report"]
-)
-
-# Utility function to run a Streamlit script
-def run_script(file_name):
-    with open(file_name, "r", encoding="utf-8") as f:
-        code = f.read()
-    exec(code, globals())
-
-# Run appropriate script
-if selected_report == "📦 Order Report":
-    run_script("flipkart_order.py")
-
-elif selected_report == "↩️ Return Report":
-    run_script("flipkart_returns_report.py")
+import streamlit as st
+from report_registry import render_report
+
+FLIPKART_REPORTS = {
+    "📦 Order Report": "Orders",
+    "↩️ Return Report": "Returns",
+}
+
+
+def render():
+    st.sidebar.title("📦 Flipkart Reports Dashboard")
+
+    # Sidebar menu
+    selected_report = st.sidebar.radio(
+        "Select Report Type",
+        list(FLIPKART_REPORTS)
+    )
+
+    # Run appropriate report
+    render_report("Flipkart", FLIPKART_REPORTS[selected_report])
+
+
+if __name__ == "__main__":
+    render()
@@ -1,38 +1,68 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-
-st.set_page_config(page_title="📦 Flipkart Inventory Dashboard", layout="wide")
-st.title("📦 Flipkart Inventory Report Dashboard")
-
-uploaded_file = st.file_uploader("Upload Flipkart Inventory Report (.xlsx or .csv)", type=["xlsx", "csv"])
-
-if uploaded_file:
-    # Read file
-    df = pd.read_excel(uploaded_file) if uploaded_file.name.endswith(".xlsx") else pd.read_csv(uploaded_file)
-
-    # Clean up numeric columns
-    df["stock_quantity"] = pd.to_numeric(df["stock_quantity"], errors="coerce").fillna(0).astype(int)
-    df["average_daily_sales"] = pd.to_numeric(df["average_daily_sales"], errors="coerce").fillna(0)
-    df["days_stock_will_last"] = pd.to_numeric(df["days_stock_will_last"], errors="coerce").fillna(0)
-
-    # Key Metrics
-    total_skus = df["sku"].nunique()
-    total_stock = df["stock_quantity"].sum()
-    avg_daily_sales = df["average_daily_sales"].mean().round(2)
-    low_stock_count = df[df["days_stock_will_last"] <= 7].shape[0]
-
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("📦 Total SKUs", f"{total_skus}")
-    col2.metric("📊 Total Stock Quantity", f"{total_stock}")
-    col3.metric("📈 Avg. Daily Sales", f"{avg_daily_sales}")
-    col4.metric("⏳ SKUs with < 7 Days Stock", f"{low_stock_count}")
-
-    # 🔥 SKUs with lowest stock cover
-    st.subheader("⚠️ Low Stock Alert (≤ 7 Days Cover)")
-    low_stock = df[df["days_stock_will_last"] <= 7].sort_values(by="days_stock_will_last")
-    st.dataframe(low_stock.head(10), use_container_width=True)
-
-    # 📋 Raw Data View
-    with st.expander("📋 View Full Inventory Data"):
-        st.dataframe(df, use_container_width=True)
+import streamlit as st
+from datasets import session_upload, session_value
+from instrumentation import stage, timed
+from report_loader import load_report
+from report_schemas import SCHEMAS
+from report_store import remember_uploads
+from stock_cover import show_stock_cover
+from table_view import paged_table
+
+
+LOW_STOCK_DAYS = 7
+
+
+@timed("aggregate: inventory summary")
+def summarize_flipkart_inventory(df):
+    """KPIs and the low stock table of a Flipkart inventory report, without Streamlit.
+
+    Missing sales and cover figures count as 0. Returns (kpis, tables).
+    """
+    df = df.assign(
+        average_daily_sales=df["average_daily_sales"].fillna(0),
+        days_stock_will_last=df["days_stock_will_last"].fillna(0),
+    )
+    low_stock = df[df["days_stock_will_last"] <= LOW_STOCK_DAYS]
+    kpis = {
+        "total_skus": df["sku"].nunique(),
+        "total_stock": df["stock_quantity"].sum(),
+        "avg_daily_sales": df["average_daily_sales"].mean().round(2),
+        "low_stock_count": low_stock.shape[0],
+    }
+    tables = {"low_stock": low_stock.sort_values(by="days_stock_will_last")}
+    return kpis, tables
+
+
+def render():
+    st.title("📦 Flipkart Inventory Report Dashboard")
+
+    uploaded_file = session_upload("Flipkart", "Inventory", "Upload Flipkart Inventory Report (.xlsx or .csv)", type=["xlsx", "csv"])
+
+    if uploaded_file:
+        # Read file
+        df = session_value("Flipkart", "Inventory", "frame", lambda: load_report(uploaded_file, schema=SCHEMAS[("Flipkart", "Inventory")]))
+        remember_uploads("Flipkart", "Inventory", uploaded_file, df)
+
+        kpis, tables = summarize_flipkart_inventory(df)
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("📦 Total SKUs", f"{kpis['total_skus']}")
+        col2.metric("📊 Total Stock Quantity", f"{kpis['total_stock']}")
+        col3.metric("📈 Avg. Daily Sales", f"{kpis['avg_daily_sales']}")
+        col4.metric("⏳ SKUs with < 7 Days Stock", f"{kpis['low_stock_count']}")
+
+        # 🔥 SKUs with lowest stock cover
+        st.subheader("⚠️ Low Stock Alert (≤ 7 Days Cover)")
+        st.dataframe(tables["low_stock"].head(10), use_container_width=True)
+
+        # 🧮 Days of cover from actual order history
+        show_stock_cover("Flipkart", df, "sku", "stock_quantity")
+
+        # 📋 Raw Data View
+        with st.expander("📋 View Full Inventory Data"):
+            with stage("table: Full Inventory Data"):
+                paged_table(df, key="flipkart_inventory_table")
+
+
+if __name__ == "__main__":
+    st.set_page_config(page_title="📦 Flipkart Inventory Dashboard", layout="wide")
+    render()
@@ -1,101 +1,220 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-st.title("📦 Flipkart Order Lifecycle Dashboard")
-
-uploaded_file = st.file_uploader("Upload Flipkart Order Report (.xlsx or .csv)", type=["xlsx", "csv"])
-
-if uploaded_file:
-    # Load data
-    df = pd.read_excel(uploaded_file) if uploaded_file.name.endswith(".xlsx") else pd.read_csv(uploaded_file)
-
-    # Convert date columns
-    date_columns = [
-        "order_date", "order_approval_date", "order_cancellation_date",
-        "order_return_approval_date", "dispatched_date", "order_delivery_date"
-    ]
-    for col in date_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-
-    # Fill missing titles if needed
-    if "product_title" in df.columns:
-        df["product_title"] = df["product_title"].fillna("Unknown Product")
-
-    # Date filter
-    if "order_date" in df.columns:
-        st.sidebar.header("📅 Filter by Order Date")
-        min_date, max_date = df["order_date"].min(), df["order_date"].max()
-        date_range = st.sidebar.date_input("Select Date Range", [min_date, max_date])
-        start_date, end_date = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
-        df = df[(df["order_date"] >= start_date) & (df["order_date"] <= end_date)]
-
-    # Key metrics
-    total_orders = df["order_id"].nunique()
-    cancelled_orders = df[df["order_item_status"].astype(str).str.lower() == "cancelled"].shape[0]
-    returned_orders = df[df["order_item_status"].astype(str).str.lower() == "returned"].shape[0]
-    total_quantity = df["quantity"].sum() if "quantity" in df.columns else 0
-
-    # Revenue estimate
-    if "quantity" in df.columns and "price" in df.columns:
-        df["price"] = pd.to_numeric(df["price"], errors="coerce").fillna(0)
-        estimated_revenue = (df["quantity"] * df["price"]).sum()
-    else:
-        estimated_revenue = 0
-
-    # SLA breaches
-    dispatch_sla_breaches = df["dispatch_sla_breached"].astype(str).str.lower().eq("yes").sum() if "dispatch_sla_breached" in df.columns else 0
-    delivery_sla_breaches = df["delivery_sla_breached"].astype(str).str.lower().eq("yes").sum() if "delivery_sla_breached" in df.columns else 0
-
-    # Display metrics
-    col1, col2, col3, col4, col5, col6 = st.columns(6)
-    col1.metric("📦 Total Orders", f"{total_orders}")
-    col2.metric("❌ Cancelled Orders", f"{cancelled_orders}")
-    col3.metric("↩️ Returned Orders", f"{returned_orders}")
-    col4.metric("🧮 Total Quantity", f"{total_quantity}")
-    col5.metric("💰 Estimated Revenue", f"₹{estimated_revenue:,.2f}")
-    col6.metric("🚚 SLA Breaches", f"{dispatch_sla_breaches + delivery_sla_breaches}")
-
-    # Orders over time
-    if "order_date" in df.columns:
-        st.subheader("📈 Orders Over Time")
-        daily_orders = df.groupby(df["order_date"].dt.date).size().reset_index(name="Orders")
-        fig = px.line(daily_orders, x="order_date", y="Orders", markers=True)
-        st.plotly_chart(fig, use_container_width=True)
-
-    # Top and least moving products
-    if {"sku", "product_title", "quantity"}.issubset(df.columns):
-        sku_title_sales = (
-            df.groupby(["sku", "product_title"])["quantity"]
-            .sum()
-            .reset_index()
-            .sort_values(by="quantity", ascending=False)
-        )
-
-        top_movers = sku_title_sales.head(10).rename(columns={"quantity": "Total Quantity Sold"})
-        least_movers = sku_title_sales[sku_title_sales["quantity"] > 0].tail(10).rename(columns={"quantity": "Total Quantity Sold"})
-
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("### 🚀 Top Moving Products")
-            st.dataframe(top_movers, use_container_width=True)
-
-        with col2:
-            st.markdown("### 🐢 Least Moving Products")
-            st.dataframe(least_movers, use_container_width=True)
-    else:
-        st.warning("Required columns missing: 'sku', 'product_title', or 'quantity'.")
-
-    # SLA breakdown chart
-    if dispatch_sla_breaches > 0 or delivery_sla_breaches > 0:
-        st.subheader("📊 SLA Breach Breakdown")
-        sla_df = pd.DataFrame({
-            "SLA Type": ["Dispatch SLA", "Delivery SLA"],
-            "Breached": [dispatch_sla_breaches, delivery_sla_breaches]
-        })
-        fig_sla = px.bar(sla_df, x="SLA Type", y="Breached", text_auto=True, color="SLA Type")
-        st.plotly_chart(fig_sla, use_container_width=True)
-
-    # Raw data
-    with st.expander("🔍 View Raw Uploaded Data"):
-        st.dataframe(df.head(50), use_container_width=True)
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from charts import line_chart
+from datasets import session_upload
+from instrumentation import stage, timed
+from jobs import background_value, parse_pool, previewed_value
+from report_loader import file_kind, load_report, load_reports
+from report_schemas import SCHEMAS
+from report_store import history_source, remember_uploads
+from sampling import estimate_count, estimate_groups, estimate_total, format_estimate, format_rows, sample_note, sample_report
+from sketches import HyperLogLog
+from sku_aggregation import bottom_n, summarize_skus, top_n
+
+
+# Natural key of an order line; overlapping exports repeat these rows.
+# Exports without order_item_id are not deduplicated, since order_id alone
+# would merge the lines of multi-item orders.
+ORDER_KEYS = ["order_item_id", "order_id"]
+
+# Merged exports and stored history count unique ids with a HyperLogLog
+# instead of a hash table of every id.
+UNIQUE_HLL_PRECISION = 14  # ~0.8% error, 16 KB
+
+
+def count_unique(values, approximate=False):
+    """Distinct non-missing values: exact, or a HyperLogLog estimate."""
+    if not approximate:
+        return int(values.nunique())
+    sketch = HyperLogLog(UNIQUE_HLL_PRECISION)
+    sketch.add(values)
+    return sketch.count()
+
+
+def load_flipkart_orders(file, executor=None):
+    """Load Flipkart order report(s) (upload, path or a list), filling missing titles.
+
+    Several files are parsed in parallel and merged, dropping order lines
+    repeated across overlapping export windows. Parses run on executor
+    when one is given.
+    """
+    if isinstance(file, (list, tuple)):
+        df = load_reports(file, schema=SCHEMAS[("Flipkart", "Orders")], dedupe_on=ORDER_KEYS, executor=executor)
+    else:
+        df = load_report(file, schema=SCHEMAS[("Flipkart", "Orders")], executor=executor)
+    if "product_title" in df.columns:
+        df["product_title"] = df["product_title"].fillna("Unknown Product")
+    return df
+
+
+@timed("aggregate: order summary")
+def summarize_flipkart_orders(df, cache_key=None, approximate=False):
+    """KPIs and tables of a (date-filtered) Flipkart order report, without Streamlit.
+
+    Returns (kpis, tables); tables only holds what the report's columns allow.
+    With approximate, total_orders is a HyperLogLog estimate.
+    """
+    has = set(df.columns)
+    kpis = {
+        "total_orders": count_unique(df["order_id"], approximate),
+        "cancelled_orders": df[df["order_item_status"].astype(str).str.lower() == "cancelled"].shape[0],
+        "returned_orders": df[df["order_item_status"].astype(str).str.lower() == "returned"].shape[0],
+        "total_quantity": int(df["quantity"].sum()) if "quantity" in has else 0,
+    }
+
+    # Revenue estimate
+    if {"quantity", "price"} <= has:
+        kpis["estimated_revenue"] = float((df["quantity"] * df["price"].fillna(0)).sum())
+    else:
+        kpis["estimated_revenue"] = 0.0
+
+    # SLA breaches
+    kpis["dispatch_sla_breaches"] = int(df["dispatch_sla_breached"].astype(str).str.lower().eq("yes").sum()) if "dispatch_sla_breached" in has else 0
+    kpis["delivery_sla_breaches"] = int(df["delivery_sla_breached"].astype(str).str.lower().eq("yes").sum()) if "delivery_sla_breached" in has else 0
+
+    tables = {}
+    if "order_date" in has:
+        tables["daily_orders"] = df.groupby(df["order_date"].dt.date).size().reset_index(name="Orders")
+
+    # Top and least moving products
+    if {"sku", "product_title", "quantity"} <= has:
+        sku_title_sales = summarize_skus(
+            df, ["sku", "product_title"], {"quantity": ("quantity", "sum")}, cache_key=cache_key,
+        )
+        tables["top_movers"] = top_n(sku_title_sales, "quantity")
+        tables["least_movers"] = bottom_n(sku_title_sales, "quantity", positive_only=True).iloc[::-1]
+    return kpis, tables
+
+
+def show_flipkart_order_preview(sample):
+    """Order line KPIs and top products estimated from a sample of the report."""
+    st.info(sample_note(sample))
+    frame = sample.frame
+    has = set(frame.columns)
+    status = frame["order_item_status"].astype(str).str.lower() if "order_item_status" in has else pd.Series("", index=frame.index)
+    quantity = frame["quantity"] if "quantity" in has else pd.Series(0, index=frame.index)
+    revenue = estimate_total(sample, quantity * frame["price"].fillna(0)) if {"quantity", "price"} <= has else (0, 0)
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("📦 Order Lines", format_rows(sample))
+    col2.metric("❌ Cancelled Orders", format_estimate(*estimate_count(sample, status == "cancelled")))
+    col3.metric("↩️ Returned Orders", format_estimate(*estimate_count(sample, status == "returned")))
+    col4.metric("🧮 Total Quantity", format_estimate(*estimate_total(sample, quantity)))
+    col5.metric("💰 Estimated Revenue", format_estimate(*revenue, "₹{:,.2f}"))
+
+    if {"product_title", "quantity"} <= has:
+        st.markdown("### 🚀 Top Moving Products (estimated)")
+        top_movers = estimate_groups(sample, "product_title", quantity)
+        st.dataframe(pd.DataFrame({
+            "product_title": top_movers["product_title"],
+            "Total Quantity Sold": [format_estimate(value, margin) for value, margin in zip(top_movers["estimate"], top_movers["margin"])],
+        }), use_container_width=True)
+
+
+def render():
+    st.title("📦 Flipkart Order Lifecycle Dashboard")
+
+    uploaded_files = session_upload(
+        "Flipkart", "Orders", "Upload Flipkart Order Report(s) (.xlsx or .csv)", type=["xlsx", "csv"], accept_multiple_files=True,
+        help="Select several exports to cover a longer period; overlapping orders are counted once.",
+    )
+    preview = st.sidebar.toggle("⚡ Preview from a sample", help="For a large CSV upload: show estimates from a row sample while the full report loads.")
+
+    history = history_source("Flipkart", "Orders")
+
+    if uploaded_files or history is not None:
+        if history is not None:
+            df = history
+            if "product_title" in df.columns:
+                df = df.assign(product_title=df["product_title"].fillna("Unknown Product"))
+        else:
+            # Load and merge data, filling missing titles, in the background
+            if preview and len(uploaded_files) == 1 and file_kind(uploaded_files[0]) == "csv":
+                df = previewed_value(
+                    "Flipkart", "Orders", "frame",
+                    lambda: sample_report(uploaded_files[0], schema=SCHEMAS[("Flipkart", "Orders")]),
+                    lambda: load_flipkart_orders(uploaded_files, executor=parse_pool()),
+                    show_flipkart_order_preview, "Parsing the order report",
+                )
+            else:
+                df = background_value("Flipkart", "Orders", "frame", lambda: load_flipkart_orders(uploaded_files, executor=parse_pool()),
+                                      "Parsing the order report")
+            if df is None:
+                return
+            remember_uploads("Flipkart", "Orders", uploaded_files, df)
+            if len(uploaded_files) > 1:
+                st.caption(f"Merged {len(uploaded_files)} files, {df.attrs.get('duplicates_dropped', 0):,} duplicate order lines removed.")
+
+        # Date filter
+        report_key = df.attrs.get("report_key")
+        filter_state = None
+        if "order_date" in df.columns:
+            st.sidebar.header("📅 Filter by Order Date")
+            min_date, max_date = df["order_date"].min(), df["order_date"].max()
+            date_range = st.sidebar.date_input("Select Date Range", [min_date, max_date])
+            start_date, end_date = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
+            with stage("filter"):
+                df = df[(df["order_date"] >= start_date) & (df["order_date"] <= end_date)]
+            filter_state = (start_date, end_date)
+
+        merged = history is not None or len(uploaded_files) > 1
+        kpis, tables = summarize_flipkart_orders(df, cache_key=(report_key, filter_state), approximate=merged)
+        dispatch_sla_breaches = kpis["dispatch_sla_breaches"]
+        delivery_sla_breaches = kpis["delivery_sla_breaches"]
+
+        # Display metrics
+        col1, col2, col3, col4, col5, col6 = st.columns(6)
+        if merged:
+            col1.metric("📦 Total Orders", f"≈ {kpis['total_orders']:,}", help="HyperLogLog estimate, typically within 1%.")
+        else:
+            col1.metric("📦 Total Orders", f"{kpis['total_orders']}")
+        col2.metric("❌ Cancelled Orders", f"{kpis['cancelled_orders']}")
+        col3.metric("↩️ Returned Orders", f"{kpis['returned_orders']}")
+        col4.metric("🧮 Total Quantity", f"{kpis['total_quantity']}")
+        col5.metric("💰 Estimated Revenue", f"₹{kpis['estimated_revenue']:,.2f}")
+        col6.metric("🚚 SLA Breaches", f"{dispatch_sla_breaches + delivery_sla_breaches}")
+
+        # Orders over time
+        if "daily_orders" in tables:
+            st.subheader("📈 Orders Over Time")
+            with stage("chart: Orders Over Time"):
+                fig = line_chart(tables["daily_orders"], x="order_date", y="Orders", markers=True)
+                st.plotly_chart(fig, use_container_width=True)
+
+        # Top and least moving products
+        if "top_movers" in tables:
+            with stage("table: Top and Least Moving Products"):
+                top_movers = tables["top_movers"].rename(columns={"quantity": "Total Quantity Sold"})
+                least_movers = tables["least_movers"].rename(columns={"quantity": "Total Quantity Sold"})
+
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("### 🚀 Top Moving Products")
+                    st.dataframe(top_movers, use_container_width=True)
+
+                with col2:
+                    st.markdown("### 🐢 Least Moving Products")
+                    st.dataframe(least_movers, use_container_width=True)
+        else:
+            st.warning("Required columns missing: 'sku', 'product_title', or 'quantity'.")
+
+        # SLA breakdown chart
+        if dispatch_sla_breaches > 0 or delivery_sla_breaches > 0:
+            st.subheader("📊 SLA Breach Breakdown")
+            with stage("chart: SLA Breach Breakdown"):
+                sla_df = pd.DataFrame({
+                    "SLA Type": ["Dispatch SLA", "Delivery SLA"],
+                    "Breached": [dispatch_sla_breaches, delivery_sla_breaches]
+                })
+                fig_sla = px.bar(sla_df, x="SLA Type", y="Breached", text_auto=True, color="SLA Type")
+                st.plotly_chart(fig_sla, use_container_width=True)
+
+        # Raw data
+        with st.expander("🔍 View Raw Uploaded Data"):
+            with stage("table: Raw Uploaded Data"):
+                st.dataframe(df.head(50), use_container_width=True)
+
+
+if __name__ == "__main__":
+    render()
@@ -1,82 +1,144 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-
-st.title("↩️ Flipkart Return Report Dashboard")
-
-uploaded_file = st.file_uploader("Upload Flipkart Return Report (.xlsx or .csv)", type=["xlsx", "csv"])
-
-if uploaded_file:
-    # Load file
-    df = pd.read_excel(uploaded_file) if uploaded_file.name.endswith(".xlsx") else pd.read_csv(uploaded_file)
-
-    # Convert relevant dates
-    date_columns = [
-        "return_requested_date", "return_approval_date", "return_completion_date",
-        "return_complete_by_date", "tech_visit_by_date", "tech_visit_completion_datetime",
-        "return_cancellation_date"
-    ]
-    for col in date_columns:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-
-    # Fill missing titles
-    if "product_title" in df.columns:
-        df["product_title"] = df["product_title"].fillna("Unknown Product")
-
-    # Metrics
-    total_returns = df["return_id"].nunique()
-    cancelled_returns = df[df["return_status"].astype(str).str.lower() == "cancelled"].shape[0]
-    completed_returns = df[df["return_status"].astype(str).str.lower() == "completed"].shape[0]
-    total_quantity = df["quantity"].sum() if "quantity" in df.columns else 0
-
-    tech_breaches = df["tech_visit_completion_breach"].astype(str).str.lower().eq("yes").sum() if "tech_visit_completion_breach" in df.columns else 0
-    return_breaches = df["return_completion_breach"].astype(str).str.lower().eq("yes").sum() if "return_completion_breach" in df.columns else 0
-
-    col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("↩️ Total Returns", f"{total_returns}")
-    col2.metric("✅ Completed Returns", f"{completed_returns}")
-    col3.metric("❌ Cancelled Returns", f"{cancelled_returns}")
-    col4.metric("📦 Total Quantity Returned", f"{total_quantity}")
-    col5.metric("⏱️ SLA Breaches", f"{tech_breaches + return_breaches}")
-
-    # 📊 Return Reason Summary
-    if "return_reason" in df.columns:
-        st.subheader("📋 Return Reason Summary")
-        reason_summary = df["return_reason"].value_counts().reset_index()
-        reason_summary.columns = ["Return Reason", "Count"]
-        st.dataframe(reason_summary, use_container_width=True)
-
-    # 📈 Return Requests Over Time
-    if "return_requested_date" in df.columns and df["return_requested_date"].notna().any():
-        st.subheader("📅 Return Requests Over Time")
-        returns_by_date = df.groupby(df["return_requested_date"].dt.date).size().reset_index(name="Returns")
-        fig = px.line(returns_by_date, x="return_requested_date", y="Returns", markers=True)
-        st.plotly_chart(fig, use_container_width=True)
-
-    # 🏷️ Top Returned Products
-    if {"sku", "product_title", "quantity"}.issubset(df.columns):
-        sku_returns = (
-            df.groupby(["sku", "product_title"])["quantity"]
-            .sum()
-            .reset_index()
-            .sort_values(by="quantity", ascending=False)
-            .rename(columns={"quantity": "Total Returned Quantity"})
-        )
-
-        st.subheader("🏷️ Top Returned Products")
-        st.dataframe(sku_returns.head(10), use_container_width=True)
-
-    # 📊 SLA Breach Breakdown
-    if tech_breaches > 0 or return_breaches > 0:
-        st.subheader("📊 SLA Breach Breakdown")
-        breach_df = pd.DataFrame({
-            "SLA Type": ["Tech Visit SLA", "Return Completion SLA"],
-            "Breached": [tech_breaches, return_breaches]
-        })
-        fig_breach = px.bar(breach_df, x="SLA Type", y="Breached", color="SLA Type", text_auto=True)
-        st.plotly_chart(fig_breach, use_container_width=True)
-
-    # 🔍 Raw Data View
-    with st.expander("📋 View Raw Return Data"):
-        st.dataframe(df.head(50), use_container_width=True)
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from charts import line_chart
+from datasets import session_upload, session_value
+from instrumentation import stage, timed
+from jobs import background_value, parse_pool
+from report_loader import load_reports
+from report_schemas import SCHEMAS
+from report_store import history_source, remember_uploads
+from return_join import order_columns, render_return_rates, return_rates
+from flipkart_order import ORDER_KEYS, count_unique
+
+
+# Natural key of a return; overlapping exports repeat these rows.
+RETURN_KEYS = ["return_id"]
+
+
+@timed("aggregate: return summary")
+def summarize_flipkart_returns(df, approximate=False):
+    """KPIs and tables of a Flipkart return report, without Streamlit.
+
+    Returns (kpis, tables); tables only holds what the report's columns allow.
+    With approximate, total_returns is a HyperLogLog estimate.
+    """
+    has = set(df.columns)
+    status = df["return_status"].astype(str).str.lower()
+    kpis = {
+        "total_returns": count_unique(df["return_id"], approximate),
+        "cancelled_returns": df[status == "cancelled"].shape[0],
+        "completed_returns": df[status == "completed"].shape[0],
+        "total_quantity": df["quantity"].sum() if "quantity" in has else 0,
+        "tech_breaches": df["tech_visit_completion_breach"].astype(str).str.lower().eq("yes").sum() if "tech_visit_completion_breach" in has else 0,
+        "return_breaches": df["return_completion_breach"].astype(str).str.lower().eq("yes").sum() if "return_completion_breach" in has else 0,
+    }
+
+    tables = {}
+    if "return_reason" in has:
+        reason_summary = df["return_reason"].value_counts().reset_index()
+        reason_summary.columns = ["Return Reason", "Count"]
+        tables["reason_summary"] = reason_summary
+    if "return_requested_date" in has and df["return_requested_date"].notna().any():
+        tables["returns_by_date"] = df.groupby(df["return_requested_date"].dt.date).size().reset_index(name="Returns")
+    if {"sku", "product_title", "quantity"} <= has:
+        titles = df["product_title"].fillna("Unknown Product")
+        tables["sku_returns"] = (
+            df["quantity"].groupby([df["sku"], titles])
+            .sum()
+            .reset_index()
+            .sort_values(by="quantity", ascending=False)
+            .rename(columns={"quantity": "Total Returned Quantity"})
+        )
+    return kpis, tables
+
+
+def render():
+    st.title("↩️ Flipkart Return Report Dashboard")
+
+    uploaded_files = session_upload(
+        "Flipkart", "Returns", "Upload Flipkart Return Report(s) (.xlsx or .csv)", type=["xlsx", "csv"], accept_multiple_files=True,
+        help="Select several exports to cover a longer period; overlapping returns are counted once.",
+    )
+
+    history = history_source("Flipkart", "Returns")
+
+    if uploaded_files or history is not None:
+        if history is not None:
+            df = history
+        else:
+            # Load and merge files in the background
+            df = background_value("Flipkart", "Returns", "frame", lambda: load_reports(
+                uploaded_files, schema=SCHEMAS[("Flipkart", "Returns")], dedupe_on=RETURN_KEYS, executor=parse_pool(),
+            ), "Parsing the return report")
+            if df is None:
+                return
+            remember_uploads("Flipkart", "Returns", uploaded_files, df)
+            if len(uploaded_files) > 1:
+                st.caption(f"Merged {len(uploaded_files)} files, {df.attrs['duplicates_dropped']:,} duplicate returns removed.")
+
+        merged = history is not None or len(uploaded_files) > 1
+        kpis, tables = summarize_flipkart_returns(df, approximate=merged)
+        tech_breaches, return_breaches = kpis["tech_breaches"], kpis["return_breaches"]
+
+        col1, col2, col3, col4, col5 = st.columns(5)
+        if merged:
+            col1.metric("↩️ Total Returns", f"≈ {kpis['total_returns']:,}", help="HyperLogLog estimate, typically within 1%.")
+        else:
+            col1.metric("↩️ Total Returns", f"{kpis['total_returns']}")
+        col2.metric("✅ Completed Returns", f"{kpis['completed_returns']}")
+        col3.metric("❌ Cancelled Returns", f"{kpis['cancelled_returns']}")
+        col4.metric("📦 Total Quantity Returned", f"{kpis['total_quantity']}")
+        col5.metric("⏱️ SLA Breaches", f"{tech_breaches + return_breaches}")
+
+        # 📊 Return Reason Summary
+        if "reason_summary" in tables:
+            st.subheader("📋 Return Reason Summary")
+            st.dataframe(tables["reason_summary"], use_container_width=True)
+
+        # 📈 Return Requests Over Time
+        if "returns_by_date" in tables:
+            st.subheader("📅 Return Requests Over Time")
+            with stage("chart: Return Requests Over Time"):
+                fig = line_chart(tables["returns_by_date"], x="return_requested_date", y="Returns", markers=True)
+                st.plotly_chart(fig, use_container_width=True)
+
+        # 🏷️ Top Returned Products
+        if "sku_returns" in tables:
+            st.subheader("🏷️ Top Returned Products")
+            st.dataframe(tables["sku_returns"].head(10), use_container_width=True)
+
+        # 📐 Return rates, joining returns to their order lines
+        with st.expander("🔗 Link Order Report(s) for Return Rates"):
+            order_files = session_upload(
+                "Flipkart", "Orders", "Upload Flipkart Order Report(s) covering these returns", type=["xlsx", "csv"],
+                accept_multiple_files=True, key="flipkart_return_orders",
+            )
+        if order_files:
+            try:
+                orders = session_value("Flipkart", "Orders", "order lines", lambda: load_reports(
+                    order_files, columns=order_columns("Flipkart"), schema=SCHEMAS[("Flipkart", "Orders")], dedupe_on=ORDER_KEYS,
+                ))
+                render_return_rates(return_rates(orders, df, "Flipkart"), "flipkart_return_min_orders")
+            except Exception as e:
+                st.error(f"Error linking order report: {e}")
+
+        # 📊 SLA Breach Breakdown
+        if tech_breaches > 0 or return_breaches > 0:
+            st.subheader("📊 SLA Breach Breakdown")
+            with stage("chart: SLA Breach Breakdown"):
+                breach_df = pd.DataFrame({
+                    "SLA Type": ["Tech Visit SLA", "Return Completion SLA"],
+                    "Breached": [tech_breaches, return_breaches]
+                })
+                fig_breach = px.bar(breach_df, x="SLA Type", y="Breached", color="SLA Type", text_auto=True)
+                st.plotly_chart(fig_breach, use_container_width=True)
+
+        # 🔍 Raw Data View
+        with st.expander("📋 View Raw Return Data"):
+            with stage("table: Raw Return Data"):
+                st.dataframe(df.head(50), use_container_width=True)
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,202 @@
+import datetime
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Wall time and memory of each named stage (load, schema coercion, date
+# parsing, aggregations, charts, tables) of one dashboard rerun. Stages
+# nest; those run outside a report (batch jobs, worker processes) are not
+# recorded. Every rerun is logged as one JSON line on the
+# "ecom_reports.timings" logger; set ECOM_REPORTS_TIMING_LOG to a file path
+# (or "-" for stderr) to write them without configuring logging yourself.
+LOG_TARGET = os.environ.get("ECOM_REPORTS_TIMING_LOG")
+
+PANEL_KEY = "instrumentation_panel"
+TRACE_KEY = "instrumentation_trace"
+
+logger = logging.getLogger("ecom_reports.timings")
+if LOG_TARGET:
+    _handler = logging.StreamHandler() if LOG_TARGET == "-" else logging.FileHandler(LOG_TARGET, encoding="utf-8")
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_local = threading.local()
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class _Run:
+    def __init__(self, report):
+        self.report = report
+        self.run_id = uuid.uuid4().hex
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self.stages = []
+        self.stack = []
+
+
+def _session_flag(key):
+    import streamlit as st
+
+    try:
+        return bool(st.session_state.get(key, False))
+    except Exception:  # no Streamlit session (bare scripts, batch jobs)
+        return False
+
+
+@contextmanager
+def stage(name, **details):
+    """Record the wall time and memory of the enclosed block as a stage.
+
+    Yields the stage's record; callers may add details to it (rows, cache
+    hit). Memory is the change in resident size over the stage, plus the
+    peak of Python/NumPy allocations while allocation tracing is on.
+    """
+    current = getattr(_local, "run", None)
+    if current is None:
+        yield details
+        return
+
+    record = {"stage": name, "depth": len(current.stack), **details}
+    current.stages.append(record)
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        allocated, peak = tracemalloc.get_traced_memory()
+        # The peak counter is shared; hand it to the enclosing stages first
+        for parent in current.stack:
+            parent["_peak"] = max(parent.get("_peak", 0), peak)
+        tracemalloc.reset_peak()
+        record["_allocated"] = record["_peak"] = allocated
+    rss = _rss_bytes()
+    current.stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        current.stack.pop()
+        end_rss = _rss_bytes()
+        record["rss_delta_mb"] = round((end_rss - rss) / 2**20, 2) if rss is not None and end_rss is not None else None
+        if tracing and tracemalloc.is_tracing():
+            peak = max(record.pop("_peak"), tracemalloc.get_traced_memory()[1])
+            for parent in current.stack:
+                parent["_peak"] = max(parent.get("_peak", 0), peak)
+            record["alloc_peak_mb"] = round((peak - record.pop("_allocated")) / 2**20, 2)
+
+
+def timed(name):
+    """Decorator recording every call of a function as a stage."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def report_run(report):
+    """Collect the stages of one dashboard rerun, then log and show them.
+
+    Nested calls (a platform app rendering one of its reports) join the
+    outer run and name it after the inner report.
+    """
+    if getattr(_local, "run", None) is not None:
+        _local.run.report = report
+        yield _local.run
+        return
+
+    start_tracing = _session_flag(TRACE_KEY) and not tracemalloc.is_tracing()
+    if start_tracing:
+        tracemalloc.start()
+    current = _Run(report)
+    _local.run = current
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield current
+    except BaseException as e:
+        # Streamlit's st.stop() and reruns also end a run early
+        status = type(e).__name__
+        raise
+    finally:
+        _local.run = None
+        total = time.perf_counter() - start
+        if start_tracing:
+            tracemalloc.stop()
+        log_run(current, total, status)
+    render_panel(current, total)
+
+
+def stage_records(current):
+    return [{key: value for key, value in record.items() if not key.startswith("_")} for record in current.stages]
+
+
+def log_run(current, total, status="ok"):
+    """Emit a rerun's stages as one structured JSON log line."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info(json.dumps({
+        "event": "report_rerun",
+        "run_id": current.run_id,
+        "report": current.report,
+        "started": current.started.isoformat(),
+        "status": status,
+        "total_seconds": round(total, 6),
+        "stages": stage_records(current),
+    }, default=str))
+
+
+def timings_frame(current):
+    """Stage table for display, indented by nesting depth."""
+    records = stage_records(current)
+    if not records:
+        return pd.DataFrame(columns=["Stage", "Seconds", "Memory Δ (MB)"])
+    df = pd.DataFrame(records)
+    table = pd.DataFrame({
+        "Stage": ["\u2003" * depth + name for depth, name in zip(df["depth"], df["stage"])],
+        "Seconds": df["seconds"],
+        "Memory Δ (MB)": df["rss_delta_mb"],
+    })
+    if "alloc_peak_mb" in df.columns:
+        table["Allocated Peak (MB)"] = df["alloc_peak_mb"]
+    measured = {"stage", "depth", "seconds", "rss_delta_mb", "alloc_peak_mb", "error"}
+    table["Details"] = [
+        ", ".join(f"{key}={value}" for key, value in record.items() if key not in measured)
+        + (f" (failed: {record['error']})" if "error" in record else "")
+        for record in records
+    ]
+    return table
+
+
+def render_panel(current, total):
+    """Optional sidebar panel with the stage timings of this rerun."""
+    # Imported here so report_loader and friends stay usable without Streamlit
+    import streamlit as st
+
+    if not st.sidebar.toggle("⏱️ Show stage timings", key=PANEL_KEY):
+        return
+    with st.sidebar.expander("⏱️ Stage Timings", expanded=True):
+        st.checkbox("Trace allocations (slower)", key=TRACE_KEY,
+                    help="Adds the peak Python/NumPy allocation of every stage, from the next rerun on.")
+        st.caption(f"{current.report}: {total:.3f}s this rerun")
+        st.dataframe(timings_frame(current), use_container_width=True, hide_index=True)
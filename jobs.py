@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import streamlit as st
+from datasets import get_dataset, session_value
+
+# Uploaded reports are parsed and summarized off the script thread. A job
+# runs its steps in order on a runner thread and publishes each result as
+# soon as it exists; parsing itself goes to a shared process pool, because
+# XLSX parsing is pure Python and would otherwise hold the GIL the
+# Streamlit server needs to stay responsive. The page renders the job in a
+# fragment that re-runs every POLL_SECONDS, drawing each section once its
+# inputs are ready, and reruns the whole page once the job has finished.
+PARSE_WORKERS = int(os.environ.get("ECOM_REPORTS_PARSE_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+JOB_THREADS = 8
+POLL_SECONDS = 0.5
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+_runner = ThreadPoolExecutor(max_workers=JOB_THREADS, thread_name_prefix="report-job")
+
+
+def parse_pool():
+    """Process pool for background parses, created on first use."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+        return _parse_pool
+
+
+def _reset_parse_pool():
+    global _parse_pool
+    with _parse_pool_lock:
+        _parse_pool = None
+
+
+class Job:
+    """Handle of a background job: named steps run in order, results published as they finish.
+
+    steps is a list of (name, label, func); func receives the results of
+    the earlier steps as a dict. The first failing step stops the job and
+    is kept in error.
+    """
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.results = {}
+        self.error = None
+        self.current = steps[0][1] if steps else None
+        self.started = time.perf_counter()
+        self.finished = None
+        self._future = _runner.submit(self._run)
+
+    def _run(self):
+        try:
+            for name, label, func in self.steps:
+                self.current = label
+                self.results[name] = func(self.results)
+        except BrokenProcessPool as e:
+            # A crashed worker (e.g. out of memory) breaks the pool for everyone
+            _reset_parse_pool()
+            self.error = e
+        except Exception as e:
+            self.error = e
+        finally:
+            self.current = None
+            self.finished = time.perf_counter()
+
+    @property
+    def done(self):
+        return self._future.done()
+
+    @property
+    def progress(self):
+        return len(self.results) / max(len(self.steps), 1)
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def ready(self, *names):
+        return all(name in self.results for name in names)
+
+    def __getitem__(self, name):
+        return self.results[name]
+
+
+def session_job(platform, report, name, steps):
+    """The background job for the session's upload of a report, started on first call.
+
+    A failed job is returned once more, to show its error, and then
+    forgotten, so the next rerun starts a fresh one rather than showing a
+    transient failure until the report is uploaded again.
+    """
+    job = session_value(platform, report, name, lambda: Job(steps))
+    if job.error is not None:
+        dataset = get_dataset(platform, report)
+        if dataset is not None:
+            dataset.values.pop(name, None)
+    return job
+
+
+def show_progress(job):
+    """Progress bar of a running job; the job's error once it has failed."""
+    if job.error is not None:
+        st.error(f"Error: {job.error}")
+        # Any rerun starts the job afresh (see session_job)
+        st.button("🔁 Retry", key=f"retry_job_{id(job)}")
+    elif not job.done:
+        st.progress(job.progress, text=f"⏳ {job.current}… ({job.elapsed:.0f}s)")
+
+
+def render_job(job, render):
+    """Call render(job) now and, while the job runs, again every POLL_SECONDS.
+
+    Only the fragment re-runs while polling, so other widgets on the page
+    stay responsive; the page reruns once when the job finishes, so
+    anything rendered outside the fragment can use the results.
+    """
+    polling = not job.done
+
+    def body():
+        render(job)
+        if polling and job.done:
+            st.rerun()
+
+    st.fragment(body, run_every=POLL_SECONDS if polling else None)()
+
+
+def background_value(platform, report, name, build, label):
+    """build() on a background job for the session's upload, or None while it runs.
+
+    Shows the job's progress until the value is ready (rerunning the page
+    then) and its error if it failed.
+    """
+    job = session_job(platform, report, f"{name} job", [(name, label, lambda results: build())])
+    if job.ready(name):
+        return job[name]
+    render_job(job, show_progress)
+    return None
+
+
+def previewed_value(platform, report, name, sample, build, preview, label):
+    """Like background_value, but shows preview(sample()) until build() is ready.
+
+    sample() runs first on the same job, so the preview appears within
+    moments of the upload; it returns None (no preview) for reports that
+    cannot be sampled.
+    """
+    job = session_job(platform, report, f"{name} preview job", [
+        ("sample", "Sampling the report", lambda results: sample()),
+        (name, label, lambda results: build()),
+    ])
+    if job.ready(name):
+        return job[name]
+
+    def render(job):
+        show_progress(job)
+        if job.ready("sample") and job["sample"] is not None:
+            preview(job["sample"])
+
+    render_job(job, render)
+    return None
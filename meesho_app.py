@@ -1,64 +1,142 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-
-# Setup
-st.title("🛍️ Meesho Sales Report Dashboard")
-
-# Upload file
-uploaded_file = st.file_uploader("📄 Upload Meesho Order Report (.xlsx or .csv)", type=["xlsx", "csv"])
-
-if uploaded_file:
-    df = pd.read_excel(uploaded_file) if uploaded_file.name.endswith(".xlsx") else pd.read_csv(uploaded_file)
-
-    df.columns = df.columns.str.strip()
-
-    # Parse date
-    if 'Order Date' in df.columns:
-        df['Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
-
-    # Metrics
-    st.subheader("📊 Summary Metrics")
-    total_orders = len(df)
-    total_units = df['Quantity'].sum() if 'Quantity' in df.columns else 0
-    total_sales = pd.to_numeric(df.get('Supplier Discounted Price (Incl GST and Commision)', 0), errors='coerce').sum()
-
-    col1, col2, col3 = st.columns(3)
-    col1.metric("Total Orders", total_orders)
-    col2.metric("Total Units Sold", int(total_units))
-    col3.metric("Total Sales", f"₹{total_sales:,.2f}")
-
-    st.divider()
-
-    # Orders over time
-    if 'Order Date' in df.columns:
-        st.subheader("📅 Orders Over Time")
-        daily_orders = df.groupby(df['Order Date'].dt.date).size().reset_index(name='Orders')
-        fig = px.line(daily_orders, x='Order Date', y='Orders', title="Orders Over Time")
-        st.plotly_chart(fig, use_container_width=True)
-
-    # Orders by state
-    if 'Customer State' in df.columns:
-        st.subheader("📍 Orders by State")
-        state_data = df['Customer State'].value_counts().reset_index()
-        state_data.columns = ['State', 'Orders']
-        fig2 = px.bar(state_data, x='State', y='Orders', title="Orders by State")
-        st.plotly_chart(fig2, use_container_width=True)
-
-    # Top products
-    if 'Product Name' in df.columns:
-        st.subheader("🏆 Top 10 Products")
-        top_products = df['Product Name'].value_counts().head(10).reset_index()
-        top_products.columns = ['Product Name', 'Orders']
-        st.dataframe(top_products)
-
-    # Return/Credit reasons
-    if 'Reason for Credit Entry' in df.columns:
-        st.subheader("📦 Return Reasons")
-        reasons = df['Reason for Credit Entry'].dropna().value_counts().reset_index()
-        reasons.columns = ['Reason', 'Count']
-        fig3 = px.pie(reasons, names='Reason', values='Count', title="Reasons for Credit Entry")
-        st.plotly_chart(fig3, use_container_width=True)
-
-else:
-    st.info("Please upload a valid Meesho report file.")
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from charts import bar_chart, line_chart, pie_chart
+from datasets import session_upload, session_value
+from instrumentation import stage, timed
+from jobs import parse_pool, previewed_value
+from report_loader import file_kind, load_report
+from report_schemas import SCHEMAS
+from sampling import estimate_groups, estimate_total, format_estimate, format_rows, sample_note, sample_report
+
+SALES_COLUMN = 'Supplier Discounted Price (Incl GST and Commision)'
+
+
+def show_meesho_preview(sample):
+    """Summary metrics, orders by state and top products estimated from a sample of the report."""
+    st.info(sample_note(sample))
+    frame = sample.frame
+    units = estimate_total(sample, frame['Quantity']) if 'Quantity' in frame.columns else (0, 0)
+    sales = estimate_total(sample, frame[SALES_COLUMN]) if SALES_COLUMN in frame.columns else (0, 0)
+
+    st.subheader("📊 Summary Metrics (estimated)")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Orders", format_rows(sample))
+    col2.metric("Total Units Sold", format_estimate(*units))
+    col3.metric("Total Sales", format_estimate(*sales, "₹{:,.2f}"))
+
+    if 'Customer State' in frame.columns:
+        st.subheader("📍 Orders by State (estimated)")
+        state_data = estimate_groups(sample, 'Customer State', n=15).rename(columns={'Customer State': 'State', 'estimate': 'Orders'})
+        fig = px.bar(state_data, x='State', y='Orders', error_y='margin')
+        st.plotly_chart(fig, use_container_width=True)
+
+    if 'Product Name' in frame.columns:
+        st.subheader("🏆 Top 10 Products (estimated)")
+        top_products = estimate_groups(sample, 'Product Name')
+        st.dataframe(pd.DataFrame({
+            'Product Name': top_products['Product Name'],
+            'Orders': [format_estimate(value, margin) for value, margin in zip(top_products['estimate'], top_products['margin'])],
+        }))
+
+
+def _counts(series, label, count_label, n=None):
+    counts = series.value_counts()
+    if n is not None:
+        counts = counts.head(n)
+    counts = counts.reset_index()
+    counts.columns = [label, count_label]
+    return counts
+
+
+@timed("aggregate: order summary")
+def summarize_meesho_orders(df):
+    """KPIs and tables of a Meesho order report, without Streamlit.
+
+    Returns (kpis, tables); tables only holds what the report's columns allow.
+    """
+    df = df.set_axis(df.columns.str.strip(), axis=1)
+    has = set(df.columns)
+    kpis = {
+        'total_orders': len(df),
+        'total_units': df['Quantity'].sum() if 'Quantity' in has else 0,
+        'total_sales': pd.to_numeric(df.get(SALES_COLUMN, 0), errors='coerce').sum(),
+    }
+
+    tables = {}
+    if 'Order Date' in has:
+        tables['daily_orders'] = df.groupby(df['Order Date'].dt.date).size().reset_index(name='Orders')
+    if 'Customer State' in has:
+        tables['states'] = _counts(df['Customer State'], 'State', 'Orders')
+    if 'Product Name' in has:
+        tables['top_products'] = _counts(df['Product Name'], 'Product Name', 'Orders', 10)
+    if 'Reason for Credit Entry' in has:
+        tables['reasons'] = _counts(df['Reason for Credit Entry'].dropna(), 'Reason', 'Count')
+    return kpis, tables
+
+
+def render():
+    # Setup
+    st.title("🛍️ Meesho Sales Report Dashboard")
+
+    # Upload file
+    uploaded_file = session_upload("Meesho", "Orders", "📄 Upload Meesho Order Report (.xlsx or .csv)", type=["xlsx", "csv"])
+    preview = st.toggle("⚡ Preview from a sample", help="For large CSV uploads: show estimates from a row sample while the full report loads.")
+
+    if uploaded_file:
+        schema = SCHEMAS[("Meesho", "Orders")]
+        if preview and file_kind(uploaded_file) == "csv":
+            df = previewed_value(
+                "Meesho", "Orders", "frame",
+                lambda: sample_report(uploaded_file, schema=schema),
+                lambda: load_report(uploaded_file, schema=schema, executor=parse_pool()),
+                show_meesho_preview, "Parsing the order report",
+            )
+            if df is None:
+                return
+        else:
+            df = session_value("Meesho", "Orders", "frame", lambda: load_report(uploaded_file, schema=schema))
+
+        kpis, tables = summarize_meesho_orders(df)
+
+        # Metrics
+        st.subheader("📊 Summary Metrics")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Total Orders", kpis['total_orders'])
+        col2.metric("Total Units Sold", int(kpis['total_units']))
+        col3.metric("Total Sales", f"₹{kpis['total_sales']:,.2f}")
+
+        st.divider()
+
+        # Orders over time
+        if 'daily_orders' in tables:
+            st.subheader("📅 Orders Over Time")
+            with stage("chart: Orders Over Time"):
+                fig = line_chart(tables['daily_orders'], x='Order Date', y='Orders', title="Orders Over Time")
+                st.plotly_chart(fig, use_container_width=True)
+
+        # Orders by state
+        if 'states' in tables:
+            st.subheader("📍 Orders by State")
+            with stage("chart: Orders by State"):
+                fig2 = bar_chart(tables['states'], x='State', y='Orders', title="Orders by State")
+                st.plotly_chart(fig2, use_container_width=True)
+
+        # Top products
+        if 'top_products' in tables:
+            st.subheader("🏆 Top 10 Products")
+            st.dataframe(tables['top_products'])
+
+        # Return/Credit reasons
+        if 'reasons' in tables:
+            st.subheader("📦 Return Reasons")
+            with stage("chart: Reasons for Credit Entry"):
+                fig3 = pie_chart(tables['reasons'], names='Reason', values='Count', title="Reasons for Credit Entry")
+                st.plotly_chart(fig3, use_container_width=True)
+
+    else:
+        st.info("Please upload a valid Meesho report file.")
+
+
+if __name__ == "__main__":
+    render()
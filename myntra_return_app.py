@@ -1,75 +1,137 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-
-# Set page layout
-
-st.title("🔁 Myntra Return Report Dashboard")
-
-# Upload file
-uploaded_file = st.file_uploader("📄 Upload Myntra Return Report (.xlsx or .csv)", type=["xlsx", "csv"])
-
-if uploaded_file:
-    df = pd.read_excel(uploaded_file) if uploaded_file.name.endswith(".xlsx") else pd.read_csv(uploaded_file)
-
-    # Convert date columns
-    date_cols = [
-        "order_created_date", "order_delivered_date", "return_created_date",
-        "refunded_date", "order_rto_date", "lmdo_last_modified_on"
-    ]
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-
-    # Summary metrics
-    st.subheader("📊 Summary Metrics")
-    total_returns = df['return_id'].notna().sum()
-    rto_orders = df['status'].str.upper().eq("RTO").sum()
-    refunded_orders = df['is_refunded'].astype(str).str.lower().eq("yes").sum()
-    total_quantity = df['quantity'].sum()
-
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Total Returned Orders", total_returns)
-    col2.metric("RTO Orders", rto_orders)
-    col3.metric("Refunded Orders", refunded_orders)
-    col4.metric("Total Units Returned", int(total_quantity))
-
-    st.divider()
-
-    # Return trend
-    if 'return_created_date' in df.columns:
-        st.subheader("📈 Return Trend Over Time")
-        trend_df = df[df['return_created_date'].notna()]
-        trend = trend_df.groupby(trend_df['return_created_date'].dt.date).size().reset_index(name="Returns")
-        fig = px.line(trend, x='return_created_date', y='Returns', title="Return Volume Over Time")
-        st.plotly_chart(fig, use_container_width=True)
-
-    # Top returned styles
-    st.subheader("🎯 Top Returned Styles")
-    if 'style_id' in df.columns:
-        style_counts = df['style_id'].value_counts().head(10).reset_index()
-        style_counts.columns = ['Style ID', 'Return Count']
-        st.dataframe(style_counts)
-
-    # Return reasons (if present)
-    if 'return_reason' in df.columns and df['return_reason'].notna().any():
-        st.subheader("❗ Return Reasons Distribution")
-        reason_counts = df['return_reason'].value_counts().reset_index()
-        reason_counts.columns = ['Return Reason', 'Count']
-        fig2 = px.bar(reason_counts, x='Return Reason', y='Count', title="Top Return Reasons", text_auto=True)
-        st.plotly_chart(fig2, use_container_width=True)
-
-    # Status distribution
-    if 'status' in df.columns:
-        st.subheader("📦 Return Status")
-        status_counts = df['status'].value_counts().reset_index()
-        status_counts.columns = ['Status', 'Count']
-        fig3 = px.pie(status_counts, names='Status', values='Count', title="Return Status Split")
-        st.plotly_chart(fig3, use_container_width=True)
-
-    # Raw data viewer
-    with st.expander("📄 View Raw Data"):
-        st.dataframe(df.head(100))
-
-else:
-    st.info("Please upload a valid Myntra return report to view insights.")
+import streamlit as st
+from charts import bar_chart, line_chart, pie_chart
+from datasets import session_upload
+from instrumentation import stage, timed
+from jobs import parse_pool, render_job, session_job, show_progress
+from report_loader import load_report
+from report_schemas import SCHEMAS
+
+
+def load_myntra_returns(file, executor=None):
+    return load_report(file, schema=SCHEMAS[("Myntra", "Returns")], executor=executor)
+
+
+def myntra_return_kpis(df):
+    return {
+        "total_returns": int(df['return_id'].notna().sum()),
+        "rto_orders": int(df['status'].str.upper().eq("RTO").sum()),
+        "refunded_orders": int(df['is_refunded'].astype(str).str.lower().eq("yes").sum()),
+        "total_quantity": int(df['quantity'].sum()),
+    }
+
+
+def myntra_return_trend(df):
+    """Returns per day, or None without a return date column."""
+    if 'return_created_date' not in df.columns:
+        return None
+    trend_df = df[df['return_created_date'].notna()]
+    return trend_df.groupby(trend_df['return_created_date'].dt.date).size().reset_index(name="Returns")
+
+
+def myntra_return_breakdowns(df):
+    """Top returned styles and the return reason and status splits."""
+    tables = {}
+    if 'style_id' in df.columns:
+        style_counts = df['style_id'].value_counts().head(10).reset_index()
+        style_counts.columns = ['Style ID', 'Return Count']
+        tables["top_styles"] = style_counts
+
+    if 'return_reason' in df.columns and df['return_reason'].notna().any():
+        reason_counts = df['return_reason'].value_counts().reset_index()
+        reason_counts.columns = ['Return Reason', 'Count']
+        tables["reasons"] = reason_counts
+
+    if 'status' in df.columns:
+        status_counts = df['status'].value_counts().reset_index()
+        status_counts.columns = ['Status', 'Count']
+        tables["statuses"] = status_counts
+    return tables
+
+
+@timed("aggregate: return summary")
+def summarize_myntra_returns(df):
+    """KPIs and tables of a Myntra return report, without any Streamlit calls."""
+    kpis = myntra_return_kpis(df)
+    tables = {}
+    trend = myntra_return_trend(df)
+    if trend is not None:
+        tables["trend"] = trend
+    tables.update(myntra_return_breakdowns(df))
+    return kpis, tables
+
+
+def show_myntra_returns(job):
+    """Each section of the dashboard as soon as the background job has its inputs."""
+    show_progress(job)
+
+    # Summary metrics
+    if job.ready("kpis"):
+        kpis = job["kpis"]
+        st.subheader("📊 Summary Metrics")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Total Returned Orders", kpis["total_returns"])
+        col2.metric("RTO Orders", kpis["rto_orders"])
+        col3.metric("Refunded Orders", kpis["refunded_orders"])
+        col4.metric("Total Units Returned", kpis["total_quantity"])
+
+        st.divider()
+
+    # Return trend
+    if job.ready("trend") and job["trend"] is not None:
+        st.subheader("📈 Return Trend Over Time")
+        with stage("chart: Return Volume Over Time"):
+            fig = line_chart(job["trend"], x='return_created_date', y='Returns', title="Return Volume Over Time")
+            st.plotly_chart(fig, use_container_width=True)
+
+    if not job.ready("tables"):
+        return
+    tables = job["tables"]
+
+    # Top returned styles
+    st.subheader("🎯 Top Returned Styles")
+    if "top_styles" in tables:
+        with stage("table: Top Returned Styles"):
+            st.dataframe(tables["top_styles"])
+
+    # Return reasons (if present)
+    if "reasons" in tables:
+        st.subheader("❗ Return Reasons Distribution")
+        with stage("chart: Top Return Reasons"):
+            fig2 = bar_chart(tables["reasons"], x='Return Reason', y='Count', title="Top Return Reasons", text_auto=True)
+            st.plotly_chart(fig2, use_container_width=True)
+
+    # Status distribution
+    if "statuses" in tables:
+        st.subheader("📦 Return Status")
+        with stage("chart: Return Status Split"):
+            fig3 = pie_chart(tables["statuses"], names='Status', values='Count', title="Return Status Split")
+            st.plotly_chart(fig3, use_container_width=True)
+
+    # Raw data viewer
+    with st.expander("📄 View Raw Data"):
+        with stage("table: Raw Data"):
+            st.dataframe(job["frame"].head(100))
+
+
+def render():
+    st.title("🔁 Myntra Return Report Dashboard")
+
+    # Upload file
+    uploaded_file = session_upload("Myntra", "Returns", "📄 Upload Myntra Return Report (.xlsx or .csv)", type=["xlsx", "csv"])
+
+    if uploaded_file:
+        # Parsed and summarized in the background, headline counts first
+        job = session_job("Myntra", "Returns", "summary job", [
+            ("frame", "Parsing the report", lambda results: load_myntra_returns(uploaded_file, executor=parse_pool())),
+            ("kpis", "Counting returns", lambda results: myntra_return_kpis(results["frame"])),
+            ("trend", "Building the return trend", lambda results: myntra_return_trend(results["frame"])),
+            ("tables", "Ranking styles and reasons", lambda results: myntra_return_breakdowns(results["frame"])),
+        ])
+        render_job(job, show_myntra_returns)
+
+    else:
+        st.info("Please upload a valid Myntra return report to view insights.")
+
+
+if __name__ == "__main__":
+    render()
@@ -0,0 +1,492 @@
+import datetime
+import hashlib
+import io
+import json
+import numbers
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from instrumentation import stage, timed
+from report_schemas import apply_schema, parse_time_dtypes
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # columnar conversion is skipped without pyarrow
+    pa = None
+
+# Parsed reports are kept per process so Streamlit reruns (every widget touch)
+# skip re-parsing the same upload. Budget can be overridden with
+# ECOM_REPORTS_CACHE_MB or set_cache_budget().
+DEFAULT_CACHE_MB = 1024
+
+# Workbooks are converted once into uncompressed Arrow IPC (Feather) files so
+# later sessions memory-map them instead of re-parsing the XLSX XML. The files
+# hold customer order data, so the directory is capped like the in-memory
+# cache: files unused for ECOM_REPORTS_COLUMNAR_DAYS are deleted, then the
+# least recently used ones until the total fits ECOM_REPORTS_COLUMNAR_MB.
+# Set ECOM_REPORTS_COLUMNAR=0 to keep nothing on disk.
+DEFAULT_COLUMNAR_MB = 2048
+DEFAULT_COLUMNAR_DAYS = 7
+COLUMNAR_DIR = os.environ.get(
+    "ECOM_REPORTS_COLUMNAR_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ecom-reports")
+)
+COLUMNAR_MAX_BYTES = int(float(os.environ.get("ECOM_REPORTS_COLUMNAR_MB", DEFAULT_COLUMNAR_MB)) * 1024 * 1024)
+COLUMNAR_MAX_AGE = float(os.environ.get("ECOM_REPORTS_COLUMNAR_DAYS", DEFAULT_COLUMNAR_DAYS)) * 24 * 60 * 60
+HEADER_METADATA_KEY = b"ecom_reports_header"
+COLUMNAR_ENABLED = pa is not None and os.environ.get("ECOM_REPORTS_COLUMNAR", "1") != "0"
+
+
+class FrameCache:
+    """Thread-safe LRU cache of DataFrames bounded by total memory usage."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, df):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            if key in self._entries:
+                self.used_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (df, size)
+            self.used_bytes += size
+            self._evict()
+
+    def set_budget(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.used_bytes = 0
+
+    def _evict(self):
+        while self.used_bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.used_bytes -= size
+
+
+_cache = FrameCache(int(os.environ.get("ECOM_REPORTS_CACHE_MB", DEFAULT_CACHE_MB)) * 1024 * 1024)
+
+
+def set_cache_budget(megabytes):
+    """Change the memory budget of the shared parse cache."""
+    _cache.set_budget(int(megabytes * 1024 * 1024))
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def read_file_bytes(file):
+    """Return the raw bytes of an uploaded file or a path on disk."""
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as fh:
+            return fh.read()
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    position = file.tell()
+    file.seek(0)
+    data = file.read()
+    file.seek(position)
+    return data
+
+
+def file_kind(file):
+    name = os.fspath(file) if isinstance(file, (str, os.PathLike)) else getattr(file, "name", "")
+    return "csv" if str(name).lower().endswith(".csv") else "xlsx"
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _wanted(columns):
+    return {str(col).strip() for col in columns}
+
+
+def _select(names, columns):
+    """Names from a header that match the requested columns, ignoring padding."""
+    wanted = _wanted(columns)
+    return [name for name in names if str(name).strip() in wanted]
+
+
+def _header_names(row):
+    """Column names for a raw header row, following read_excel's conventions."""
+    names, seen = [], {}
+    for position, value in enumerate(row):
+        name = f"Unnamed: {position}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def read_xlsx_columns(data, columns):
+    """Stream the first sheet of a workbook, keeping only the requested columns.
+
+    Cells of other columns are never materialized, which keeps peak memory
+    proportional to the projection rather than the full sheet. Returns the
+    frame and the sheet's full header row.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = _header_names(next(rows, ()))
+        wanted = _wanted(columns)
+        positions = [i for i, name in enumerate(header) if name.strip() in wanted]
+        records = [
+            [row[i] if i < len(row) else None for i in positions]
+            for row in rows
+            if any(value is not None for value in row)
+        ]
+    finally:
+        workbook.close()
+
+    df = pd.DataFrame(records, columns=[header[i] for i in positions])
+    return df.infer_objects(), header
+
+
+def read_header(file):
+    """Column names of a report without parsing its rows."""
+    data = read_file_bytes(file)
+    if file_kind(file) == "csv":
+        return list(pd.read_csv(io.BytesIO(data), nrows=0).columns)
+
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        return _header_names(next(workbook.worksheets[0].iter_rows(values_only=True), ()))
+    finally:
+        workbook.close()
+
+
+@timed("parse")
+def _parse(data, kind, read_options, columns=None, schema=None):
+    if kind == "csv":
+        if columns is not None:
+            wanted = _wanted(columns)
+            read_options = {**read_options, "usecols": lambda col: str(col).strip() in wanted}
+        if schema:
+            header = pd.read_csv(io.BytesIO(data), nrows=0, **read_options).columns
+            read_options = {"dtype": parse_time_dtypes(schema, header), **read_options}
+        return pd.read_csv(io.BytesIO(data), **read_options)
+    if columns is not None:
+        if not read_options:
+            return read_xlsx_columns(data, columns)[0]
+        wanted = _wanted(columns)
+        read_options = {**read_options, "usecols": lambda col: str(col).strip() in wanted}
+    return pd.read_excel(io.BytesIO(data), **read_options)
+
+
+def _columnar_path(key):
+    options_digest = hashlib.sha256(repr(key[2]).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(COLUMNAR_DIR, f"{key[0]}-{options_digest}.arrow")
+
+
+def arrow_ready(df):
+    """Type object columns so the frame can be stored as Arrow.
+
+    Excel exports often pad empty numeric/date cells with blank strings, so
+    blanks are treated as missing before deciding a column is numeric or
+    datetime. Anything still holding mixed Python types is stored as text.
+    """
+    df = df.infer_objects()
+    for col in df.columns[df.dtypes == object]:
+        values = df[col]
+        present = values.notna() & (values.astype(str).str.strip() != "")
+        kinds = set(values[present].map(type))
+        if kinds and all(issubclass(kind, numbers.Number) for kind in kinds):
+            df[col] = pd.to_numeric(values.where(present))
+            continue
+        if kinds and all(issubclass(kind, datetime.datetime) for kind in kinds):
+            df[col] = pd.to_datetime(values.where(present))
+            continue
+        try:
+            pa.array(values, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[col] = values.where(values.isna(), values.astype(str))
+    return df
+
+
+def columnar_contents(path):
+    """Return the stored column names and the sheet's full header for a converted report.
+
+    A converted file may hold only the columns that have been requested so
+    far; the header tells whether a missing column exists in the sheet at all.
+    """
+    try:
+        schema = feather.read_table(path, memory_map=True).schema
+    except (OSError, pa.ArrowException):
+        return [], None
+    stored = [name for name in schema.names if not name.startswith("__index_level_")]
+    header = (schema.metadata or {}).get(HEADER_METADATA_KEY)
+    return stored, None if header is None else json.loads(header)
+
+
+@timed("read columnar")
+def read_columnar(path, columns=None):
+    """Memory-map a converted report and return (a projection of) it as a DataFrame."""
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def write_columnar(df, path, header):
+    """Store a typed copy of df as an uncompressed Arrow file at path."""
+    df = arrow_ready(df)
+    df.columns = [str(col) for col in df.columns]
+    table = pa.Table.from_pandas(df, preserve_index=None)
+    metadata = {**(table.schema.metadata or {}), HEADER_METADATA_KEY: json.dumps(header).encode("utf-8")}
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, path)
+    prune_columnar()
+    return df
+
+
+def prune_columnar(max_bytes=None, max_age=None, now=None):
+    """Delete converted reports that are too old or over the directory's size budget.
+
+    Reads touch a file's modification time, so the oldest files are the
+    least recently used ones.
+    """
+    max_bytes = COLUMNAR_MAX_BYTES if max_bytes is None else max_bytes
+    max_age = COLUMNAR_MAX_AGE if max_age is None else max_age
+    now = time.time() if now is None else now
+    try:
+        names = os.listdir(COLUMNAR_DIR)
+    except OSError:
+        return
+    files = []
+    for name in names:
+        if not name.endswith(".arrow"):
+            continue
+        path = os.path.join(COLUMNAR_DIR, name)
+        try:
+            info = os.stat(path)
+        except OSError:
+            continue
+        files.append((info.st_mtime, info.st_size, path))
+
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    for mtime, size, path in files:
+        if total <= max_bytes and now - mtime <= max_age:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+
+def _load_xlsx(data, key, read_options, columns):
+    if not COLUMNAR_ENABLED:
+        return _parse(data, "xlsx", read_options, columns)
+
+    path = _columnar_path(key)
+    stored, header = columnar_contents(path)
+    if header is not None:
+        needed = header if columns is None else _select(header, columns)
+        if set(needed) <= set(stored):
+            try:
+                df = read_columnar(path, needed)
+                os.utime(path)
+                return df
+            except (OSError, pa.ArrowException):
+                pass
+
+    # Grow the converted file to cover everything asked for so far, so the
+    # workbook is parsed again only when a report needs a new column.
+    if columns is None or read_options:
+        df = _parse(data, "xlsx", read_options)
+        header = [str(col) for col in df.columns]
+    else:
+        df, header = read_xlsx_columns(data, [*stored, *columns])
+
+    if isinstance(df, pd.DataFrame):
+        try:
+            df = write_columnar(df, path, header)
+        except (OSError, ValueError, TypeError, pa.ArrowException):
+            pass
+    return df if columns is None else df[_select(df.columns, columns)]
+
+
+def load_report(file, columns=None, schema=None, executor=None, **read_options):
+    """Parse an uploaded CSV/XLSX report, reusing the cached frame on reruns.
+
+    The cache key is a hash of the file contents plus the parse options, so
+    re-uploading the same export under another name is still a cache hit.
+    Workbooks are also converted to a memory-mapped Arrow file on first
+    load, so other sessions and restarts skip the XLSX parse.
+
+    When columns is given only those columns are read (matched ignoring
+    surrounding whitespace); requested columns absent from the file are
+    simply missing from the result, so callers can still report them.
+    A schema from report_schemas.SCHEMAS sets compact column dtypes
+    (categories, int32, datetimes) before the frame is cached.
+    A copy is returned, callers are free to mutate it; its
+    attrs["report_key"] identifies the parsed report, so per-upload
+    structures such as filter_index can be reused across reruns.
+    With an executor (see jobs.parse_pool) a cache miss is parsed there.
+    """
+    with stage("load", file=getattr(file, "name", str(file))) as record:
+        data = read_file_bytes(file)
+        kind = file_kind(file)
+        key, cache_key = _cache_keys(data, kind, read_options, columns, schema)
+
+        df = _cache.get(cache_key)
+        record["cache"] = "hit" if df is not None else "miss"
+        if df is None:
+            job = (data, kind, key, cache_key, read_options, columns, schema)
+            df = _load_uncached(*job) if executor is None else executor.submit(_load_uncached, *job).result()
+            _cache.put(cache_key, df)
+        df = df.copy()
+        record["rows"] = len(df)
+    return df
+
+
+def parse_bytes(data, kind, columns=None, **read_options):
+    """Parse raw report bytes ("csv" or "xlsx") without caching or schema coercion."""
+    return _parse(data, kind, read_options, columns)
+
+
+def _cache_keys(data, kind, read_options, columns, schema):
+    key = (hashlib.sha256(data).hexdigest(), kind, _freeze(read_options))
+    cache_key = (*key, None if columns is None else tuple(sorted(_wanted(columns))), _freeze(schema))
+    return key, cache_key
+
+
+def _load_uncached(data, kind, key, cache_key, read_options, columns, schema):
+    if kind == "csv":
+        df = _parse(data, kind, read_options, columns, schema)
+    else:
+        df = _load_xlsx(data, key, read_options, columns)
+    if schema:
+        df = apply_schema(df, schema)
+    df.attrs["report_key"] = cache_key
+    return df
+
+
+def align_categories(frames):
+    """Give shared categorical columns one category set so concat keeps them categorical."""
+    for col in frames[0].columns:
+        dtypes = [frame[col].dtype for frame in frames if col in frame.columns]
+        if len(dtypes) < len(frames) or not all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        categories = pd.Index(np.concatenate([dtype.categories.to_numpy(dtype=object) for dtype in dtypes])).unique()
+        dtype = pd.CategoricalDtype(categories)
+        for frame in frames:
+            frame[col] = frame[col].astype(dtype)
+    return frames
+
+
+def dedupe_rows(df, keys):
+    """Drop repeated rows by natural key, keeping the last occurrence.
+
+    Key columns are hashed to one uint64 per row and duplicates found with a
+    hash table, so no sort of the frame is needed. Rows with every key
+    missing cannot be matched and are always kept. Raises ValueError when a
+    key column is missing: a narrower key would merge distinct rows.
+    """
+    missing = [key for key in keys if key not in df.columns]
+    if missing:
+        raise ValueError(f"Missing key columns for deduplication: {', '.join(missing)}")
+    if not keys or df.empty:
+        return df
+    hashes = pd.Series(pd.util.hash_pandas_object(df[keys], index=False).to_numpy())
+    keyless = df[keys].isna().all(axis=1).to_numpy()
+    duplicated = hashes.duplicated(keep="last").to_numpy() & ~keyless
+    if not duplicated.any():
+        return df
+    return df[~duplicated].reset_index(drop=True)
+
+
+def load_reports(files, columns=None, schema=None, dedupe_on=None, workers=None, executor=None, **read_options):
+    """Load several exports of the same report into one frame.
+
+    Files missing from the cache are parsed concurrently in worker
+    processes (XLSX parsing is pure Python, so threads would serialize on
+    the GIL). Frames are concatenated in upload order and, when dedupe_on
+    names natural-key columns, rows repeated across overlapping export
+    windows are dropped keeping the latest file's copy; a single file, or
+    files without every key column, are kept as they are. The number of
+    dropped rows is in attrs["duplicates_dropped"]. Misses are parsed on
+    executor instead when one is given.
+    """
+    files = list(files)
+    if not files:
+        raise ValueError("No report files to load")
+    with stage("load", files=len(files)) as record:
+        jobs = []
+        for file in files:
+            data = read_file_bytes(file)
+            kind = file_kind(file)
+            jobs.append((data, kind, *_cache_keys(data, kind, read_options, columns, schema)))
+
+        frames = [_cache.get(cache_key) for _, _, _, cache_key in jobs]
+        misses = {}
+        for i, (data, kind, key, cache_key) in enumerate(jobs):
+            if frames[i] is None:
+                misses.setdefault(cache_key, []).append(i)
+
+        args = {cache_key: (*jobs[positions[0]], read_options, columns, schema) for cache_key, positions in misses.items()}
+        if executor is not None:
+            futures = {cache_key: executor.submit(_load_uncached, *job) for cache_key, job in args.items()}
+            parsed = {cache_key: future.result() for cache_key, future in futures.items()}
+        elif len(args) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(args), workers or os.cpu_count() or 1)) as pool:
+                futures = {cache_key: pool.submit(_load_uncached, *job) for cache_key, job in args.items()}
+                parsed = {cache_key: future.result() for cache_key, future in futures.items()}
+        else:
+            parsed = {cache_key: _load_uncached(*job) for cache_key, job in args.items()}
+
+        for cache_key, df in parsed.items():
+            _cache.put(cache_key, df)
+            for i in misses[cache_key]:
+                frames[i] = df
+
+        frames = align_categories([frame.copy() for frame in frames])
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        rows = len(df)
+        if dedupe_on and len(files) > 1 and all(key in df.columns for key in dedupe_on):
+            df = dedupe_rows(df, dedupe_on)
+        df.attrs = {
+            "report_key": (tuple(cache_key for _, _, _, cache_key in jobs), tuple(dedupe_on or ())),
+            "duplicates_dropped": rows - len(df),
+        }
+        record.update(cache=f"{len(files) - sum(map(len, misses.values()))}/{len(files)} hits", rows=len(df))
+    return df
@@ -0,0 +1,54 @@
+import functools
+import importlib
+
+from instrumentation import report_run
+
+# Every dashboard is an importable module exposing a render entry point.
+# Modules are imported the first time a report is opened and then stay in
+# sys.modules, so switching reports only runs the chosen entry point and
+# heavy dependencies (plotly, openpyxl) load only when a report needs them.
+REPORTS = {
+    ("Amazon", "Orders"): ("amazon_order", "process_order_report"),
+    ("Amazon", "Returns"): ("amazon_return", "process_return_report"),
+    ("Amazon", "Inventory"): ("amazon_inventory", "process_inventory"),
+    ("Flipkart", "Orders"): ("flipkart_order", "render"),
+    ("Flipkart", "Returns"): ("flipkart_returns_report", "render"),
+    ("Flipkart", "Inventory"): ("flipkart_inventory_report", "render"),
+    ("Ajio", "Orders"): ("ajio_order", "render"),
+    ("Ajio", "Returns"): ("ajio_return", "render"),
+    ("Ajio", "Inventory"): ("ajio_app", "render"),
+    ("Myntra", "Orders"): ("myntra_order_app", "render"),
+    ("Myntra", "Returns"): ("myntra_return_app", "render"),
+    ("Meesho", "Orders"): ("meesho_app", "render"),
+    ("All Platforms", "SKU Performance"): ("sku_consolidation", "render"),
+}
+
+# Platform landing pages with their own report navigation.
+PLATFORM_APPS = {
+    "Amazon": ("amazon_app", "render"),
+    "Flipkart": ("flipkart_app", "render"),
+    "Ajio": ("ajio_app", "render"),
+    "Myntra": ("myntra_app", "render"),
+    "Meesho": ("meesho_app", "render"),
+    "All Platforms": ("sku_consolidation", "render"),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def load_entry_point(module_name, function_name):
+    """Import a report module once per process and return its entry point."""
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def report_types(platform):
+    return [report_type for (name, report_type) in REPORTS if name == platform]
+
+
+def render_report(platform, report_type):
+    with report_run(f"{platform} {report_type}"):
+        load_entry_point(*REPORTS[(platform, report_type)])()
+
+
+def render_platform(platform):
+    with report_run(platform):
+        load_entry_point(*PLATFORM_APPS[platform])()
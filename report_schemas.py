@@ -0,0 +1,135 @@
+import pandas as pd
+from date_parsing import parse_date_columns
+from instrumentation import timed
+
+# Column dtypes per (platform, report), applied by report_loader.load_report
+# as the file is parsed. Names match case-insensitively, ignoring padding.
+#   category  low-cardinality text (statuses, channels, cities, reasons)
+#   int32     counts and quantities, missing values become 0
+#   float32   rates and ratios where float precision is plenty
+#   float64   money, kept at full precision so totals stay exact to the paisa
+#   datetime  timestamps, timezone dropped to local wall time; parsed with
+#             per-report learned formats (see date_parsing)
+SCHEMAS = {
+    ("Amazon", "Orders"): {
+        "purchase-date": "datetime", "last-updated-date": "datetime",
+        "order-status": "category", "fulfillment-channel": "category", "sales-channel": "category",
+        "order-channel": "category", "ship-service-level": "category", "item-status": "category",
+        "currency": "category", "ship-city": "category", "ship-state": "category", "ship-country": "category",
+        "quantity": "int32", "item-price": "float64", "item-tax": "float64", "shipping-price": "float64",
+        "shipping-tax": "float64", "item-promotion-discount": "float64",
+    },
+    ("Amazon", "Returns"): {
+        "order date": "datetime", "return request date": "datetime", "return delivery date": "datetime",
+        "safet claim creation time": "datetime",
+        "return request status": "category", "return reason": "category", "return type": "category",
+        "resolution": "category", "label type": "category", "return carrier": "category",
+        "label to be paid by": "category", "in policy": "category", "category": "category",
+        "return quantity": "int32", "order quantity": "int32",
+        "order amount": "float64", "refunded amount": "float64", "label cost": "float64",
+    },
+    ("Amazon", "Inventory"): {
+        "quantity": "int32", "price": "float64",
+    },
+    ("Flipkart", "Orders"): {
+        "order_date": "datetime", "order_approval_date": "datetime", "order_cancellation_date": "datetime",
+        "order_return_approval_date": "datetime", "dispatched_date": "datetime", "order_delivery_date": "datetime",
+        "fulfilment_source": "category", "fulfilment_type": "category", "order_item_status": "category",
+        "pickup_logistics_partner": "category", "return_reason": "category", "return_sub_reason": "category",
+        "dispatch_sla_breached": "category", "delivery_sla_breached": "category",
+        "seller_pickup_reattempts": "category",
+        "quantity": "int32", "price": "float64",
+    },
+    ("Flipkart", "Returns"): {
+        "return_requested_date": "datetime", "return_approval_date": "datetime",
+        "return_completion_date": "datetime", "return_complete_by_date": "datetime",
+        "tech_visit_by_date": "datetime", "tech_visit_completion_datetime": "datetime",
+        "return_cancellation_date": "datetime",
+        "fulfilment_type": "category", "return_status": "category", "return_reason": "category",
+        "return_sub_reason": "category", "return_type": "category", "return_result": "category",
+        "return_expectation": "category", "return_completion_type": "category",
+        "return_completion_breach": "category", "tech_visit_completion_breach": "category",
+        "return_cancellation_reason": "category",
+        "quantity": "int32",
+    },
+    ("Flipkart", "Inventory"): {
+        "stock_quantity": "int32", "average_daily_sales": "float32", "days_stock_will_last": "float32",
+    },
+    ("Ajio", "Orders"): {
+        "Order Date": "datetime",
+        "Status": "category", "SLA Status": "category",
+        "Order Qty": "int32", "Customer Cancelled QTY": "int32", "Seller Cancelled QTY": "int32",
+        "Total Value": "float64", "CGST_AMOUNT": "float64", "SGST_AMOUNT": "float64", "IGST_AMOUNT": "float64",
+        "Listing MRP": "float64", "Selling Price": "float64",
+    },
+    ("Ajio", "Returns"): {
+        "Return Created Date": "datetime", "Return Delivered Date": "datetime",
+        "QC completion date": "datetime", "Credit Note Generation Date": "datetime",
+        "Disposition": "category", "QC Reason coding": "category", "Return Status": "category",
+        "Return Carrier Name": "category", "BRAND": "category",
+        "Return QTY": "int32",
+        "Return Value": "float64", "Credit Note Value": "float64", "Credit Note Pre Tax Value": "float64",
+        "Credit Note Tax Value": "float64", "CGST AMOUNT": "float64", "SGST AMOUNT": "float64",
+        "IGST AMOUNT": "float64",
+    },
+    ("Myntra", "Orders"): {
+        "created on": "datetime", "delivered on": "datetime",
+        "order status": "category", "state": "category",
+        "final amount": "float64", "discount": "float64", "coupon discount": "float64",
+    },
+    ("Myntra", "Returns"): {
+        "order_created_date": "datetime", "order_delivered_date": "datetime", "return_created_date": "datetime",
+        "refunded_date": "datetime", "order_rto_date": "datetime", "lmdo_last_modified_on": "datetime",
+        "status": "category", "return_reason": "category", "is_refunded": "category",
+        "quantity": "int32",
+    },
+    ("Meesho", "Orders"): {
+        "Order Date": "datetime",
+        "Customer State": "category", "Reason for Credit Entry": "category",
+        "Quantity": "int32", "Supplier Discounted Price (Incl GST and Commision)": "float64",
+    },
+}
+
+
+def _normalize(name):
+    return str(name).strip().lower()
+
+
+def schema_dtypes(schema, columns):
+    """Map the actual column names present in a file to their schema dtype."""
+    lookup = {_normalize(name): dtype for name, dtype in schema.items()}
+    return {col: lookup[_normalize(col)] for col in columns if _normalize(col) in lookup}
+
+
+def parse_time_dtypes(schema, columns):
+    """Dtypes the CSV reader can build directly while parsing."""
+    return {col: dtype for col, dtype in schema_dtypes(schema, columns).items() if dtype == "category"}
+
+
+def schema_name(schema):
+    """The (platform, report) key of a registered schema, or None."""
+    return next((name for name, registered in SCHEMAS.items() if registered is schema), None)
+
+
+@timed("schema coercion")
+def apply_schema(df, schema):
+    """Coerce df's columns to the schema dtypes, in place, and return it."""
+    dtypes = schema_dtypes(schema, df.columns)
+    parse_date_columns(df, [col for col, dtype in dtypes.items() if dtype == "datetime"], key=schema_name(schema))
+    for col, dtype in dtypes.items():
+        if dtype == "category":
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+        elif dtype == "datetime":
+            continue
+        elif dtype.startswith("int"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(dtype)
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    return df
+
+
+def drop_unused_categories(df):
+    """Forget categories with no rows left after filtering, so counts skip them."""
+    categorical = df.columns[df.dtypes == "category"]
+    return df.assign(**{col: df[col].cat.remove_unused_categories() for col in categorical})
@@ -0,0 +1,310 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from jobs import Job
+from report_loader import align_categories
+from report_schemas import SCHEMAS, apply_schema, schema_dtypes
+from sku_aggregation import upload_key
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # the history store needs pyarrow
+    pa = None
+
+# Uploaded reports are kept as Parquet partitioned by platform, report and
+# month, so dashboards can read back any period without re-uploading it:
+#   <STORE_DIR>/<platform>/<report>/month=YYYY-MM/part.parquet
+# Set ECOM_REPORTS_STORE=0 to disable.
+STORE_DIR = os.environ.get(
+    "ECOM_REPORTS_STORE_DIR", os.path.join(os.path.expanduser("~"), ".local", "share", "ecom-reports", "store")
+)
+STORE_ENABLED = pa is not None and os.environ.get("ECOM_REPORTS_STORE", "1") != "0"
+
+# (platform, report) -> (date column for month partitions, natural key).
+# Names match case-insensitively, ignoring padding. Reports without a date
+# (inventory snapshots) are partitioned by the month they were stored in.
+STORE_KEYS = {
+    ("Amazon", "Orders"): ("purchase-date", ["amazon-order-id", "sku"]),
+    ("Amazon", "Returns"): ("order date", ["order id", "amazon rma id", "merchant sku"]),
+    ("Amazon", "Inventory"): (None, ["sku"]),
+    ("Flipkart", "Orders"): ("order_date", ["order_item_id"]),
+    ("Flipkart", "Returns"): ("return_requested_date", ["return_id"]),
+    ("Flipkart", "Inventory"): (None, ["sku"]),
+}
+
+UNDATED_MONTH = "undated"
+
+_write_lock = threading.Lock()
+_ingested = {}
+
+
+def _resolve(df, name):
+    lookup = {str(col).strip().lower(): col for col in df.columns}
+    return lookup.get(str(name).strip().lower())
+
+
+def _report_dir(platform, report):
+    return os.path.join(STORE_DIR, platform, report)
+
+
+def _partition_path(platform, report, month):
+    return os.path.join(_report_dir(platform, report), f"month={month}", "part.parquet")
+
+
+def stored_months(platform, report):
+    """Months held in the store for a report, oldest first."""
+    root = _report_dir(platform, report)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name.split("=", 1)[1] for name in os.listdir(root)
+        if name.startswith("month=") and os.path.exists(os.path.join(root, name, "part.parquet"))
+    )
+
+
+def _generation(platform, report):
+    """Changes whenever any partition of the report is rewritten."""
+    return tuple(
+        (month, os.stat(_partition_path(platform, report, month)).st_mtime_ns)
+        for month in stored_months(platform, report)
+    )
+
+
+def _text(values):
+    """values as text (None where missing), with whole floats written like ints.
+
+    An id column comes back as int, float (when it has blanks) or text
+    depending on the upload; all of them give the same text.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    text = values.astype(str).astype(object)
+    if pd.api.types.is_float_dtype(values):
+        whole = (values % 1 == 0) & (values.abs() < 2 ** 53)
+        text[whole] = values[whole].astype("int64").astype(str)
+    elif values.dtype == object:
+        floats = values.map(lambda value: isinstance(value, float) and value.is_integer())
+        text[floats] = values[floats].map(lambda value: str(int(value)))
+    return text.where(values.notna(), None)
+
+
+def _key_hashes(df, keys):
+    # Text form, so keys compare equal whatever dtype each partition came back with
+    return pd.util.hash_pandas_object(pd.DataFrame({key: _text(df[key]) for key in keys}), index=False).to_numpy()
+
+
+def _dedupe(df, keys):
+    """Drop repeated keys, keeping the last copy (the incoming rows come last)."""
+    duplicated = pd.Series(_key_hashes(df, keys)).duplicated(keep="last").to_numpy()
+    return df[~duplicated].reset_index(drop=True) if duplicated.any() else df
+
+
+def _storage_type(platform, report, column):
+    # One fixed type per column whatever an upload's values looked like, so
+    # every partition of a report has the same schema: dates and numbers
+    # from the report schema, everything else text
+    dtype = schema_dtypes(SCHEMAS.get((platform, report), {}), [column]).get(column)
+    if dtype == "datetime":
+        return pa.timestamp("us")
+    if dtype is not None and dtype != "category":
+        return pa.float64()
+    return pa.string()
+
+
+def _storage_schema(platform, report, columns):
+    return pa.schema([(str(col), _storage_type(platform, report, col)) for col in columns])
+
+
+def _storage_table(platform, report, df):
+    schema = _storage_schema(platform, report, df.columns)
+    arrays = []
+    for col, field in zip(df.columns, schema):
+        values = df[col]
+        if field.type == pa.string():
+            values = _text(values)
+        elif field.type == pa.float64():
+            values = pd.to_numeric(values, errors="coerce").astype("float64")
+        else:
+            values = pd.to_datetime(values, errors="coerce")
+            if isinstance(values.dtype, pd.DatetimeTZDtype):
+                values = values.dt.tz_localize(None)
+        arrays.append(pa.array(values, type=field.type, from_pandas=True))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _write_partition(platform, report, path, df):
+    if df.empty:
+        os.remove(path)
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(_storage_table(platform, report, df), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def ingest(platform, report, df):
+    """Upsert a loaded report into the store; returns the number of rows written.
+
+    Rows are grouped by month and only the touched partitions are rewritten,
+    plus any other partition holding an older copy of an incoming key (a row
+    whose date moved to another month). Rows sharing the natural key are
+    replaced by the incoming copy; rows with no key value at all are not
+    stored.
+    """
+    date_name, key_names = STORE_KEYS[(platform, report)]
+    df = df.rename(columns=lambda col: str(col).strip())
+    keys = [_resolve(df, name) for name in key_names]
+    if None in keys:
+        raise ValueError(f"Missing key columns for the history store: {key_names}")
+    # Rows without any key (blank or footer lines) could never be upserted
+    df = df[df[keys].notna().any(axis=1)]
+
+    date_col = _resolve(df, date_name) if date_name else None
+    if date_col is not None:
+        months = df[date_col].dt.strftime("%Y-%m").fillna(UNDATED_MONTH)
+    else:
+        months = pd.Series(pd.Timestamp.now().strftime("%Y-%m"), index=df.index)
+    incoming = _key_hashes(df, keys)
+
+    written = 0
+    with _write_lock:
+        touched = set(months.unique())
+        for month in stored_months(platform, report):
+            if month in touched:
+                continue
+            # Only the key columns are read to find moved rows
+            path = _partition_path(platform, report, month)
+            names = {str(name).strip().lower(): name for name in pq.read_schema(path).names}
+            stored_keys = [names.get(str(name).strip().lower()) for name in key_names]
+            if None in stored_keys:
+                continue
+            moved = np.isin(_key_hashes(pq.read_table(path, columns=stored_keys).to_pandas(), stored_keys), incoming)
+            if moved.any():
+                stored = pq.read_table(path).to_pandas()
+                _write_partition(platform, report, path, stored[~moved].reset_index(drop=True))
+
+        for month, rows in df.groupby(months.to_numpy(), sort=False):
+            path = _partition_path(platform, report, month)
+            frames = [rows]
+            if os.path.exists(path):
+                frames.insert(0, pq.read_table(path).to_pandas())
+            merged = pd.concat(align_categories(frames), ignore_index=True) if len(frames) > 1 else rows
+            _write_partition(platform, report, path, _dedupe(merged, keys))
+            written += len(rows)
+    return written
+
+
+def query(platform, report, start=None, end=None, columns=None):
+    """Stored rows of a report between start and end (inclusive dates).
+
+    The month partitions outside the range are pruned and the date predicate
+    is pushed down to the Parquet row groups, so only the requested period
+    is read. Returns None when nothing is stored.
+    """
+    months = stored_months(platform, report)
+    if not months:
+        return None
+
+    date_name, _ = STORE_KEYS[(platform, report)]
+    # Read every partition as the one storage schema, casting any written
+    # before it was fixed
+    names = list(dict.fromkeys(
+        name for month in months for name in pq.read_schema(_partition_path(platform, report, month)).names
+    ))
+    schema = _storage_schema(platform, report, names).append(pa.field("month", pa.string()))
+    dataset = ds.dataset(
+        _report_dir(platform, report), format="parquet", partitioning="hive",
+        schema=schema, exclude_invalid_files=True,
+    )
+    names = {name.strip().lower(): name for name in dataset.schema.names}
+    date_col = names.get(date_name) if date_name else None
+
+    predicate = None
+    if date_col is not None and (start is not None or end is not None):
+        conditions = []
+        if start is not None:
+            start = pd.Timestamp(start)
+            conditions.append(ds.field("month") >= start.strftime("%Y-%m"))
+            conditions.append(ds.field(date_col) >= pa.scalar(start.to_pydatetime(), pa.timestamp("us")))
+        if end is not None:
+            # Whole days, like the dashboards' date pickers
+            end = pd.Timestamp(end).normalize() + pd.Timedelta(days=1)
+            conditions.append(ds.field("month") <= end.strftime("%Y-%m"))
+            conditions.append(ds.field(date_col) < pa.scalar(end.to_pydatetime(), pa.timestamp("us")))
+        predicate = conditions[0]
+        for condition in conditions[1:]:
+            predicate = predicate & condition
+
+    if columns is not None:
+        wanted = {str(col).strip().lower() for col in columns}
+        columns = [name for name in dataset.schema.names if name.strip().lower() in wanted]
+    else:
+        columns = [name for name in dataset.schema.names if name != "month"]
+
+    df = dataset.to_table(columns=columns, filter=predicate).to_pandas()
+    if (platform, report) in SCHEMAS:
+        df = apply_schema(df, SCHEMAS[(platform, report)])
+    df.attrs["report_key"] = ("store", platform, report, start, end, tuple(columns), _generation(platform, report))
+    return df
+
+
+def remember_uploads(platform, report, files, df):
+    """Store df, the frame the page loaded from files, once per upload.
+
+    Ingestion runs on the background job runner, so the page never waits
+    for the Parquet write; its outcome shows in the sidebar on later reruns.
+    """
+    if not STORE_ENABLED or (platform, report) not in STORE_KEYS:
+        return
+    if not st.sidebar.checkbox("💾 Keep uploads in history", value=False, key=f"store_{platform}_{report}"):
+        return
+    files = list(files) if isinstance(files, (list, tuple)) else [files]
+    name = ", ".join(getattr(file, "name", str(file)) for file in files)
+    key = (platform, report, upload_key(files))
+    if key not in _ingested:
+        # A shallow copy: the page may go on to replace columns of its frame
+        frame = df.copy(deep=False)
+        _ingested[key] = Job([("rows", "Storing in history", lambda results: ingest(platform, report, frame))])
+
+    job = _ingested[key]
+    if job.error is not None:
+        st.sidebar.warning(f"Could not store {name}: {job.error}")
+    elif job.ready("rows"):
+        st.sidebar.caption(f"Stored {job['rows']:,} rows of {name} in history.")
+    else:
+        st.sidebar.caption(f"⏳ Storing {name} in history…")
+
+
+def history_source(platform, report, columns=None):
+    """Sidebar control to analyse stored history instead of an upload.
+
+    Returns the stored rows for the chosen period, or None when the store is
+    empty or not selected.
+    """
+    if not STORE_ENABLED or (platform, report) not in STORE_KEYS:
+        return None
+    months = stored_months(platform, report)
+    if not months:
+        return None
+
+    st.sidebar.header("📚 History")
+    if not st.sidebar.toggle("Use stored history", key=f"history_{platform}_{report}"):
+        return None
+    dated = [month for month in months if month != UNDATED_MONTH]
+    start, end = None, None
+    if STORE_KEYS[(platform, report)][0] and dated:
+        first = pd.Period(dated[0]).start_time.date()
+        last = pd.Period(dated[-1]).end_time.date()
+        date_range = st.sidebar.date_input("History period", [first, last], key=f"history_range_{platform}_{report}")
+        if len(date_range) == 2:
+            start, end = date_range
+    try:
+        return query(platform, report, start, end, columns)
+    except Exception as e:
+        st.error(f"Could not read the stored history: {e}")
+        return None
@@ -0,0 +1,248 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from instrumentation import stage, timed
+
+# How order and return rows of a platform link up. Names match
+# case-insensitively, ignoring padding. order_keys and return_keys are
+# matched pairwise (order item id where the export has one, otherwise
+# order id + SKU). Refund value is the return report's refund column when
+# it has one, else returned units x the order line's unit price.
+JOIN_SPECS = {
+    "Flipkart": {
+        "order_keys": ["order_item_id"], "return_keys": ["order_item_id"],
+        "order_date": "order_date", "return_date": "return_requested_date",
+        "sku": "sku", "order_units": "quantity", "return_units": "quantity",
+        "unit_price": "price", "refund": None, "reason": "return_reason",
+    },
+    "Amazon": {
+        "order_keys": ["amazon-order-id", "sku"], "return_keys": ["order id", "merchant sku"],
+        "order_date": "purchase-date", "return_date": "return request date",
+        "sku": "sku", "order_units": "quantity", "return_units": "return quantity",
+        "unit_price": None, "order_value": "item-price", "refund": "refunded amount", "reason": "return reason",
+    },
+}
+
+JOIN_CACHE_SIZE = 4
+
+_joins = OrderedDict()
+_joins_lock = threading.Lock()
+
+
+def order_columns(platform):
+    """Order report columns the join reads, for column-projected loading."""
+    spec = JOIN_SPECS[platform]
+    names = [*spec["order_keys"], spec["order_date"], spec["sku"], spec["order_units"], spec["unit_price"], spec.get("order_value")]
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def _resolve(df, name):
+    if name is None:
+        return None
+    lookup = {str(col).strip().lower(): col for col in df.columns}
+    return lookup.get(str(name).strip().lower())
+
+
+def _numbers(df, name, default=0.0):
+    col = _resolve(df, name)
+    if col is None:
+        return pd.Series(default, index=df.index, dtype=float)
+    return pd.to_numeric(df[col], errors="coerce").fillna(0).astype(float)
+
+
+def _key_values(df, name):
+    col = _resolve(df, name)
+    if col is None:
+        raise ValueError(f"Missing join column: {name}")
+    values = df[col]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(values.cat.categories.dtype)
+    return values
+
+
+def _join_codes(orders, returns, spec):
+    """Integer join keys for both reports, from one joint factorization per key column.
+
+    Each key column of the two reports is factorized together, so equal ids
+    get equal codes on both sides in a single hashing pass; multi-column keys
+    are combined arithmetically and factorized again. An id read as a
+    number in one export and as text in the other is compared as text.
+    Rows with a missing key part get -1.
+    """
+    n_orders = len(orders)
+    combined = None
+    for order_name, return_name in zip(spec["order_keys"], spec["return_keys"]):
+        left, right = _key_values(orders, order_name), _key_values(returns, return_name)
+        if pd.api.types.is_numeric_dtype(left) != pd.api.types.is_numeric_dtype(right):
+            left, right = (_as_text(values) for values in (left, right))
+        # Concatenated as Series so Arrow-backed strings keep their fast hashing
+        codes, uniques = pd.concat([left, right], ignore_index=True).factorize()
+        codes = codes.astype(np.int64)
+        if combined is None:
+            combined = codes
+        else:
+            missing = (combined < 0) | (codes < 0)
+            combined = pd.factorize(combined * len(uniques) + codes)[0].astype(np.int64)
+            combined[missing] = -1
+    return combined[:n_orders], combined[n_orders:]
+
+
+def _as_text(values):
+    """Ids as trimmed text (integers without a trailing .0), NaN kept missing."""
+    if pd.api.types.is_float_dtype(values):
+        values = values.astype("Int64")
+    codes, uniques = pd.factorize(values)
+    text = pd.Index(uniques).astype(str).str.strip()
+    return pd.Series(np.append(text.to_numpy(dtype=object), None)[codes], index=values.index)
+
+
+@timed("aggregate: join returns to orders")
+def join_returns(orders, returns, platform):
+    """Link return rows to their order lines; returns one row per return.
+
+    Only the key columns are hashed (see _join_codes); the order side is
+    then a dense code -> row lookup table, so every return finds its order
+    line with one array index and only the SKU, date and price of matched
+    lines are gathered. Returns without a matching order keep their own SKU
+    and have no order date.
+    """
+    spec = JOIN_SPECS[platform]
+    order_codes, return_codes = _join_codes(orders, returns, spec)
+
+    # Pre-projected order side, one row per key (the last export wins)
+    order_units = _numbers(orders, spec["order_units"])
+    if spec.get("unit_price"):
+        unit_price = _numbers(orders, spec["unit_price"])
+    else:
+        unit_price = _numbers(orders, spec.get("order_value")) / order_units.where(order_units > 0, 1)
+    order_sku = orders[_resolve(orders, spec["sku"])]
+    order_date_col = _resolve(orders, spec["order_date"])
+
+    # Code -> order row lookup table (the last export's copy of a line wins)
+    keep = (order_codes >= 0) & ~pd.Series(order_codes).duplicated(keep="last").to_numpy()
+    lookup = np.full(max(order_codes.max(initial=-1), return_codes.max(initial=-1)) + 2, -1, dtype=np.int64)
+    lookup[order_codes[keep]] = np.flatnonzero(keep)
+    positions = lookup[return_codes]
+    matched = positions >= 0
+    rows = positions[matched]
+
+    return_sku_col = _resolve(returns, spec["sku"])
+    sku = returns[return_sku_col].astype(object).to_numpy(copy=True) if return_sku_col else np.full(len(returns), None, dtype=object)
+    sku[matched] = order_sku.astype(object).to_numpy()[rows]
+
+    order_date = np.full(len(returns), np.datetime64("NaT"), dtype="datetime64[ns]")
+    if order_date_col is not None:
+        order_date[matched] = orders[order_date_col].to_numpy(dtype="datetime64[ns]")[rows]
+    price = np.full(len(returns), np.nan)
+    price[matched] = unit_price.to_numpy()[rows]
+
+    return_units = _numbers(returns, spec["return_units"], default=1.0)
+    if spec.get("refund") and _resolve(returns, spec["refund"]) is not None:
+        refund = _numbers(returns, spec["refund"])
+    else:
+        refund = return_units * np.nan_to_num(price)
+
+    return_date_col = _resolve(returns, spec["return_date"])
+    return_date = returns[return_date_col].to_numpy(dtype="datetime64[ns]") if return_date_col else np.full(len(returns), np.datetime64("NaT"), dtype="datetime64[ns]")
+    reason_col = _resolve(returns, spec["reason"])
+
+    joined = pd.DataFrame({
+        "sku": sku,
+        "reason": returns[reason_col].astype(object).to_numpy() if reason_col else None,
+        "matched": matched,
+        "returned_units": return_units.to_numpy(),
+        "refund_value": refund.to_numpy(),
+        "days_to_return": (return_date - order_date) / np.timedelta64(1, "D"),
+    })
+    return joined
+
+
+@timed("aggregate: return rates")
+def return_rates(orders, returns, platform, min_orders=1):
+    """Return rate, days from order to return and refund value per SKU and per reason.
+
+    Results are cached per (orders, returns) report pair, so Streamlit
+    reruns reuse the join instead of repeating it.
+    """
+    cache_key = (platform, orders.attrs.get("report_key"), returns.attrs.get("report_key"), min_orders)
+    cacheable = None not in cache_key[1:3]
+    if cacheable:
+        with _joins_lock:
+            if cache_key in _joins:
+                _joins.move_to_end(cache_key)
+                return _joins[cache_key]
+
+    spec = JOIN_SPECS[platform]
+    joined = join_returns(orders, returns, platform)
+
+    ordered = _numbers(orders, spec["order_units"]).groupby(orders[_resolve(orders, spec["sku"])], observed=True).sum()
+    ordered.index = ordered.index.astype(object)
+    by_sku = joined.groupby("sku").agg(
+        returns=("returned_units", "size"),
+        returned_units=("returned_units", "sum"),
+        refund_value=("refund_value", "sum"),
+        median_days_to_return=("days_to_return", "median"),
+    )
+    by_sku = by_sku.join(ordered.rename("ordered_units"), how="outer").fillna({
+        "returns": 0, "returned_units": 0, "refund_value": 0, "ordered_units": 0,
+    })
+    by_sku["return_rate"] = by_sku["returned_units"] / by_sku["ordered_units"].where(by_sku["ordered_units"] >= max(min_orders, 1))
+    by_sku.index.name = "sku"
+
+    by_reason = joined.groupby("reason").agg(
+        returns=("returned_units", "size"),
+        returned_units=("returned_units", "sum"),
+        refund_value=("refund_value", "sum"),
+        median_days_to_return=("days_to_return", "median"),
+    ).sort_values("returns", ascending=False)
+    total_ordered = by_sku["ordered_units"].sum()
+    by_reason["share_of_ordered_units"] = by_reason["returned_units"] / total_ordered if total_ordered else np.nan
+
+    result = {
+        "joined": joined,
+        "by_sku": by_sku.reset_index(),
+        "by_reason": by_reason.reset_index(),
+        "matched": int(joined["matched"].sum()),
+        "unmatched": int((~joined["matched"]).sum()),
+    }
+    if cacheable:
+        with _joins_lock:
+            _joins[cache_key] = result
+            while len(_joins) > JOIN_CACHE_SIZE:
+                _joins.popitem(last=False)
+    return result
+
+
+def render_return_rates(result, min_orders_key):
+    """Dashboard section for a return_rates() result."""
+    st.subheader("📐 Return Rate by SKU")
+    st.caption(f"{result['matched']:,} returns linked to their order line, {result['unmatched']:,} without a matching order.")
+
+    by_sku = result["by_sku"]
+    min_orders = st.slider("Minimum units ordered", 1, 50, 5, key=min_orders_key)
+    with stage("table: Return Rate by SKU"):
+        eligible = by_sku[by_sku["ordered_units"] >= min_orders]
+        st.dataframe(
+            eligible.nlargest(10, "return_rate").rename(columns={
+                "sku": "SKU", "ordered_units": "Units Ordered", "returned_units": "Units Returned", "returns": "Returns",
+                "return_rate": "Return Rate", "refund_value": "Refund Value (₹)", "median_days_to_return": "Median Days to Return",
+            }),
+            use_container_width=True,
+        )
+
+    st.subheader("🧾 Returns by Reason")
+    with stage("table: Returns by Reason"):
+        st.dataframe(result["by_reason"].rename(columns={
+            "reason": "Return Reason", "returns": "Returns", "returned_units": "Units Returned", "refund_value": "Refund Value (₹)",
+            "median_days_to_return": "Median Days to Return", "share_of_ordered_units": "Share of Units Ordered",
+        }), use_container_width=True)
+
+    with stage("chart: Time from Order to Return"):
+        days = result["joined"]["days_to_return"].dropna()
+        if len(days):
+            fig = px.histogram(days.to_frame("Days from Order to Return"), x="Days from Order to Return", nbins=30, title="⏳ Time from Order to Return")
+            st.plotly_chart(fig, use_container_width=True)
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+from instrumentation import timed
+from report_loader import file_kind, parse_bytes, read_file_bytes
+from report_schemas import apply_schema
+
+# Preview mode: while a large CSV report is parsed in full, dashboards show
+# estimates from a stratified cluster sample of it. The file is cut into
+# STRATA equal byte ranges and CLUSTERS_PER_STRATUM runs of ROWS_PER_CLUSTER
+# consecutive rows are parsed from random offsets in each range, so the
+# sample spreads over the whole export (which is usually sorted by date) at
+# the cost of a few small parses. Neighbouring rows of a sorted export are
+# alike, so each run is a cluster and margins come from the spread between
+# the runs of a stratum rather than between rows: 95% confidence intervals
+# of stratified ratio estimates.
+STRATA = 20
+CLUSTERS_PER_STRATUM = 8
+ROWS_PER_CLUSTER = 60
+Z_95 = 1.96
+STRATUM = "_stratum"
+CLUSTER = "_cluster"
+
+
+class Sample:
+    """Rows sampled from a report and what is needed to scale them up.
+
+    frame holds the sampled rows with their stratum in STRATUM and the run
+    of rows they were read in in CLUSTER; weights is the estimated share of
+    the report's rows in each stratum; rows is the report's row count. A
+    report small enough to read whole is "sampled" completely and marked
+    exact.
+    """
+
+    def __init__(self, frame, weights, rows, exact=False):
+        self.frame = frame
+        self.weights = weights
+        self.rows = rows
+        self.exact = exact
+
+    @property
+    def size(self):
+        return len(self.frame)
+
+
+def _stratum_clusters(data, header_end, strata, clusters, rows_per_cluster, seed=0):
+    """(stratum, start, end) of runs of rows read from random offsets of each byte range.
+
+    Runs of one stratum do not overlap and stay inside its byte range.
+    """
+    rng = np.random.default_rng(seed)
+    body = len(data) - header_end
+    for h in range(strata):
+        lo = header_end + body * h // strata
+        hi = header_end + body * (h + 1) // strata
+        end = lo
+        for offset in np.sort(rng.integers(lo, hi, size=clusters)):
+            # Start at the first complete line at or after the offset
+            start = max(end, header_end if offset <= header_end else data.find(b"\n", offset - 1) + 1)
+            if start <= 0 or start >= hi:
+                continue
+            end = start
+            for _ in range(rows_per_cluster):
+                if end >= hi:
+                    break
+                newline = data.find(b"\n", end)
+                end = len(data) if newline == -1 else newline + 1
+            yield h, start, end
+
+
+@timed("sample")
+def sample_report(file, columns=None, schema=None, strata=STRATA, clusters=CLUSTERS_PER_STRATUM,
+                  rows_per_cluster=ROWS_PER_CLUSTER, **read_options):
+    """Stratified cluster sample of a CSV report, or None for workbooks.
+
+    columns and schema work as in report_loader.load_report. XLSX files
+    cannot be read from an arbitrary offset, so they are not sampled.
+    """
+    if file_kind(file) != "csv":
+        return None
+    data = read_file_bytes(file)
+    header_end = data.find(b"\n") + 1
+    rows = data.count(b"\n", header_end) + (len(data) > header_end and not data.endswith(b"\n"))
+
+    if header_end == 0 or rows <= strata * clusters * rows_per_cluster:
+        frame = parse_bytes(data, "csv", columns, **read_options)
+        frame[STRATUM] = 0
+        frame[CLUSTER] = 0
+        return _sample(frame, pd.Series({0: 1.0}), len(frame), schema, exact=True)
+
+    # A run may start inside a quoted multi-line field; skip what cannot be parsed
+    read_options.setdefault("on_bad_lines", "skip")
+    parts, sampled_rows, sampled_bytes = [], {}, {}
+    for h, start, end in _stratum_clusters(data, header_end, strata, clusters, rows_per_cluster):
+        part = parse_bytes(data[:header_end] + data[start:end], "csv", columns, **read_options)
+        if part.empty:
+            continue
+        part[STRATUM] = h
+        part[CLUSTER] = len(parts)
+        parts.append(part)
+        sampled_rows[h] = sampled_rows.get(h, 0) + len(part)
+        sampled_bytes[h] = sampled_bytes.get(h, 0) + end - start
+
+    # Rows in each stratum, from the bytes per row seen in its runs
+    body = len(data) - header_end
+    weights = pd.Series({h: (body * (h + 1) // strata - body * h // strata) * sampled_rows[h] / sampled_bytes[h]
+                         for h in sampled_rows})
+    frame = pd.concat(parts, ignore_index=True)
+    return _sample(frame, weights=weights, rows=rows, schema=schema)
+
+
+def _sample(frame, weights, rows, schema, exact=False):
+    # Previews look columns up by their stripped header names
+    frame.columns = frame.columns.str.strip()
+    if schema:
+        frame = apply_schema(frame, schema)
+    return Sample(frame, weights / weights.sum(), rows, exact)
+
+
+def _estimate(sample, totals):
+    """Report totals and 95% margins of each column of totals (per-cluster sums).
+
+    Each stratum's mean per row is a ratio estimate over its clusters; its
+    variance comes from how far the cluster sums stray from that mean
+    times the cluster size.
+    """
+    frame = sample.frame
+    sizes = frame[CLUSTER].value_counts().sort_index()
+    totals = totals.reindex(sizes.index, fill_value=0)
+    strata = frame.groupby(CLUSTER)[STRATUM].first().reindex(sizes.index)
+    stratum_rows = sizes.groupby(strata).sum()
+
+    means = totals.groupby(strata).sum().div(stratum_rows, axis=0)
+    weights = sample.weights.reindex(means.index)
+    estimate = means.mul(weights, axis=0).sum() * sample.rows
+    if sample.exact:
+        return estimate, estimate * 0
+
+    residuals = totals - means.reindex(strata).to_numpy() * sizes.to_numpy()[:, None]
+    clusters = strata.value_counts().reindex(means.index)
+    # A stratum needs two clusters to measure their spread
+    divisor = (clusters * (clusters - 1)).where(clusters > 1) * (stratum_rows / clusters) ** 2
+    variances = (residuals ** 2).groupby(strata).sum().div(divisor, axis=0).fillna(0)
+    return estimate, Z_95 * np.sqrt(variances.mul(weights ** 2, axis=0).sum()) * sample.rows
+
+
+def estimate_total(sample, values):
+    """Estimated report total of values (aligned with sample.frame) and its 95% margin."""
+    frame = sample.frame
+    values = pd.to_numeric(pd.Series(values, index=frame.index), errors="coerce").fillna(0).astype(float)
+    estimate, margin = _estimate(sample, values.groupby(frame[CLUSTER]).sum().to_frame("total"))
+    return estimate["total"], margin["total"]
+
+
+def estimate_count(sample, mask):
+    """Estimated number of report rows where mask holds, and its 95% margin."""
+    return estimate_total(sample, np.asarray(mask, dtype=float))
+
+
+def estimate_groups(sample, column, values=None, n=10):
+    """Largest n estimated group totals of values by column (row counts without values).
+
+    Returns a frame of column, "estimate" and "margin" (95%), largest first.
+    """
+    frame = sample.frame
+    values = pd.Series(1.0, index=frame.index) if values is None else pd.to_numeric(values, errors="coerce").fillna(0)
+    totals = values.groupby([frame[CLUSTER], frame[column]], observed=True).sum().unstack(fill_value=0)
+    estimate, margin = _estimate(sample, totals)
+
+    result = pd.DataFrame({"estimate": estimate, "margin": margin}).rename_axis(column).reset_index()
+    return result.nlargest(n, "estimate").reset_index(drop=True)
+
+
+def format_estimate(value, margin, fmt="{:,.0f}"):
+    """'≈ value ± margin' in fmt; just the value when it is exact."""
+    if not margin:
+        return fmt.format(value)
+    return f"≈ {fmt.format(value)} ± {fmt.format(margin)}"
+
+
+def format_rows(sample):
+    """The report's row count, approximate until the rows are parsed."""
+    return f"{sample.rows:,}" if sample.exact else f"≈ {sample.rows:,}"
+
+
+def sample_note(sample):
+    if sample.exact:
+        return f"⚡ Preview of all {sample.rows:,} rows; charts and filters follow once the report has loaded."
+    return (f"⚡ Preview estimated from {sample.size:,} sampled rows of about {sample.rows:,} "
+            "(± is a 95% confidence interval). Exact figures replace it once the full report has loaded.")
@@ -0,0 +1,157 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Bounded-memory summaries for streaming and multi-file aggregation. Every
+# sketch is mergeable: sketches built on separate chunks, files or workers
+# combine into the sketch of the whole input, and each has a from_error
+# constructor sizing it for a target error.
+DEFAULT_CAPACITY = 10_000
+DEFAULT_PRECISION = 12
+
+
+def _hashes(values, key="0123456789123456"):
+    """64-bit hashes of values (anything pandas can hash), as uint64."""
+    return pd.util.hash_array(np.asarray(values, dtype=object), hash_key=key, categorize=True)
+
+
+class SpaceSaving:
+    """Space-Saving heavy hitters: the capacity most frequent items with bounded error.
+
+    counts holds an upper bound of each kept item's count (indexed by item,
+    which may be a tuple of keys) and errors how much of it may be
+    overcounted. floor bounds the count of any item not kept; while it is
+    0 the counts are exact. Every count is within total / capacity of the
+    true one.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=float)
+        self.errors = pd.Series(dtype=float)
+        self.floor = 0.0
+
+    @classmethod
+    def from_error(cls, epsilon):
+        """Sketch whose counts are off by at most epsilon * total."""
+        return cls(math.ceil(1 / epsilon))
+
+    @property
+    def exact(self):
+        return self.floor == 0
+
+    def add(self, values):
+        """Count each of values once."""
+        self.update(pd.Series(values).value_counts())
+
+    def update(self, counts):
+        """Add pre-aggregated counts: a Series of counts indexed by item."""
+        chunk = SpaceSaving(self.capacity)
+        chunk.counts = counts[counts > 0].astype(float)
+        chunk.errors = pd.Series(0.0, index=chunk.counts.index)
+        chunk._truncate()
+        self.merge(chunk)
+
+    def merge(self, other):
+        """Fold other (built on different data) into this sketch."""
+        if self.counts.empty:
+            items = other.counts.index
+        elif other.counts.empty:
+            items = self.counts.index
+        else:
+            items = self.counts.index.union(other.counts.index)
+        # An item missing from one sketch may have up to that sketch's floor there
+        self.counts = (self.counts.reindex(items, fill_value=self.floor)
+                       + other.counts.reindex(items, fill_value=other.floor))
+        self.errors = (self.errors.reindex(items, fill_value=self.floor)
+                       + other.errors.reindex(items, fill_value=other.floor))
+        self.floor += other.floor
+        self._truncate()
+        return self
+
+    def _truncate(self):
+        if len(self.counts) <= self.capacity:
+            return
+        order = np.argsort(-self.counts.to_numpy(), kind="stable")
+        self.floor = max(self.floor, float(self.counts.iloc[order[self.capacity]]))
+        kept = np.sort(order[:self.capacity])
+        self.counts, self.errors = self.counts.iloc[kept], self.errors.iloc[kept]
+
+    def top(self, n=10):
+        """The n largest items: a frame of "count" (upper bound) and "error"."""
+        return pd.DataFrame({"count": self.counts, "error": self.errors}).nlargest(n, "count")
+
+
+def hll_positions(values, precision=DEFAULT_PRECISION):
+    """HyperLogLog register index and rank of each value; missing values get rank 0."""
+    hashes = _hashes(values)
+    index = (hashes >> np.uint64(64 - precision)).astype(np.intp)
+    rest = (hashes << np.uint64(precision)) >> np.uint64(precision)
+    bits = 64 - precision
+    # Rank: position of the first set bit of the remaining bits
+    length = np.where(rest == 0, 0, np.floor(np.log2(np.maximum(rest, 1).astype(float))) + 1)
+    rank = (bits - length + 1).astype(np.uint8)
+    rank[pd.isna(np.asarray(values, dtype=object))] = 0
+    return index, rank
+
+
+def hll_groups(values, codes, groups, precision=DEFAULT_PRECISION):
+    """HyperLogLog sketches of values per group code (0 .. groups - 1), in one pass.
+
+    Negative codes (rows without a group) are skipped.
+    """
+    index, rank = hll_positions(values, precision)
+    registers = np.zeros((groups, 1 << precision), dtype=np.uint8)
+    rows = np.asarray(codes) >= 0
+    np.maximum.at(registers, (np.asarray(codes)[rows], index[rows]), rank[rows])
+    return [HyperLogLog.from_registers(row) for row in registers]
+
+
+class HyperLogLog:
+    """HyperLogLog distinct count in 2**precision bytes, relative error about 1.04 / sqrt(2**precision)."""
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @classmethod
+    def from_error(cls, relative_error):
+        """Sketch with about relative_error standard error."""
+        return cls(min(18, max(4, math.ceil(math.log2((1.04 / relative_error) ** 2)))))
+
+    @classmethod
+    def from_registers(cls, registers):
+        sketch = cls(int(np.log2(len(registers))))
+        sketch.registers = np.array(registers, dtype=np.uint8)
+        return sketch
+
+    @classmethod
+    def union(cls, sketches, precision=DEFAULT_PRECISION):
+        """One sketch of everything counted by sketches (all of precision)."""
+        merged = cls(precision)
+        for sketch in sketches:
+            merged.merge(sketch)
+        return merged
+
+    def add(self, values):
+        index, rank = hll_positions(values, self.precision)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("HyperLogLog sketches of different precision cannot be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        # Small cardinalities: linear counting is more accurate
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
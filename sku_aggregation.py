@@ -0,0 +1,58 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Per-SKU summaries kept per (dataset, filter state), so reruns that only
+# touch widgets further down the page skip the grouped pass entirely.
+SUMMARY_CACHE_SIZE = 8
+
+_summaries = OrderedDict()
+_summaries_lock = threading.Lock()
+
+
+def upload_key(uploaded_file):
+    """Identify an uploaded file (or a path on disk, or a list of either) across Streamlit reruns."""
+    if isinstance(uploaded_file, (list, tuple)):
+        return tuple(upload_key(file) for file in uploaded_file)
+    if isinstance(uploaded_file, (str, os.PathLike)):
+        stat = os.stat(uploaded_file)
+        return (os.fspath(uploaded_file), stat.st_size, stat.st_mtime)
+    return (uploaded_file.name, uploaded_file.size, getattr(uploaded_file, "file_id", None))
+
+
+def summarize_skus(df, keys, measures, cache_key=None):
+    """All per-SKU measures from one grouped pass.
+
+    measures maps output column -> (source column, aggregation), e.g.
+    {"Order Qty": ("Order Qty", "sum")}. Rows with a missing key are
+    dropped, as with a plain groupby. When cache_key is given (dataset plus
+    filter state) the summary is memoised and returned as a copy.
+    """
+    if cache_key is not None:
+        cache_key = (cache_key, tuple(keys), tuple(sorted(measures.items())))
+        with _summaries_lock:
+            if cache_key in _summaries:
+                _summaries.move_to_end(cache_key)
+                return _summaries[cache_key].copy()
+
+    summary = df.groupby(list(keys), sort=False, observed=True).agg(**measures).reset_index()
+
+    if cache_key is not None:
+        with _summaries_lock:
+            _summaries[cache_key] = summary
+            while len(_summaries) > SUMMARY_CACHE_SIZE:
+                _summaries.popitem(last=False)
+        summary = summary.copy()
+    return summary
+
+
+def top_n(summary, column, n=10):
+    """Largest n rows by column, via partial selection rather than a full sort."""
+    return summary.nlargest(n, column).reset_index(drop=True)
+
+
+def bottom_n(summary, column, n=10, positive_only=False):
+    """Smallest n rows by column; positive_only skips SKUs that never moved."""
+    if positive_only:
+        summary = summary[summary[column] > 0]
+    return summary.nsmallest(n, column).reset_index(drop=True)
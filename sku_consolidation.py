@@ -0,0 +1,267 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from datasets import session_upload, session_value
+from exports import export_buttons
+from instrumentation import stage, timed
+from report_loader import load_report, load_reports
+from report_schemas import SCHEMAS
+from report_store import STORE_ENABLED, query
+
+PLATFORMS = ["Amazon", "Flipkart", "Ajio", "Myntra", "Meesho"]
+MEASURES = ["units", "revenue", "returns", "stock"]
+
+# (platform, report) -> (SKU column candidates, measure -> source).
+# A source is a column name, ROW_COUNT, or a (column, column) pair that is
+# multiplied (quantity x unit price). Names match case-insensitively.
+ROW_COUNT = "*rows"
+SOURCES = {
+    ("Amazon", "Orders"): (["sku"], {"units": "quantity", "revenue": "item-price"}),
+    ("Amazon", "Returns"): (["Merchant SKU"], {"returns": "Return quantity"}),
+    ("Amazon", "Inventory"): (["sku"], {"stock": "quantity"}),
+    ("Flipkart", "Orders"): (["sku"], {"units": "quantity", "revenue": ("quantity", "price")}),
+    ("Flipkart", "Returns"): (["sku"], {"returns": "quantity"}),
+    ("Flipkart", "Inventory"): (["sku"], {"stock": "stock_quantity"}),
+    ("Ajio", "Orders"): (["Seller SKU"], {"units": "Order Qty", "revenue": "Total Value"}),
+    ("Ajio", "Returns"): (["SELLER SKU"], {"returns": "Return QTY"}),
+    ("Myntra", "Orders"): (["style_id", "style name"], {"units": ROW_COUNT, "revenue": "final amount"}),
+    ("Myntra", "Returns"): (["style_id"], {"returns": "quantity"}),
+    ("Meesho", "Orders"): (["SKU"], {"units": "Quantity", "revenue": "Supplier Discounted Price (Incl GST and Commision)"}),
+}
+
+# Marketplace prefixes stripped before matching, e.g. Flipkart's "SKU:ABC-1".
+SKU_PREFIXES = ("SKU:",)
+
+_tables = OrderedDict()
+_tables_lock = threading.Lock()
+TABLE_CACHE_SIZE = 16
+
+
+def _resolve(columns, name):
+    lookup = {str(col).strip().lower(): col for col in columns}
+    return lookup.get(str(name).strip().lower())
+
+
+def source_columns(key):
+    """Every column a report contributes, for column-projected loading."""
+    skus, measures = SOURCES[key]
+    names = list(skus)
+    for source in measures.values():
+        if isinstance(source, tuple):
+            names.extend(source)
+        elif source != ROW_COUNT:
+            names.append(source)
+    return names
+
+
+def normalize_skus(values):
+    """Canonical SKU text: trimmed, upper-case, without marketplace prefixes."""
+    skus = pd.Index(values).astype(str).str.strip().str.upper()
+    for prefix in SKU_PREFIXES:
+        skus = skus.str.removeprefix(prefix).str.strip()
+    return skus
+
+
+def _measure(df, source):
+    if source == ROW_COUNT:
+        return pd.Series(1.0, index=df.index)
+    if isinstance(source, tuple):
+        first, second = (_resolve(df.columns, name) for name in source)
+        if first is None or second is None:
+            return None
+        return pd.to_numeric(df[first], errors="coerce").fillna(0) * pd.to_numeric(df[second], errors="coerce").fillna(0)
+    col = _resolve(df.columns, source)
+    if col is None:
+        return None
+    return pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+
+@timed("aggregate: platform SKU table")
+def platform_table(df, key):
+    """Pre-aggregate one report to one row per platform SKU (sum of each measure).
+
+    Cached by the frame's report_key, so reruns and repeated consolidations
+    never touch the raw rows again.
+    """
+    report_key = df.attrs.get("report_key")
+    cache_key = (key, report_key)
+    if report_key is not None:
+        with _tables_lock:
+            if cache_key in _tables:
+                _tables.move_to_end(cache_key)
+                return _tables[cache_key]
+
+    skus, measures = SOURCES[key]
+    sku_col = next((col for col in (_resolve(df.columns, name) for name in skus) if col is not None), None)
+    if sku_col is None:
+        raise ValueError(f"{key[0]} {key[1]} report has no SKU column ({', '.join(skus)})")
+    values = {measure: _measure(df, source) for measure, source in measures.items()}
+    values = {measure: series for measure, series in values.items() if series is not None}
+
+    table = pd.DataFrame(values, index=df.index).groupby(df[sku_col].to_numpy(), sort=False).sum()
+    if report_key is not None:
+        with _tables_lock:
+            _tables[cache_key] = table
+            while len(_tables) > TABLE_CACHE_SIZE:
+                _tables.popitem(last=False)
+    return table
+
+
+def master_lookup(master):
+    """Per-platform hash index of the SKU master: platform -> (platform SKUs, master SKUs).
+
+    The master has a "master_sku" column plus one column per platform
+    (e.g. "Amazon", "Flipkart") holding that platform's SKU for the product.
+    """
+    if master is None:
+        return {}
+    master_col = _resolve(master.columns, "master_sku")
+    if master_col is None:
+        raise ValueError("SKU master needs a 'master_sku' column")
+    master_ids = normalize_skus(master[master_col])
+    lookups = {}
+    for platform in PLATFORMS:
+        col = _resolve(master.columns, platform)
+        if col is None:
+            continue
+        present = master[col].notna().to_numpy()
+        skus = normalize_skus(master[col][present])
+        # A platform SKU belongs to one product; keep the first mapping
+        unique = ~skus.duplicated()
+        lookups[platform] = (skus[unique], master_ids[present][unique].to_numpy(dtype=object))
+    return lookups
+
+
+@timed("aggregate: consolidate SKUs")
+def consolidate(tables, master=None):
+    """Join pre-aggregated platform tables into one row per master SKU.
+
+    tables maps (platform, report) to platform_table() output. Platform SKUs
+    are mapped to master SKUs with Index.get_indexer (a hash lookup), and
+    measures are summed into the master universe with np.bincount, so the
+    cost scales with distinct SKUs rather than raw rows. SKUs missing from
+    the master are kept under their own (normalized) code.
+    """
+    lookups = master_lookup(master)
+
+    mapped = {}
+    for key, table in tables.items():
+        ids = normalize_skus(table.index).to_numpy(dtype=object)
+        if key[0] in lookups:
+            platform_skus, master_ids = lookups[key[0]]
+            positions = platform_skus.get_indexer(ids)
+            hits = positions >= 0
+            ids[hits] = master_ids[positions[hits]]
+        mapped[key] = ids
+
+    columns = [(platform, measure) for platform in PLATFORMS for measure in MEASURES
+               if any(key[0] == platform and measure in table.columns for key, table in tables.items())]
+    if not columns:
+        return pd.DataFrame()
+    universe = pd.Index(np.concatenate(list(mapped.values()))).unique()
+    totals = np.zeros((len(universe), len(columns)))
+    column_positions = {column: i for i, column in enumerate(columns)}
+
+    for key, table in tables.items():
+        positions = universe.get_indexer(mapped[key])
+        for measure in table.columns:
+            i = column_positions[(key[0], measure)]
+            totals[:, i] += np.bincount(positions, weights=table[measure].to_numpy(dtype=float), minlength=len(universe))
+
+    result = pd.DataFrame(totals, index=universe, columns=pd.MultiIndex.from_tuples(columns))
+    summary = pd.DataFrame(index=universe)
+    for measure in MEASURES:
+        summary[measure.title()] = result.xs(measure, axis=1, level=1).sum(axis=1) if measure in result.columns.get_level_values(1) else 0.0
+    units = summary["Units"]
+    summary["Return Rate"] = summary["Returns"] / units.where(units > 0)
+    result.columns = [f"{platform} {measure}" for platform, measure in columns]
+    out = pd.concat([summary, result], axis=1)
+    out.index.name = "SKU"
+    return out
+
+
+def _load_master(file):
+    return load_report(file, dtype=str)
+
+
+def render():
+    st.title("🌐 Cross-Platform SKU Performance")
+    st.caption("Upload any mix of platform reports; SKUs are matched across platforms through the optional SKU master.")
+
+    st.sidebar.header("🗂️ SKU Master")
+    master_file = st.sidebar.file_uploader(
+        "SKU master (.csv or .xlsx)", type=["csv", "xlsx"], key="sku_master",
+        help="Columns: master_sku, plus one column per platform (Amazon, Flipkart, Ajio, Myntra, Meesho).",
+    )
+
+    use_history = STORE_ENABLED and st.sidebar.toggle(
+        "Fill gaps from stored history", key="sku_history",
+        help="Reports not uploaded here are read from the history store.",
+    )
+
+    tables = {}
+    for platform, tab in zip(PLATFORMS, st.tabs(PLATFORMS)):
+        with tab:
+            for key in [key for key in SOURCES if key[0] == platform]:
+                uploaded = session_upload(*key, f"{platform} {key[1]} report", type=["csv", "xlsx"],
+                                          key=f"sku_{platform}_{key[1]}", accept_multiple_files=True)
+                try:
+                    if uploaded:
+                        # Reports uploaded on their own pages are reused here, pre-aggregated once
+                        table = session_value(*key, "sku table", lambda: platform_table(
+                            load_reports(uploaded, columns=source_columns(key), schema=SCHEMAS.get(key)), key,
+                        ))
+                    elif use_history:
+                        df = query(*key, columns=source_columns(key))
+                        table = platform_table(df, key) if df is not None and len(df) else None
+                    else:
+                        table = None
+                    if table is not None and len(table):
+                        tables[key] = table
+                except Exception as e:
+                    st.error(f"Error in {platform} {key[1]} report: {e}")
+
+    if not tables:
+        st.info("Upload at least one platform report to build the consolidated view.")
+        return
+
+    try:
+        master = _load_master(master_file) if master_file else None
+        consolidated = consolidate(tables, master)
+    except Exception as e:
+        st.error(f"Error: {e}")
+        return
+
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("🏷️ SKUs", f"{len(consolidated):,}")
+    col2.metric("📦 Units Sold", f"{consolidated['Units'].sum():,.0f}")
+    col3.metric("💰 Revenue", f"₹{consolidated['Revenue'].sum():,.2f}")
+    col4.metric("↩️ Units Returned", f"{consolidated['Returns'].sum():,.0f}")
+    col5.metric("🏬 Stock", f"{consolidated['Stock'].sum():,.0f}")
+
+    rank_by = st.selectbox("Rank SKUs by", ["Revenue", "Units", "Returns", "Stock", "Return Rate"])
+    top = st.slider("SKUs to show", 10, 200, 25, step=5)
+    ranked = consolidated.nlargest(top, rank_by)
+
+    st.subheader(f"🏆 Top {top} SKUs by {rank_by}")
+    with stage("table: Top SKUs"):
+        st.dataframe(ranked, use_container_width=True)
+
+    unit_columns = [col for col in ranked.columns if col.endswith(" units")]
+    if unit_columns:
+        with stage("chart: Units by Platform"):
+            chart = ranked.head(20)[unit_columns].rename(columns=lambda col: col.rsplit(" ", 1)[0])
+            chart = chart.reset_index().melt(id_vars="SKU", var_name="Platform", value_name="Units")
+            fig = px.bar(chart, x="SKU", y="Units", color="Platform", title="📊 Units by Platform (Top 20)")
+            st.plotly_chart(fig, use_container_width=True)
+
+    export_buttons(consolidated, "consolidated_skus", key="sku_export", label="📥 Consolidated SKUs", index=True)
+
+
+if __name__ == "__main__":
+    st.set_page_config(page_title="Cross-Platform SKU Performance", layout="wide")
+    render()
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from datasets import get_dataset, session_upload, session_value
+from exports import export_buttons
+from instrumentation import stage, timed
+from report_loader import load_reports
+from report_schemas import SCHEMAS
+from sku_consolidation import normalize_skus
+from table_view import paged_table
+
+# Days of stock cover from the sales velocity in the order reports rather
+# than vendor-supplied figures. Orders are pivoted into one SKU x day
+# matrix over the last max(WINDOWS) days, so every SKU's rolling sums come
+# out of a single cumulative sum. Velocity is measured up to the last day
+# in the order report, which is usually a few days before the inventory
+# snapshot.
+WINDOWS = (7, 30, 90)
+DEFAULT_WINDOW = 30
+REORDER_DAYS = 14
+TARGET_DAYS = 45
+
+# Session slot of the order reports uploaded here. It is separate from the
+# order page's ("Orders"), which may only hold a single file.
+COVER_REPORT = "Order history"
+
+# Platform -> (SKU, date, quantity, status column, order line keys) of its order report
+ORDER_SOURCES = {
+    "Amazon": ("sku", "purchase-date", "quantity", "order-status", None),
+    "Flipkart": ("sku", "order_date", "quantity", "order_item_status", ["order_item_id", "order_id"]),
+}
+
+
+def velocity_column(window):
+    return f"velocity_{window}d"
+
+
+def sku_day_matrix(skus, dates, quantities, as_of, days):
+    """Units sold per SKU per day over the days up to as_of.
+
+    Returns (SKU index, float32 matrix of len(index) x days, oldest day
+    first). SKUs are normalized as in sku_consolidation; rows outside the
+    window or without a SKU or date are ignored.
+    """
+    # Normalize each distinct SKU once, then map the rows through it
+    codes, uniques = pd.factorize(pd.Series(skus))
+    merged, index = pd.factorize(normalize_skus(uniques))
+    codes = np.where(codes >= 0, merged[codes], -1)
+    dates = pd.to_datetime(pd.Series(dates), errors="coerce")
+    if isinstance(dates.dtype, pd.DatetimeTZDtype):
+        dates = dates.dt.tz_localize(None)
+    age = (pd.Timestamp(as_of).normalize() - dates.dt.normalize()).dt.days.to_numpy(dtype=float, na_value=-1)
+    quantities = pd.to_numeric(pd.Series(quantities), errors="coerce").fillna(0).to_numpy(dtype=float)
+
+    keep = (codes >= 0) & (age >= 0) & (age < days)
+    cells = codes[keep] * days + (days - 1 - age[keep]).astype(np.intp)
+    matrix = np.bincount(cells, weights=quantities[keep], minlength=len(index) * days)
+    return index, matrix.reshape(len(index), days).astype(np.float32)
+
+
+@timed("aggregate: sales velocity")
+def sales_velocity(orders, sku, date, quantity=None, as_of=None, windows=WINDOWS):
+    """Average units sold per day in each trailing window, per normalized SKU.
+
+    quantity None counts order lines. as_of defaults to the last order
+    date. Returns a frame indexed by SKU with one velocity_<n>d column per
+    window and the as_of date in attrs["as_of"].
+    """
+    dates = pd.to_datetime(orders[date], errors="coerce")
+    if as_of is None:
+        as_of = dates.max()
+    if pd.isna(as_of):
+        raise ValueError(f"no order has a valid {date}")
+    quantities = orders[quantity] if quantity is not None else pd.Series(1, index=orders.index)
+    index, matrix = sku_day_matrix(orders[sku], dates, quantities, as_of, max(windows))
+
+    # Trailing sums: cumulative from the newest day backwards
+    trailing = matrix[:, ::-1].cumsum(axis=1, dtype=np.float64)
+    velocity = pd.DataFrame(
+        {velocity_column(window): trailing[:, window - 1] / window for window in windows},
+        index=pd.Index(index, name="sku"),
+    )
+    velocity.attrs["as_of"] = pd.Timestamp(as_of)
+    return velocity
+
+
+@timed("aggregate: stock cover")
+def stock_cover(inventory, velocity, sku, stock, window=DEFAULT_WINDOW, reorder_days=REORDER_DAYS, target_days=TARGET_DAYS):
+    """Inventory SKUs with their sales velocity, days of cover and reorder alerts.
+
+    days_of_cover is stock over the velocity of the chosen window (missing
+    when the SKU did not sell in it). SKUs with reorder_days of cover or
+    less are flagged, with the units needed to reach target_days of cover.
+    """
+    stocks = pd.to_numeric(inventory[stock], errors="coerce").fillna(0)
+    cover = pd.DataFrame({"sku": inventory[sku].to_numpy(), "stock": stocks.to_numpy()})
+    velocities = velocity.reindex(normalize_skus(inventory[sku])).fillna(0)
+    for col in velocity.columns:
+        cover[col] = velocities[col].to_numpy()
+
+    rate = cover[velocity_column(window)]
+    cover["days_of_cover"] = (cover["stock"] / rate).where(rate > 0).round(1)
+    cover["reorder"] = cover["days_of_cover"] <= reorder_days
+    cover["reorder_qty"] = np.ceil(rate * target_days - cover["stock"]).clip(lower=0).where(cover["reorder"], 0).astype("int64")
+    return cover
+
+
+def load_order_history(platform, files):
+    """Only the columns velocity needs, from one or more order reports of platform."""
+    sku, date, quantity, status, keys = ORDER_SOURCES[platform]
+    columns = [sku, date, quantity, status, *(keys or [])]
+    return load_reports(files, columns=columns, schema=SCHEMAS[(platform, "Orders")], dedupe_on=keys)
+
+
+def show_stock_cover(platform, inventory, sku, stock):
+    """Section computing days of cover for inventory from the platform's order reports."""
+    st.subheader("🧮 Stock Cover from Order History")
+    files = session_upload(
+        platform, COVER_REPORT, f"Upload {platform} Order Report(s) for sales velocity", type=["xlsx", "csv"],
+        key=f"{platform}_cover_orders", accept_multiple_files=True,
+        help="Velocity is measured over the last 7, 30 and 90 days of the order reports.",
+    )
+    slot = COVER_REPORT
+    order_page = get_dataset(platform, "Orders")
+    if not files and order_page is not None:
+        # Read the report uploaded on the order page, without replacing it
+        files, slot = order_page.files, "Orders"
+        st.caption(f"📎 Using {order_page.name}, the order report uploaded in this session.")
+    if not files:
+        st.info("Upload order reports to compute days of cover and reorder alerts from actual sales.")
+        return
+
+    order_sku, date, quantity, status, _ = ORDER_SOURCES[platform]
+    try:
+        orders = session_value(platform, slot, "order history", lambda: load_order_history(platform, files))
+        missing = [col for col in (order_sku, date) if col not in orders.columns]
+        if missing:
+            st.error(f"Missing columns in order report: {', '.join(missing)}")
+            return
+        if status in orders.columns:
+            orders = orders[~orders[status].astype(str).str.lower().str.contains("cancel")]
+        velocity = session_value(platform, slot, "sales velocity", lambda: sales_velocity(
+            orders, order_sku, date, quantity if quantity in orders.columns else None))
+    except Exception as e:
+        st.error(f"Error computing sales velocity: {e}")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    window = col1.selectbox("Velocity window (days)", WINDOWS, index=WINDOWS.index(DEFAULT_WINDOW), key=f"{platform}_cover_window")
+    reorder_days = col2.number_input("Reorder at (days of cover)", min_value=1, value=REORDER_DAYS, key=f"{platform}_cover_reorder")
+    target_days = col3.number_input("Reorder up to (days of cover)", min_value=1, value=TARGET_DAYS, key=f"{platform}_cover_target")
+
+    cover = stock_cover(inventory, velocity, sku, stock, window, reorder_days, target_days)
+    with stage("aggregate: stock cover metrics"):
+        alerts = cover[cover["reorder"]].sort_values("days_of_cover", kind="stable")
+        median_cover = cover["days_of_cover"].median()
+        unsold = int((cover[velocity_column(window)] == 0).sum())
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🚨 SKUs to Reorder", f"{len(alerts):,}")
+    col2.metric("⏳ Median Days of Cover", "–" if pd.isna(median_cover) else f"{median_cover:,.1f}")
+    col3.metric(f"💤 No Sales in {window} Days", f"{unsold:,}")
+    st.caption(f"Velocity up to {velocity.attrs['as_of']:%d %b %Y}, the last order date in the report.")
+
+    st.markdown(f"#### ⚠️ Reorder Alerts (≤ {reorder_days} Days Cover)")
+    with stage("table: Reorder Alerts"):
+        paged_table(alerts, key=f"{platform}_cover_alerts")
+    export_buttons(cover, f"{platform.lower()}_stock_cover", key=f"{platform}_cover_export", label="📥 Stock Cover")
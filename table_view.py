@@ -0,0 +1,122 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from instrumentation import stage
+
+# Sort orders and search matches kept per loaded report (see report_loader's
+# "report_key" attr), so paging and re-sorting never rescan the full frame.
+VIEW_CACHE_SIZE = 16
+PAGE_SIZES = [25, 50, 100, 250, 500]
+FILE_ORDER = "(file order)"
+ROW_HEIGHT = 35
+MAX_HEIGHT = 600
+
+_views = OrderedDict()
+_views_lock = threading.Lock()
+
+
+def _cached(df, kind, arg, build):
+    report_key = df.attrs.get("report_key")
+    if report_key is None:
+        return build()
+
+    key = (report_key, len(df), tuple(df.columns), kind, arg)
+    with _views_lock:
+        if key in _views:
+            _views.move_to_end(key)
+            return _views[key]
+
+    value = build()
+    with _views_lock:
+        _views[key] = value
+        while len(_views) > VIEW_CACHE_SIZE:
+            _views.popitem(last=False)
+    return value
+
+
+def text_columns(df):
+    """Columns searched by the table: text, object and categorical ones."""
+    return [col for col in df.columns
+            if isinstance(df[col].dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(df[col].dtype)]
+
+
+def _column_matches(series, needle):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Match each category once, then spread it over the rows by code
+        hits = series.cat.categories.astype(str).str.contains(needle, case=False, regex=False)
+        return np.append(np.asarray(hits, dtype=bool), False)[series.cat.codes.to_numpy()]
+    matches = series.astype("string").str.contains(needle, case=False, regex=False, na=False)
+    return matches.to_numpy(dtype=bool)
+
+
+def search_mask(df, needle):
+    """Rows where any text column contains needle (case-insensitive)."""
+    mask = np.zeros(len(df), dtype=bool)
+    for col in text_columns(df):
+        mask |= _column_matches(df[col], needle)
+    return mask
+
+
+def sort_order(series, ascending=True):
+    """Row positions of series in sorted order; missing values last."""
+    series = series.reset_index(drop=True)
+    try:
+        ordered = series.sort_values(ascending=ascending, kind="stable", na_position="last")
+    except TypeError:
+        # Mixed-type object columns: compare as text
+        ordered = series.astype("string").sort_values(ascending=ascending, kind="stable", na_position="last")
+    return ordered.index.to_numpy()
+
+
+def view_rows(df, sort_by=None, ascending=True, search=""):
+    """Positions of the rows to show: matching search, in sort_by order."""
+    if sort_by is None:
+        rows = None
+    else:
+        rows = _cached(df, "sort", (sort_by, ascending), lambda: sort_order(df[sort_by], ascending))
+
+    needle = search.strip()
+    if not needle:
+        return np.arange(len(df)) if rows is None else rows
+    mask = _cached(df, "search", needle.casefold(), lambda: search_mask(df, needle))
+    return np.flatnonzero(mask) if rows is None else rows[mask[rows]]
+
+
+def paged_table(df, key, page_size=50):
+    """Paginated view of df that sends only the current page to the browser.
+
+    Search and sort run here on the full frame and are cached per loaded
+    report, so turning pages only slices row positions and the page costs
+    the same to render however many rows the report has.
+    """
+    search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+    search = search_col.text_input("🔍 Search", key=f"{key}_search", placeholder="Text in any column")
+    sort_by = sort_col.selectbox("Sort by", [FILE_ORDER, *df.columns], key=f"{key}_sort")
+    descending = order_col.toggle("Descending", key=f"{key}_descending", disabled=sort_by == FILE_ORDER)
+    page_size = size_col.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(page_size), key=f"{key}_size")
+
+    with stage("table view: search and sort", rows=len(df)) as record:
+        rows = view_rows(df, None if sort_by == FILE_ORDER else sort_by, not descending, search)
+        record["matches"] = len(rows)
+
+    pages = max(1, -(-len(rows) // page_size))
+    page_key = f"{key}_page"
+    # A new search or sort starts again from the first page
+    view = (search.strip(), sort_by, descending, page_size)
+    if st.session_state.get(f"{key}_view") != view:
+        st.session_state[f"{key}_view"] = view
+        st.session_state[page_key] = 1
+    st.session_state[page_key] = min(st.session_state.get(page_key, 1), pages)
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=page_key)
+
+    start = (page - 1) * page_size
+    shown = df.iloc[rows[start:start + page_size]]
+    st.dataframe(shown, use_container_width=True, height=min(MAX_HEIGHT, ROW_HEIGHT * (len(shown) + 1) + 3))
+    if len(rows):
+        matched = f" matching \"{search.strip()}\" (of {len(df):,})" if search.strip() else ""
+        st.caption(f"Rows {start + 1:,}–{start + len(shown):,} of {len(rows):,}{matched}")
+    else:
+        st.caption("No rows match the search.")
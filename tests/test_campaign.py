@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from campaign import REQUIRED_COLUMNS, analyze_keywords, evaluate_condition, load_bid_rules
+
+
+def _keywords():
+    return pd.DataFrame({"ACOS": [10.0, 60.0], "CTR": [1.5, 0.1], "Orders": [20, 1], "Sales (INR)": [20000.0, 500.0]})
+
+
+def test_condition_compares_columns():
+    df = _keywords()
+    assert evaluate_condition(df, "ACOS < 20 and not `Sales (INR)` < 1000").tolist() == [True, False]
+    assert evaluate_condition(df, "5 < ACOS < 50 or Orders == 1").tolist() == [True, True]
+
+
+@pytest.mark.parametrize("condition", [
+    "ACOS.to_csv('/tmp/pwn.csv')",
+    "ACOS.__class__.__init__.__globals__",
+    "ACOS[0] > 1",
+    "__import__('os').system('true')",
+])
+def test_condition_rejects_code(condition):
+    with pytest.raises(ValueError):
+        evaluate_condition(_keywords(), condition)
+
+
+def test_rule_table_with_method_call_is_rejected(tmp_path):
+    path = tmp_path / "rules.csv"
+    path.write_text("rule_id,condition,multiplier,min_bid\npwn,ACOS.to_csv('/tmp/pwn.csv'),1,\n")
+    assert "not allowed" in load_bid_rules(str(path))
+
+
+def test_analyze_keywords_leaves_input_unchanged():
+    df = pd.DataFrame({col: [1.0] for col in REQUIRED_COLUMNS}).assign(ACOS=60.0)
+    result = analyze_keywords(df)
+    assert result["Bid Rule"].tolist() == ["high_acos_or_low_ctr"]
+    assert list(df.columns) == REQUIRED_COLUMNS